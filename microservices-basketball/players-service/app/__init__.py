@@ -5,8 +5,24 @@ from flask import Flask
 from flask_cors import CORS
 from app.config import get_config
 from app.utils.database import init_db
+from app.utils.metrics import init_metrics
+from app.utils.timing import init_timing
+from app.utils.compression import init_compression
+from app.utils.json_provider import OrjsonJSONProvider
+from app.utils.cache import init_cache
+from app.utils.change_stream import start_change_listener
+from app.services.teams_client import init_teams_client
 import os
 
+def init_worker(app, indexes: bool = True):
+    """
+    Recursos que no sobreviven a un fork: cliente de MongoDB e hilo del
+    change stream. gunicorn.conf.py lo llama en post_fork de cada worker
+    """
+    init_db(app, indexes=indexes)
+    start_change_listener(app)
+
+
 def create_app(config_name=None):
     """Factory para crear la aplicación Flask"""
     
@@ -20,6 +36,9 @@ def create_app(config_name=None):
     config = get_config(config_name)
     app.config.from_object(config)
     
+    # JSON con orjson (necesita la configuración: JSON_DATETIME_FORMAT)
+    app.json = OrjsonJSONProvider(app)
+    
     # Configurar CORS
     CORS(app, resources={
         r"/api/*": {
@@ -29,16 +48,35 @@ def create_app(config_name=None):
         }
     })
     
-    # Inicializar MongoDB
-    init_db(app)
+    # Métricas por ruta y tiempos por fase (Server-Timing)
+    init_metrics(app)
+    init_timing(app)
+    
+    # Compresión br/gzip (después de init_timing para que cuente en el total)
+    init_compression(app)
+    
+    # Caché de jugadores; MongoDB y el change stream que la invalida entre
+    # workers se conectan aquí o, con gunicorn, después del fork
+    init_cache(app)
+    if app.config['MONGO_CONNECT_ON_STARTUP']:
+        init_worker(app)
+    
+    # Cliente del teams-service
+    init_teams_client(app)
     
     # Registrar blueprints
     from app.routes.health import health_bp
     from app.routes.players import players_bp
+    from app.routes.metrics import metrics_bp
     
     app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
     app.register_blueprint(players_bp, url_prefix='/api/players')
     
+    # Comandos de mantenimiento
+    from app.cli import register_cli
+    register_cli(app)
+    
     # Manejador de errores global
     @app.errorhandler(404)
     def not_found(error):
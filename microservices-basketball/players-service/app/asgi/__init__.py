@@ -0,0 +1,68 @@
+"""
+Modo ASGI (Quart + motor + httpx) de Players Service
+
+Sirve las mismas rutas y respuestas que la app Flask compartiendo modelo,
+schemas, caché y la lógica de PlayerService; la E/S con MongoDB y con el
+teams-service no bloquea, así que un solo proceso atiende cientos de
+peticiones concurrentes. La caché de jugadores se invalida en el propio
+proceso y por TTL (sin change streams)
+"""
+from quart import Quart
+from app.config import get_config
+from app.utils.cache import init_cache
+from app.utils.json_provider import OrjsonJSONProvider
+from app.asgi.database import close_db, init_db
+from app.asgi.instrumentation import init_instrumentation
+from app.asgi.teams_client import close_teams_client, init_teams_client
+import os
+
+
+def create_async_app(config_name=None):
+    """Factory para crear la aplicación Quart"""
+    
+    app = Quart(__name__)
+    
+    # Cargar configuración
+    if config_name is None:
+        config_name = os.getenv('FLASK_ENV', 'development')
+    
+    config = get_config(config_name)
+    app.config.from_object(config)
+    app.json = OrjsonJSONProvider(app)
+    
+    # Métricas por ruta, tiempos por fase (Server-Timing) y compresión br/gzip
+    init_instrumentation(app)
+    
+    # Caché de jugadores y cliente del teams-service
+    init_cache(app)
+    init_teams_client(app)
+    
+    # motor y httpx se ligan al event loop del servidor
+    @app.before_serving
+    async def connect():
+        await init_db(app)
+    
+    @app.after_serving
+    async def disconnect():
+        await close_teams_client()
+        close_db()
+    
+    # Registrar blueprints (CORS solo en /api/*, como la app Flask; el
+    # blueprint lee los orígenes de la configuración de cada app)
+    from app.asgi.routes import health_bp, metrics_bp, players_bp
+    
+    app.config['QUART_CORS_ALLOW_ORIGIN'] = app.config['CORS_ORIGINS']
+    app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(players_bp, url_prefix='/api/players')
+    
+    # Manejador de errores global
+    @app.errorhandler(404)
+    async def not_found(error):
+        return {'error': 'Recurso no encontrado', 'status': 404}, 404
+    
+    @app.errorhandler(500)
+    async def internal_error(error):
+        return {'error': 'Error interno del servidor', 'status': 500}, 500
+    
+    return app
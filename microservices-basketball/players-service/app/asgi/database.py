@@ -0,0 +1,60 @@
+"""
+Conexión asíncrona a MongoDB (motor) para el modo ASGI
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.utils.database import check_indexes, init_read_preference, mongo_client_options
+from app.utils.metrics import mongo_event_listeners
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cliente motor global (uno por proceso, ligado al event loop del servidor)
+motor_client = None
+db = None
+
+
+async def init_db(app):
+    """
+    Conecta con MongoDB dentro del event loop del servidor (before_serving)
+    """
+    global motor_client, db
+    
+    database_name = app.config['MONGO_DATABASE']
+    logger.info(f"Conectando a MongoDB (motor): {database_name}")
+    
+    motor_client = AsyncIOMotorClient(
+        app.config['MONGO_URI'],
+        event_listeners=mongo_event_listeners(),
+        **mongo_client_options(app.config)
+    )
+    init_read_preference(app.config)
+    await motor_client.admin.command('ping')
+    db = motor_client[database_name]
+    
+    # Misma revisión de índices que el modo WSGI, sobre la base pymongo que envuelve motor
+    await asyncio.to_thread(check_indexes, db.delegate, app.config['MONGO_INDEXES_ON_STARTUP'])
+    
+    logger.info(f"Conectado exitosamente a MongoDB (motor): {database_name}")
+    return db
+
+
+def get_db():
+    """
+    Obtiene la base de datos motor
+    """
+    if db is None:
+        raise Exception("Base de datos no inicializada. Llama a init_db() primero.")
+    return db
+
+
+def close_db():
+    """
+    Cierra la conexión a MongoDB
+    """
+    global motor_client, db
+    if motor_client:
+        motor_client.close()
+        motor_client = None
+        db = None
+        logger.info("Conexión a MongoDB (motor) cerrada")
@@ -0,0 +1,73 @@
+"""
+Métricas por ruta, Server-Timing, log de peticiones lentas y compresión del
+modo ASGI
+
+Mismo comportamiento que init_metrics, init_timing e init_compression de la
+app Flask, con los hooks de Quart: el cuerpo de una respuesta en streaming se
+envuelve para medir hasta que termina de enviarse (Quart no tiene
+call_on_close)
+"""
+from quart import current_app, g, request
+from app.utils.compression import apply_compression, compressible_encoding, init_compressed_cache
+from app.utils.metrics import observe_request, request_labels
+from app.utils.timing import RequestTimer, log_slow_request, server_timing, slow_request_summary
+import time
+
+
+async def _start_request():
+    g.metrics_start = time.perf_counter()
+    g.request_timer = RequestTimer()
+
+
+async def _finish_request(response):
+    config = current_app.config
+    start = g.pop('metrics_start', None)
+    timer = g.get('request_timer')
+    streamed = isinstance(response.response, response.iterable_body_class)
+
+    # Compresión antes de cerrar el timer para que cuente en el total
+    if config['COMPRESSION_ENABLED']:
+        encoding = compressible_encoding(response, streamed, request, config)
+        if encoding is not None:
+            apply_compression(response, await response.get_data(), encoding, request.path, config)
+
+    callbacks = []
+    if start is not None:
+        labels = request_labels(request, response.status_code)
+        callbacks.append(lambda: observe_request(labels, start))
+    if timer is not None:
+        if config['SERVER_TIMING_ENABLED']:
+            response.headers['Server-Timing'] = server_timing(timer, streamed)
+        threshold = config['SLOW_REQUEST_THRESHOLD_MS']
+        summary = slow_request_summary(request, response.status_code, streamed)
+        callbacks.append(lambda: log_slow_request(timer, threshold, summary))
+
+    if streamed:
+        # NDJSON: el cuerpo se genera al enviarlo, se mide hasta cerrar el stream
+        response.response = response.iterable_body_class(_call_on_close(response.response, callbacks))
+    else:
+        g.pop('request_timer', None)
+        for callback in callbacks:
+            callback()
+
+    return response
+
+
+async def _call_on_close(body, callbacks):
+    """Reenvía el cuerpo y ejecuta callbacks al terminar (o al cortarse) el envío"""
+    try:
+        async with body as chunks:
+            async for chunk in chunks:
+                yield chunk
+    finally:
+        for callback in callbacks:
+            callback()
+
+
+def init_instrumentation(app):
+    """
+    Registra métricas, medición por fases y compresión en la aplicación Quart
+    """
+    init_compressed_cache(app.config)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,466 @@
+"""
+Servicio de Jugadores para el modo ASGI (motor)
+"""
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.models.player import Player, serialize_player
+from app.services.player_service import PlayerService
+from app.utils.cache import get_player_cache
+from app.utils.database import reads_from_secondaries
+from app.asgi.database import get_db
+from app.asgi.teams_client import get_teams_client
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPlayerService(PlayerService):
+    """
+    Misma lógica y respuestas que PlayerService, con las operaciones de
+    MongoDB y del teams-service como corrutinas
+
+    Hereda la construcción de queries, pipelines y resultados; solo cambia
+    la E/S
+    """
+
+    def get_collection(self):
+        """Obtiene la colección de jugadores (motor)"""
+        return get_db()[self.collection_name]
+
+    async def get_all_players(self, filters: Dict = None, fields: Tuple[str, ...] = None) -> List[Dict]:
+        """
+        Obtiene todos los jugadores con filtros opcionales
+        """
+        try:
+            query = self._build_query(filters)
+            players = await self.get_read_collection().find(query, Player.projection(fields)).to_list(None)
+            result = self._serialize_all(players, fields)
+
+            logger.info(f"Encontrados {len(result)} jugadores")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error obteniendo jugadores: {str(e)}")
+            raise
+
+    async def get_players_page(self, filters: Dict = None, limit: int = 50, cursor: str = None,
+                               fields: Tuple[str, ...] = None,
+                               primary: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Obtiene una página de jugadores usando paginación por cursor (keyset sobre _id)
+        """
+        try:
+            query = self._page_query(filters, cursor)
+            collection = self.get_collection() if primary else self.get_read_collection()
+            player_docs = await collection.find(
+                query, Player.projection(fields)
+            ).sort('_id', 1).limit(limit + 1).to_list(None)
+            result, next_cursor = self._page_result(player_docs, limit, fields)
+
+            logger.info(f"Página con {len(result)} jugadores (siguiente: {next_cursor})")
+            return result, next_cursor
+
+        except ValueError as e:
+            logger.error(f"Error de validación: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error obteniendo página de jugadores: {str(e)}")
+            raise
+
+    async def iter_players(self, filters: Dict = None, batch_size: int = 500,
+                           fields: Tuple[str, ...] = None) -> AsyncIterator[Dict]:
+        """
+        Itera los jugadores uno a uno sin cargar toda la colección en memoria
+        """
+        query = self._build_query(filters)
+        cursor = self.get_read_collection().find(
+            query, Player.projection(fields)
+        ).sort('_id', 1).batch_size(batch_size)
+        count = 0
+        try:
+            async for player_doc in cursor:
+                count += 1
+                yield serialize_player(player_doc, fields)
+        finally:
+            await cursor.close()
+            logger.info(f"Exportados {count} jugadores en streaming")
+
+    async def get_player_by_id(self, player_id: str, fields: Tuple[str, ...] = None) -> Optional[Dict]:
+        """
+        Obtiene un jugador por su ID (con la misma caché que el modo WSGI)
+        """
+        try:
+            obj_id = ObjectId(player_id)
+
+            cache = get_player_cache()
+            if not cache.enabled:
+                return await self._find_player(obj_id, fields)
+
+            cache_key = str(obj_id)
+            player = cache.get(cache_key)
+            if player is None:
+                player = await self._find_player(obj_id)
+                if player is None:
+                    return None
+                cache.set(cache_key, player)
+
+            return self._from_cache(player, fields)
+
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return None
+        except Exception as e:
+            logger.error(f"Error obteniendo jugador: {str(e)}")
+            raise
+
+    async def _find_player(self, obj_id: ObjectId, fields: Tuple[str, ...] = None,
+                           primary: bool = False) -> Optional[Dict]:
+        """
+        Lee un jugador de MongoDB (sin caché)
+        """
+        collection = self.get_collection() if primary else self.get_read_collection()
+        player_doc = await collection.find_one({'_id': obj_id}, Player.projection(fields))
+        if not player_doc:
+            logger.warning(f"Jugador no encontrado: {obj_id}")
+            return None
+        return serialize_player(player_doc, fields)
+
+    async def get_player_with_version(self, player_id: str, fields: Tuple[str, ...] = None
+                                      ) -> Optional[Tuple[Dict, Tuple[str, Optional[datetime]]]]:
+        """
+        Jugador y su versión (_id, updatedAt) para el ETag con una sola
+        lectura del primario (o ninguna, si la caché es coherente)
+        """
+        try:
+            obj_id = ObjectId(player_id)
+
+            cache = self._coherent_cache()
+            if cache is not None:
+                cache_key = str(obj_id)
+                player = cache.get(cache_key)
+                if player is None:
+                    player = await self._find_player(obj_id, primary=True)
+                    if player is None:
+                        return None
+                    cache.set(cache_key, player)
+                return self._with_version(player, fields)
+
+            player_doc = await self.get_collection().find_one(
+                {'_id': obj_id}, self._version_projection(fields, True)
+            )
+            if not player_doc:
+                return None
+            return serialize_player(player_doc, fields), self._player_version(player_doc)
+
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return None
+        except Exception as e:
+            logger.error(f"Error obteniendo jugador: {str(e)}")
+            raise
+
+    async def get_players_by_team(self, team_id: int, fields: Tuple[str, ...] = None,
+                                  version: Tuple[int, Optional[datetime]] = None) -> List[Dict]:
+        """
+        Obtiene todos los jugadores de un equipo (releídos del primario si el
+        secundario no llega a version)
+        """
+        try:
+            check = version is not None and reads_from_secondaries()
+            query = {'equipoId': team_id}
+            players = await self.get_read_collection().find(
+                query, self._version_projection(fields, check)
+            ).to_list(None)
+
+            if check and not self._matches_version(players, version):
+                logger.info(f"Plantilla del equipo {team_id} atrasada en el secundario, se lee del primario")
+                players = await self.get_collection().find(query, Player.projection(fields)).to_list(None)
+
+            result = self._serialize_all(players, fields)
+
+            logger.info(f"Encontrados {len(result)} jugadores del equipo {team_id}")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error obteniendo jugadores del equipo: {str(e)}")
+            raise
+
+    async def get_leaders(self, stat: str, limit: int = 10, team_id: int = None) -> List[Dict]:
+        """
+        Top-N de jugadores activos por una estadística, de la liga o de un equipo
+        """
+        query, projection = self._leaders_query(stat, team_id)
+
+        try:
+            player_docs = await self.get_read_collection().find(query, projection).sort(
+                f'estadisticas.{stat}', -1
+            ).limit(limit).to_list(None)
+            result = self._leaders_result(player_docs, stat)
+
+            logger.info(f"Líderes de {stat}: {len(result)} jugadores")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error obteniendo líderes: {str(e)}")
+            raise
+
+    async def search_players(self, text: str, limit: int = 10, fields: Tuple[str, ...] = None) -> List[Dict]:
+        """
+        Busca jugadores por prefijo de nombre, apellidos o nombre completo
+        """
+        query = self._search_query(text)
+
+        try:
+            fields = fields or self.SEARCH_FIELDS
+            player_docs = await self.get_read_collection().find(
+                query, Player.projection(fields)
+            ).limit(limit).to_list(None)
+            result = self._serialize_all(player_docs, fields)
+
+            logger.info(f"Búsqueda '{text}': {len(result)} jugadores")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error buscando jugadores: {str(e)}")
+            raise
+
+    async def get_roster_version(self, team_id: int):
+        """
+        Versión de la plantilla de un equipo: (número de jugadores, último updatedAt)
+        """
+        try:
+            result = await self.get_collection().aggregate(
+                self._roster_version_pipeline(team_id), hint='idx_equipo_updated'
+            ).to_list(None)
+            return self._roster_version(result)
+
+        except Exception as e:
+            logger.error(f"Error obteniendo versión de la plantilla: {str(e)}")
+            raise
+
+    async def create_player(self, player_data: Dict, teams_service_url: str = None) -> Dict:
+        """
+        Crea un nuevo jugador
+        """
+        try:
+            if teams_service_url:
+                team_id = player_data.get('equipoId')
+                if not await self._verify_team_exists(team_id, teams_service_url):
+                    raise ValueError(f"El equipo con ID {team_id} no existe")
+
+            player = self._new_player(player_data)
+
+            try:
+                result = await self.get_collection().insert_one(player.to_mongo())
+            except DuplicateKeyError as e:
+                raise ValueError(self._duplicate_number_message(e, player.numeroCamiseta))
+
+            player._id = result.inserted_id
+            created_player = player.to_dict()
+
+            logger.info(f"Jugador creado: {created_player['_id']}")
+            return created_player
+
+        except ValueError as e:
+            logger.error(f"Error de validación: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error creando jugador: {str(e)}")
+            raise
+
+    async def create_players_bulk(self, entries: List[Tuple[int, Dict]],
+                                  teams_service_url: str = None) -> List[Dict]:
+        """
+        Crea varios jugadores con un solo insert_many; los equipos distintos
+        se verifican en paralelo
+        """
+        try:
+            teams_ok = {}
+            if teams_service_url:
+                team_ids = list({data.get('equipoId') for _, data in entries})
+                exists = await asyncio.gather(*(
+                    self._verify_team_exists(team_id, teams_service_url) for team_id in team_ids
+                ))
+                teams_ok = dict(zip(team_ids, exists))
+
+            docs, doc_indexes, results = self._bulk_docs(entries, teams_ok)
+
+            failed = {}
+            if docs:
+                try:
+                    await self.get_collection().insert_many(docs, ordered=False)
+                except BulkWriteError as e:
+                    failed = self._bulk_failures(e, docs)
+
+            return self._bulk_results(results, docs, doc_indexes, failed, len(entries))
+
+        except Exception as e:
+            logger.error(f"Error en creación masiva de jugadores: {str(e)}")
+            raise
+
+    async def update_player(self, player_id: str, update_data: Dict) -> Optional[Dict]:
+        """
+        Actualiza un jugador existente
+        """
+        try:
+            collection = self.get_collection()
+            obj_id = ObjectId(player_id)
+
+            partial_rename = self._prepare_update(update_data)
+
+            for _ in range(self.RENAME_ATTEMPTS):
+                query = {'_id': obj_id}
+                if partial_rename:
+                    current = await collection.find_one({'_id': obj_id}, self.NAME_PROJECTION)
+                    if current is None:
+                        return None
+                    query = self._rename_query(obj_id, update_data, current)
+
+                try:
+                    updated_doc = await collection.find_one_and_update(
+                        query,
+                        {'$set': update_data},
+                        return_document=ReturnDocument.AFTER
+                    )
+                except DuplicateKeyError as e:
+                    raise ValueError(
+                        self._duplicate_number_message(e, update_data.get('numeroCamiseta'))
+                    )
+                if updated_doc or not partial_rename:
+                    break
+            else:
+                raise ValueError(self.RENAME_CONFLICT_MESSAGE)
+
+            if not updated_doc:
+                return None
+
+            self._invalidate_cache(obj_id)
+
+            logger.info(f"Jugador actualizado: {player_id}")
+            return serialize_player(updated_doc)
+
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return None
+        except ValueError as e:
+            logger.error(f"Error de validación: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error actualizando jugador: {str(e)}")
+            raise
+
+    async def delete_player(self, player_id: str) -> bool:
+        """
+        Elimina un jugador (soft delete - marca como inactivo)
+        """
+        try:
+            obj_id = ObjectId(player_id)
+            deleted_doc = await self.get_collection().find_one_and_update(
+                self._soft_delete_filter(obj_id),
+                self._soft_delete_update(),
+                projection={'_id': 1}
+            )
+
+            if not deleted_doc:
+                return False
+
+            self._invalidate_cache(obj_id)
+            logger.info(f"Jugador eliminado (soft): {player_id}")
+            return True
+
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return False
+        except Exception as e:
+            logger.error(f"Error eliminando jugador: {str(e)}")
+            raise
+
+    async def update_player_stats(self, player_id: str, stats: Dict) -> Optional[Dict]:
+        """
+        Actualiza las estadísticas de un jugador
+        """
+        return await self._update_and_serialize(
+            player_id, self._stats_write(stats),
+            'Estadísticas actualizadas', 'Error actualizando estadísticas'
+        )
+
+    async def record_game_stats(self, player_id: str, game: Dict) -> Optional[Dict]:
+        """
+        Suma la línea de un partido y recalcula promedios (update atómico)
+        """
+        return await self._update_and_serialize(
+            player_id, self._game_stats_pipeline(game),
+            'Partido registrado para el jugador', 'Error registrando partido'
+        )
+
+    async def _update_and_serialize(self, player_id: str, update, done_message: str,
+                                    error_message: str) -> Optional[Dict]:
+        """find_one_and_update con el documento resultante ya serializado"""
+        try:
+            obj_id = ObjectId(player_id)
+            updated_doc = await self.get_collection().find_one_and_update(
+                {'_id': obj_id},
+                update,
+                return_document=ReturnDocument.AFTER
+            )
+
+            if not updated_doc:
+                return None
+
+            self._invalidate_cache(obj_id)
+
+            logger.info(f"{done_message}: {player_id}")
+            return serialize_player(updated_doc)
+
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return None
+        except Exception as e:
+            logger.error(f"{error_message}: {str(e)}")
+            raise
+
+    async def update_stats_bulk(self, entries: List[Tuple[int, str, Dict]],
+                                include_players: bool = False) -> Tuple[List[Dict], Optional[List[Dict]]]:
+        """
+        Actualiza las estadísticas de varios jugadores con un solo bulk_write
+        """
+        try:
+            collection = self.get_collection()
+            operations, updated, results = self._stats_bulk_operations(entries)
+
+            missing = set()
+            if operations:
+                result = await collection.bulk_write(operations, ordered=False)
+
+                if result.matched_count < len(operations):
+                    ids = [obj_id for _, obj_id in updated]
+                    found = {
+                        doc['_id']
+                        for doc in await collection.find({'_id': {'$in': ids}}, {'_id': 1}).to_list(None)
+                    }
+                    missing = set(ids) - found
+
+            results = self._stats_bulk_results(results, updated, missing, len(entries))
+
+            players = None
+            if include_players:
+                ids = [obj_id for _, obj_id in updated if obj_id not in missing]
+                docs = await collection.find({'_id': {'$in': ids}}).to_list(None)
+                players = [serialize_player(doc) for doc in docs]
+
+            return results, players
+
+        except Exception as e:
+            logger.error(f"Error actualizando estadísticas en lote: {str(e)}")
+            raise
+
+    async def _verify_team_exists(self, team_id: int, teams_service_url: str) -> bool:
+        """
+        Verifica que un equipo existe llamando al teams-service (httpx)
+        """
+        return await get_teams_client(teams_service_url).team_exists(team_id)
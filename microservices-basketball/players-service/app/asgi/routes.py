@@ -0,0 +1,197 @@
+"""
+Blueprints del modo ASGI: mismas rutas y formatos de respuesta que
+app/routes/players.py, app/routes/health.py y app/routes/metrics.py, con
+handlers async
+
+Las rutas de jugadores ejecutan los handlers de app/routes/handlers.py
+esperando las llamadas al servicio asíncrono
+"""
+from quart import Blueprint, Response, current_app, jsonify, request
+from quart_cors import cors
+from datetime import datetime
+from app.asgi.database import get_db
+from app.asgi.player_service import AsyncPlayerService
+from app.asgi.teams_client import get_teams_client
+from app.routes.handlers import PlayerHandlers, run_async
+from app.utils.cache import get_player_cache
+from app.utils.metrics import render_metrics
+from app.utils.request_params import NDJSON_MIMETYPE
+
+health_bp = Blueprint('health', __name__)
+metrics_bp = Blueprint('metrics', __name__)
+players_bp = Blueprint('players', __name__)
+cors(
+    players_bp,
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"]
+)
+player_service = AsyncPlayerService()
+
+
+@health_bp.route('/health', methods=['GET'])
+async def health_check():
+    """
+    Endpoint de health check para verificar el estado del servicio
+    """
+    try:
+        await get_db().command('ping')
+
+        return jsonify({
+            'status': 'healthy',
+            'service': 'players-service',
+            'mode': 'asgi',
+            'timestamp': datetime.utcnow().isoformat(),
+            'database': 'connected',
+            'cache': get_player_cache().stats(),
+            'teamsService': get_teams_client().stats(),
+            'version': '1.0.0'
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'unhealthy',
+            'service': 'players-service',
+            'mode': 'asgi',
+            'timestamp': datetime.utcnow().isoformat(),
+            'database': 'disconnected',
+            'error': str(e)
+        }), 503
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+async def metrics():
+    """
+    Endpoint de métricas en formato de texto de Prometheus
+    """
+    data, content_type = render_metrics()
+    return Response(data, mimetype=content_type.split(';')[0], content_type=content_type)
+
+
+def _stream_players(filters, fields=None):
+    """
+    Respuesta NDJSON: un jugador serializado por línea, enviado a medida que
+    se lee el cursor de MongoDB
+    """
+    batch_size = current_app.config['PLAYERS_STREAM_BATCH_SIZE']
+    dumps = current_app.json.dumps
+
+    async def generate():
+        async for player in player_service.iter_players(filters, batch_size, fields):
+            yield dumps(player) + '\n'
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
+
+
+handlers = PlayerHandlers(player_service, request, current_app, _stream_players)
+
+
+@players_bp.route('', methods=['GET'])
+async def get_all_players():
+    """
+    GET /api/players
+    Query params: equipoId, activo, posicion, limit, cursor, stream, fields
+    """
+    return await run_async(handlers.get_all_players())
+
+
+@players_bp.route('/leaders', methods=['GET'])
+async def get_leaders():
+    """
+    GET /api/players/leaders
+    Query params: stat, limit, equipoId
+    """
+    return await run_async(handlers.get_leaders())
+
+
+@players_bp.route('/search', methods=['GET'])
+async def search_players():
+    """
+    GET /api/players/search
+    Query params: q, limit, fields
+    """
+    return await run_async(handlers.search_players())
+
+
+@players_bp.route('/<player_id>', methods=['GET'])
+async def get_player(player_id):
+    """
+    GET /api/players/:id
+    Query params: fields. Responde 304 si If-None-Match coincide con el ETag
+    """
+    return await run_async(handlers.get_player(player_id))
+
+
+@players_bp.route('/team/<int:team_id>', methods=['GET'])
+async def get_players_by_team(team_id):
+    """
+    GET /api/players/team/:teamId
+    Query params: limit, cursor, stream, fields. Responde 304 si la plantilla
+    no cambió
+    """
+    return await run_async(handlers.get_players_by_team(team_id))
+
+
+@players_bp.route('', methods=['POST'])
+async def create_player():
+    """
+    POST /api/players
+    """
+    return await run_async(handlers.create_player())
+
+
+@players_bp.route('/bulk', methods=['POST'])
+async def create_players_bulk():
+    """
+    POST /api/players/bulk
+    201 si se crearon todos, 207 si solo algunos, 400 si ninguno
+    """
+    return await run_async(handlers.create_players_bulk())
+
+
+@players_bp.route('/<player_id>', methods=['PUT'])
+async def update_player(player_id):
+    """
+    PUT /api/players/:id
+    """
+    return await run_async(handlers.update_player(player_id))
+
+
+@players_bp.route('/<player_id>', methods=['DELETE'])
+async def delete_player(player_id):
+    """
+    DELETE /api/players/:id (soft delete)
+    """
+    return await run_async(handlers.delete_player(player_id))
+
+
+@players_bp.route('/<player_id>/stats', methods=['GET'])
+async def get_player_stats(player_id):
+    """
+    GET /api/players/:id/stats
+    """
+    return await run_async(handlers.get_player_stats(player_id))
+
+
+@players_bp.route('/<player_id>/stats', methods=['PUT'])
+async def update_player_stats(player_id):
+    """
+    PUT /api/players/:id/stats
+    """
+    return await run_async(handlers.update_player_stats(player_id))
+
+
+@players_bp.route('/<player_id>/games', methods=['POST'])
+async def record_game_stats(player_id):
+    """
+    POST /api/players/:id/games
+    """
+    return await run_async(handlers.record_game_stats(player_id))
+
+
+@players_bp.route('/stats/bulk', methods=['PUT'])
+async def update_stats_bulk():
+    """
+    PUT /api/players/stats/bulk
+    Query params: includePlayers=true para devolver los jugadores actualizados
+    """
+    return await run_async(handlers.update_stats_bulk())
@@ -0,0 +1,93 @@
+"""
+Cliente asíncrono (httpx) del teams-service para el modo ASGI
+"""
+from quart import current_app
+from app.services.teams_client import TeamsClient, log_replaced_client
+import asyncio
+import httpx
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cliente global (uno por proceso)
+teams_client = None
+
+
+class AsyncTeamsClient(TeamsClient):
+    """
+    TeamsClient con httpx.AsyncClient: misma caché, circuit breaker, métricas
+    y política ante fallos, sin bloquear el event loop
+    """
+    
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """Cliente con pool de conexiones (se crea en el primer uso, dentro del loop)"""
+        if self._session is None:
+            connect_timeout, timeout = self.timeout
+            self._session = httpx.AsyncClient(
+                timeout=httpx.Timeout(timeout, connect=connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                )
+            )
+        return self._session
+    
+    async def team_exists(self, team_id: int) -> bool:
+        """
+        Indica si el equipo existe
+        
+        Si el teams-service no responde (o el circuito está abierto) se permite
+        la operación
+        """
+        known = self._precheck(team_id)
+        if known is not None:
+            return known
+        
+        start = time.perf_counter()
+        try:
+            response = await self.session.get(f"{self.base_url}/{team_id}")
+        except httpx.HTTPError as e:
+            return self._record_error(start, f"No se pudo verificar equipo: {str(e)}")
+        return self._record_response(team_id, response.status_code, start)
+    
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+
+
+def init_teams_client(app):
+    """
+    Crea el cliente asíncrono del teams-service con la configuración de la aplicación
+    """
+    global teams_client
+    teams_client = AsyncTeamsClient.from_config(app.config)
+    return teams_client
+
+
+def get_teams_client(base_url: str = None) -> AsyncTeamsClient:
+    """
+    Obtiene el cliente asíncrono del teams-service (si la URL no coincide con
+    la del cliente inicializado, se recrea con la configuración de la app)
+    """
+    global teams_client
+    if teams_client is None or (base_url and base_url != teams_client.base_url):
+        replaced = teams_client
+        teams_client = AsyncTeamsClient.from_config(current_app.config, base_url)
+        if replaced is not None:
+            log_replaced_client(replaced, teams_client)
+            asyncio.get_running_loop().create_task(replaced.aclose())
+    return teams_client
+
+
+async def close_teams_client():
+    """
+    Cierra el cliente actual (get_teams_client puede haberlo sustituido
+    después del arranque)
+    """
+    global teams_client
+    if teams_client is not None:
+        await teams_client.aclose()
+        teams_client = None
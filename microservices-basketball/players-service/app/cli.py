@@ -0,0 +1,73 @@
+"""
+Comandos de mantenimiento (flask --app run <comando>)
+"""
+from flask.cli import AppGroup
+import click
+
+search_cli = AppGroup('players-search', help='Mantenimiento de la búsqueda de jugadores')
+
+
+@search_cli.command('reindex')
+@click.option('--batch-size', default=1000, show_default=True, help='Documentos por bulk_write')
+def reindex_search(batch_size):
+    """Calcula searchTerms de los jugadores que aún no lo tienen"""
+    from app.utils.database import get_db
+    from app.utils.indexes import backfill_search_terms
+    
+    updated = backfill_search_terms(get_db().players, batch_size)
+    click.echo(f"searchTerms calculado para {updated} jugadores")
+
+
+indexes_cli = AppGroup('players-indexes', help='Índices declarados de la colección players')
+
+
+def _echo_diff(diff, dry_run, drop_obsolete):
+    """Imprime la diferencia entre los índices declarados y los de MongoDB"""
+    created = 'por crear' if dry_run else 'creados'
+    dropped = 'por eliminar' if dry_run or not drop_obsolete else 'eliminados'
+    click.echo(f"Sin cambios: {len(diff['ok'])}")
+    for name in diff['missing']:
+        click.echo(f"+ {name} ({created})")
+    for name in diff['changed']:
+        click.echo(f"~ {name} (definición distinta, {'por recrear' if dry_run else 'recreado'})")
+    for name in diff['obsolete']:
+        suffix = 'se conserva' if not dry_run and not drop_obsolete else dropped
+        click.echo(f"- {name} (obsoleto, {suffix})")
+
+
+@indexes_cli.command('sync')
+@click.option('--dry-run', is_flag=True, help='Solo muestra la diferencia')
+@click.option('--keep-obsolete', is_flag=True, help='No elimina los índices no declarados')
+def sync_player_indexes(dry_run, keep_obsolete):
+    """
+    Crea los índices que faltan o cambiaron, elimina los obsoletos y calcula
+    searchTerms de los jugadores que no lo tienen
+    """
+    from app.utils.database import get_db
+    from app.utils.indexes import backfill_search_terms, sync_indexes
+    
+    diff = sync_indexes(get_db().players, drop_obsolete=not keep_obsolete, dry_run=dry_run)
+    _echo_diff(diff, dry_run, not keep_obsolete)
+    if not dry_run:
+        updated = backfill_search_terms(get_db().players)
+        click.echo(f"searchTerms calculado para {updated} jugadores")
+
+
+@indexes_cli.command('check')
+def check_player_indexes():
+    """Termina con código 1 si los índices no coinciden con los declarados"""
+    from app.utils.database import get_db
+    from app.utils.indexes import index_diff
+    
+    diff = index_diff(get_db().players)
+    _echo_diff(diff, dry_run=True, drop_obsolete=True)
+    if diff['missing'] or diff['changed'] or diff['obsolete']:
+        raise SystemExit(1)
+
+
+def register_cli(app):
+    """
+    Registra los comandos de mantenimiento en la aplicación
+    """
+    app.cli.add_command(search_cli)
+    app.cli.add_command(indexes_cli)
@@ -2,10 +2,29 @@
 Configuración de la aplicación Flask
 """
 import os
-from dotenv import load_dotenv
 
-# Cargar variables de entorno
-load_dotenv('.env.development')
+# Archivo de variables de desarrollo, junto a run.py
+ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env.development')
+
+
+def load_env_file():
+    """
+    Carga .env.development (sin pisar variables ya definidas) salvo con
+    FLASK_ENV=production, donde todo viene del entorno y no se importa dotenv
+    
+    Se llama al importar este módulo, antes de leer las variables: así lo
+    cargan todos los puntos de entrada que usan la configuración (run.py,
+    run_async.py, `flask players-indexes`, benchmarks) sin repetirlo ni
+    depender del directorio actual
+    """
+    if os.getenv('FLASK_ENV', 'development') == 'production':
+        return False
+    from dotenv import load_dotenv
+    return load_dotenv(ENV_FILE)
+
+
+load_env_file()
+
 
 class Config:
     """Configuración base"""
@@ -22,6 +41,33 @@ class Config:
     # URI de MongoDB
     MONGO_URI = f"mongodb://{MONGO_USERNAME}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}/{MONGO_DATABASE}?authSource={MONGO_AUTH_SOURCE}"
     
+    # Conectar a MongoDB (y arrancar el change stream) al crear la app. Con
+    # gunicorn y preload_app es False: cada worker conecta en post_fork
+    MONGO_CONNECT_ON_STARTUP = os.getenv('MONGO_CONNECT_ON_STARTUP', 'True') == 'True'
+    
+    # Índices al arrancar: verify (solo comprobar), sync (crear los que faltan)
+    # u off. En producción se sincronizan con `flask players-indexes sync`
+    MONGO_INDEXES_ON_STARTUP = os.getenv('MONGO_INDEXES_ON_STARTUP', 'verify')
+    
+    # Pool de conexiones de MongoDB (sin valor: el por defecto de pymongo)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS')) if os.getenv('MONGO_MAX_IDLE_TIME_MS') else None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS')) if os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS') else None
+    
+    # Compresión de red, en orden de preferencia (p. ej. 'zstd,snappy,zlib');
+    # zstd necesita el paquete zstandard y snappy python-snappy
+    MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')
+    
+    # Lecturas de solo consulta (listados, jugador, plantilla, búsqueda, líderes):
+    # primary, primaryPreferred, secondary, secondaryPreferred o nearest.
+    # Las escrituras y las versiones de los ETags van siempre al primario.
+    # Por defecto primary: leer de secundarios se activa por entorno y hace
+    # que la caché use PLAYER_CACHE_TTL en lugar de PLAYER_CACHE_COHERENT_TTL
+    MONGO_READ_PREFERENCE = os.getenv('MONGO_READ_PREFERENCE', 'primary')
+    # Desfase máximo de un secundario para leer de él (mínimo 90; 0 sin límite)
+    MONGO_MAX_STALENESS_SECONDS = int(os.getenv('MONGO_MAX_STALENESS_SECONDS', 90))
+    
     # Flask
     PORT = int(os.getenv('PORT', 5002))
     DEBUG = os.getenv('FLASK_DEBUG', 'True') == 'True'
@@ -29,16 +75,74 @@ class Config:
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:4200').split(',')
     
+    # Paginación por cursor (GET /api/players y /api/players/team/<id>)
+    PLAYERS_DEFAULT_PAGE_SIZE = int(os.getenv('PLAYERS_DEFAULT_PAGE_SIZE', 50))
+    PLAYERS_MAX_PAGE_SIZE = int(os.getenv('PLAYERS_MAX_PAGE_SIZE', 500))
+    
+    # Rankings de líderes (GET /api/players/leaders)
+    PLAYERS_LEADERS_DEFAULT_LIMIT = int(os.getenv('PLAYERS_LEADERS_DEFAULT_LIMIT', 10))
+    PLAYERS_LEADERS_MAX_LIMIT = int(os.getenv('PLAYERS_LEADERS_MAX_LIMIT', 100))
+    
+    # Búsqueda por nombre (GET /api/players/search)
+    PLAYERS_SEARCH_DEFAULT_LIMIT = int(os.getenv('PLAYERS_SEARCH_DEFAULT_LIMIT', 10))
+    PLAYERS_SEARCH_MAX_LIMIT = int(os.getenv('PLAYERS_SEARCH_MAX_LIMIT', 50))
+    
+    # Exportación en streaming (NDJSON): documentos por lote del cursor de MongoDB
+    PLAYERS_STREAM_BATCH_SIZE = int(os.getenv('PLAYERS_STREAM_BATCH_SIZE', 500))
+    
+    # Máximo de elementos por petición en POST /api/players/bulk y PUT /api/players/stats/bulk
+    PLAYERS_BULK_MAX_ITEMS = int(os.getenv('PLAYERS_BULK_MAX_ITEMS', 1000))
+    
+    # Caché en memoria de jugadores por ID (por worker); tamaño 0 la desactiva
+    PLAYER_CACHE_SIZE = int(os.getenv('PLAYER_CACHE_SIZE', 1024))
+    PLAYER_CACHE_TTL = float(os.getenv('PLAYER_CACHE_TTL', 30))
+    
+    # Change stream de players para invalidar las cachés de todos los workers.
+    # Con el stream activo las cachés usan PLAYER_CACHE_COHERENT_TTL; sin él
+    # (p. ej. MongoDB standalone) o si las lecturas pueden ir a secundarios
+    # (MONGO_READ_PREFERENCE distinta de primary) se usa PLAYER_CACHE_TTL
+    PLAYER_CHANGE_STREAM_ENABLED = os.getenv('PLAYER_CHANGE_STREAM_ENABLED', 'True') == 'True'
+    PLAYER_CACHE_COHERENT_TTL = float(os.getenv('PLAYER_CACHE_COHERENT_TTL', 600))
+    PLAYER_CHANGE_STREAM_RETRY_DELAY = float(os.getenv('PLAYER_CHANGE_STREAM_RETRY_DELAY', 5))
+    
+    # Cabecera Server-Timing y log de peticiones lentas (0 lo desactiva)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'True') == 'True'
+    SLOW_REQUEST_THRESHOLD_MS = float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', 500))
+    
+    # Formato de las fechas en las respuestas JSON: iso, iso-utc o epoch-ms
+    JSON_DATETIME_FORMAT = os.getenv('JSON_DATETIME_FORMAT', 'iso')
+    
+    # Compresión br/gzip de respuestas JSON desde COMPRESSION_MIN_SIZE bytes
+    # (br solo si está instalado el paquete brotli)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True') == 'True'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_MIMETYPES = ('application/json',)
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+    # Respuestas comprimidas guardadas por ETag (0 desactiva la caché)
+    COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', 64))
+    COMPRESSION_CACHE_TTL = float(os.getenv('COMPRESSION_CACHE_TTL', 300))
+    
     # Servicios externos
     TEAMS_SERVICE_URL = os.getenv('TEAMS_SERVICE_URL', 'http://localhost:5001/api/teams')
     MATCHES_SERVICE_URL = os.getenv('MATCHES_SERVICE_URL', 'http://localhost:5004/api/matches')
     REPORT_SERVICE_URL = os.getenv('REPORT_SERVICE_URL', 'http://localhost:5003/api/reports')
+    
+    # Verificación de equipos contra el teams-service
+    TEAMS_SERVICE_TIMEOUT = float(os.getenv('TEAMS_SERVICE_TIMEOUT', 5))
+    TEAMS_SERVICE_CONNECT_TIMEOUT = float(os.getenv('TEAMS_SERVICE_CONNECT_TIMEOUT', 1))
+    TEAMS_SERVICE_POOL_SIZE = int(os.getenv('TEAMS_SERVICE_POOL_SIZE', 10))
+    TEAMS_CACHE_TTL = float(os.getenv('TEAMS_CACHE_TTL', 300))
+    TEAMS_NEGATIVE_CACHE_TTL = float(os.getenv('TEAMS_NEGATIVE_CACHE_TTL', 30))
+    TEAMS_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('TEAMS_CIRCUIT_FAILURE_THRESHOLD', 5))
+    TEAMS_CIRCUIT_RESET_TIMEOUT = float(os.getenv('TEAMS_CIRCUIT_RESET_TIMEOUT', 30))
 
 
 class DevelopmentConfig(Config):
     """Configuración de desarrollo"""
     DEBUG = True
     TESTING = False
+    MONGO_INDEXES_ON_STARTUP = os.getenv('MONGO_INDEXES_ON_STARTUP', 'sync')
 
 
 class ProductionConfig(Config):
@@ -51,6 +155,8 @@ class TestingConfig(Config):
     """Configuración de testing"""
     TESTING = True
     MONGO_DATABASE = 'players_service_db_test'
+    MONGO_INDEXES_ON_STARTUP = 'sync'
+    PLAYER_CHANGE_STREAM_ENABLED = False
 
 
 config_by_name = {
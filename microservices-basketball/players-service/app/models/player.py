@@ -3,7 +3,189 @@ Modelo de Jugador para MongoDB
 """
 from datetime import datetime
 from bson import ObjectId
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+import unicodedata
+
+# Campos de MongoDB de los que puede salir el nombre (nombre/apellidos o nombreCompleto)
+_NAME_SOURCES = ('nombre', 'apellidos', 'nombreCompleto')
+
+# Campos de la respuesta (to_dict) y campos de MongoDB necesarios para construirlos
+RESPONSE_FIELD_SOURCES = {
+    '_id': ('_id',),
+    'nombre': _NAME_SOURCES,
+    'apellidos': _NAME_SOURCES,
+    'nombreCompleto': _NAME_SOURCES,
+    'fechaNacimiento': ('fechaNacimiento',),
+    'edad': ('edad',),
+    'posicion': ('posicion',),
+    'numeroCamiseta': ('numeroCamiseta', 'numero'),
+    'numero': ('numeroCamiseta', 'numero'),
+    'altura': ('altura', 'estatura'),
+    'estatura': ('altura', 'estatura'),
+    'peso': ('peso',),
+    'nacionalidad': ('nacionalidad',),
+    'foto': ('foto',),
+    'equipoId': ('equipoId',),
+    'equipoNombre': ('equipoNombre',),
+    'estadisticas': ('estadisticas',),
+    'activo': ('activo', 'isActivo'),
+    'isActivo': ('activo', 'isActivo'),
+    'createdAt': ('createdAt',),
+    'updatedAt': ('updatedAt',),
+}
+
+
+# Totales acumulados por partido y el promedio de estadisticas que se deriva de cada uno
+GAME_TOTAL_AVERAGES = {
+    'puntos': 'promedioAnotaciones',
+    'rebotes': 'promedioRebotes',
+    'asistencias': 'promedioAsistencias',
+    'robos': 'promedioRobos',
+    'bloqueos': 'promedioBloqueos',
+    'minutos': 'promedioMinutos',
+}
+
+# Porcentajes de tiro de estadisticas y los totales (anotados, intentados) de los que salen
+GAME_SHOOTING_PERCENTAGES = {
+    'porcentajeTirosCampo': ('tirosCampoAnotados', 'tirosCampoIntentados'),
+    'porcentajeTiros3Puntos': ('triplesAnotados', 'triplesIntentados'),
+    'porcentajeTirosLibres': ('tirosLibresAnotados', 'tirosLibresIntentados'),
+}
+
+
+# Estadísticas por las que se puede pedir un ranking de líderes (GET /api/players/leaders)
+LEADERBOARD_STATS = (
+    'promedioAnotaciones',
+    'promedioRebotes',
+    'promedioAsistencias',
+    'promedioRobos',
+    'promedioBloqueos',
+    'promedioMinutos',
+    'porcentajeTirosCampo',
+    'porcentajeTiros3Puntos',
+    'porcentajeTirosLibres',
+)
+
+
+def normalize_search_text(text: Optional[str]) -> str:
+    """
+    Texto para búsqueda: sin acentos, en minúsculas y con espacios simples
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(without_accents.lower().split())
+
+
+def search_terms(nombre: Optional[str], apellidos: Optional[str]) -> List[str]:
+    """
+    Claves de búsqueda por prefijo de un jugador: el nombre completo normalizado
+    y cada sufijo por palabras ("juan perez garcia", "perez garcia", "garcia"),
+    de modo que un prefijo de nombre, apellidos o nombreCompleto coincide con
+    el inicio de alguna clave
+    """
+    words = normalize_search_text(f"{nombre or ''} {apellidos or ''}").split()
+    return [' '.join(words[i:]) for i in range(len(words))]
+
+
+def _split_name(doc: Dict) -> Tuple[str, str]:
+    """Obtiene (nombre, apellidos) de un documento, usando nombreCompleto si hace falta"""
+    nombre = doc.get('nombre', '')
+    apellidos = doc.get('apellidos', '')
+    if not (nombre or apellidos):
+        completo = doc.get('nombreCompleto')
+        if completo:
+            partes = completo.split(' ', 1)
+            nombre = partes[0]
+            apellidos = partes[1] if len(partes) > 1 else ''
+    return nombre, apellidos
+
+
+def _full_name(doc: Dict) -> str:
+    nombre, apellidos = _split_name(doc)
+    return f"{nombre} {apellidos}".strip()
+
+
+def _activo(doc: Dict):
+    activo = doc.get('activo')
+    return activo if activo is not None else doc.get('isActivo', True)
+
+
+# Constructores de cada campo de la respuesta directamente desde el documento
+_DOC_GETTERS = {
+    '_id': lambda d: d.get('_id') or None,
+    'nombre': lambda d: _split_name(d)[0],
+    'apellidos': lambda d: _split_name(d)[1],
+    'nombreCompleto': _full_name,
+    'fechaNacimiento': lambda d: d.get('fechaNacimiento'),
+    'edad': lambda d: d.get('edad'),
+    'posicion': lambda d: d.get('posicion', ''),
+    'numeroCamiseta': lambda d: d.get('numeroCamiseta') or d.get('numero'),
+    'numero': lambda d: d.get('numeroCamiseta') or d.get('numero'),
+    'altura': lambda d: d.get('altura') or d.get('estatura') or 0.0,
+    'estatura': lambda d: d.get('altura') or d.get('estatura') or 0.0,
+    'peso': lambda d: d.get('peso', 0.0),
+    'nacionalidad': lambda d: d.get('nacionalidad', ''),
+    'foto': lambda d: d.get('foto', ''),
+    'equipoId': lambda d: d.get('equipoId'),
+    'equipoNombre': lambda d: d.get('equipoNombre', ''),
+    'estadisticas': lambda d: d.get('estadisticas', {}),
+    'activo': _activo,
+    'isActivo': _activo,
+    'createdAt': lambda d: d.get('createdAt'),
+    'updatedAt': lambda d: d.get('updatedAt'),
+}
+
+
+def serialize_player(doc: Dict, fields: Iterable[str] = None) -> Optional[Dict]:
+    """
+    Convierte un documento de MongoDB directamente al diccionario de respuesta,
+    sin construir un Player intermedio
+    
+    Produce lo mismo que Player.from_mongo(doc).to_dict(fields), salvo que
+    createdAt/updatedAt ausentes se devuelven como None en lugar de la hora actual.
+    _id, las fechas y fechaNacimiento quedan como ObjectId/datetime/date: los
+    convierte el proveedor JSON de la app (JSON_DATETIME_FORMAT)
+    """
+    if doc is None:
+        return None
+    
+    if fields is not None:
+        return {name: _DOC_GETTERS[name](doc) for name in fields}
+    
+    get = doc.get
+    nombre, apellidos = _split_name(doc)
+    numero = get('numeroCamiseta') or get('numero')
+    altura = get('altura') or get('estatura') or 0.0
+    activo = get('activo')
+    if activo is None:
+        activo = get('isActivo', True)
+    
+    return {
+        '_id': get('_id') or None,
+        'nombre': nombre,
+        'apellidos': apellidos,
+        'nombreCompleto': f"{nombre} {apellidos}".strip(),
+        'fechaNacimiento': get('fechaNacimiento'),
+        'edad': get('edad'),
+        'posicion': get('posicion', ''),
+        'numeroCamiseta': numero,
+        'numero': numero,  # Alias para frontend
+        'altura': altura,
+        'estatura': altura,  # Alias para frontend
+        'peso': get('peso', 0.0),
+        'nacionalidad': get('nacionalidad', ''),
+        'foto': get('foto', ''),
+        'equipoId': get('equipoId'),
+        'equipoNombre': get('equipoNombre', ''),
+        'estadisticas': get('estadisticas', {}),
+        'activo': activo,
+        'isActivo': activo,  # Alias para frontend Angular
+        'createdAt': get('createdAt'),
+        'updatedAt': get('updatedAt')
+    }
+
 
 class Player:
     """Modelo de Jugador"""
@@ -45,31 +227,66 @@ class Player:
         self.createdAt = data.get('createdAt', datetime.utcnow())
         self.updatedAt = data.get('updatedAt', datetime.utcnow())
     
-    def to_dict(self) -> Dict:
-        """Convierte el modelo a diccionario"""
-        return {
-            '_id': str(self._id) if self._id else None,
-            'nombre': self.nombre,
-            'apellidos': self.apellidos,
-            'nombreCompleto': f"{self.nombre} {self.apellidos}".strip(),
-            'fechaNacimiento': self.fechaNacimiento,
-            'edad': self.edad,
-            'posicion': self.posicion,
-            'numeroCamiseta': self.numeroCamiseta,
-            'numero': self.numeroCamiseta,  # Alias para frontend
-            'altura': self.altura,
-            'estatura': self.altura,  # Alias para frontend
-            'peso': self.peso,
-            'nacionalidad': self.nacionalidad,
-            'foto': self.foto,
-            'equipoId': self.equipoId,
-            'equipoNombre': self.equipoNombre,
-            'estadisticas': self.estadisticas,
-            'activo': self.activo,
-            'isActivo': self.activo,  # Alias para frontend Angular
-            'createdAt': self.createdAt.isoformat() if isinstance(self.createdAt, datetime) else self.createdAt,
-            'updatedAt': self.updatedAt.isoformat() if isinstance(self.updatedAt, datetime) else self.updatedAt
-        }
+    _FIELD_GETTERS = {
+        '_id': lambda p: p._id or None,
+        'nombre': lambda p: p.nombre,
+        'apellidos': lambda p: p.apellidos,
+        'nombreCompleto': lambda p: f"{p.nombre} {p.apellidos}".strip(),
+        'fechaNacimiento': lambda p: p.fechaNacimiento,
+        'edad': lambda p: p.edad,
+        'posicion': lambda p: p.posicion,
+        'numeroCamiseta': lambda p: p.numeroCamiseta,
+        'numero': lambda p: p.numeroCamiseta,  # Alias para frontend
+        'altura': lambda p: p.altura,
+        'estatura': lambda p: p.altura,  # Alias para frontend
+        'peso': lambda p: p.peso,
+        'nacionalidad': lambda p: p.nacionalidad,
+        'foto': lambda p: p.foto,
+        'equipoId': lambda p: p.equipoId,
+        'equipoNombre': lambda p: p.equipoNombre,
+        'estadisticas': lambda p: p.estadisticas,
+        'activo': lambda p: p.activo,
+        'isActivo': lambda p: p.activo,  # Alias para frontend Angular
+        'createdAt': lambda p: p.createdAt,
+        'updatedAt': lambda p: p.updatedAt,
+    }
+    
+    def to_dict(self, fields: Iterable[str] = None) -> Dict:
+        """
+        Convierte el modelo a diccionario
+        
+        Si se indica fields, solo se construyen esos campos de la respuesta
+        """
+        getters = self._FIELD_GETTERS
+        if fields is None:
+            fields = getters
+        return {name: getters[name](self) for name in fields}
+    
+    @staticmethod
+    def parse_fields(fields_param: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """
+        Convierte el query param fields ("nombre,apellidos") en la tupla de
+        campos de la respuesta. _id siempre se incluye
+        """
+        if not fields_param:
+            return None
+        
+        fields = ['_id']
+        for name in fields_param.split(','):
+            name = name.strip()
+            if not name or name in fields:
+                continue
+            if name not in RESPONSE_FIELD_SOURCES:
+                raise ValueError(f"Campo desconocido: {name}")
+            fields.append(name)
+        return tuple(fields)
+    
+    @staticmethod
+    def projection(fields: Optional[Iterable[str]]) -> Optional[Dict]:
+        """Proyección de MongoDB con los campos necesarios para construir fields"""
+        if fields is None:
+            return None
+        return {source: 1 for name in fields for source in RESPONSE_FIELD_SOURCES[name]}
     
     def to_mongo(self) -> Dict:
         """Convierte el modelo a formato MongoDB (sin _id si es None)"""
@@ -88,6 +305,7 @@ class Player:
             'equipoNombre': self.equipoNombre,
             'estadisticas': self.estadisticas or self._default_stats(),
             'activo': self.activo,
+            'searchTerms': search_terms(self.nombre, self.apellidos),
             'createdAt': self.createdAt,
             'updatedAt': self.updatedAt
         }
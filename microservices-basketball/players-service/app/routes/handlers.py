@@ -0,0 +1,507 @@
+"""
+Lógica de las rutas de jugadores compartida por la app Flask y la Quart
+
+Parámetros, ETags, cuerpos, códigos de estado y mensajes de error se escriben
+una sola vez. Cada handler es un generador con este protocolo:
+
+- Toda llamada de E/S (métodos del servicio de jugadores y
+  request.get_json()) se hace con yield: `valor = yield llamada(...)`. Con el
+  servicio síncrono lo que se cede ya es el valor y run_sync lo devuelve tal
+  cual; con el asíncrono es una corrutina que run_async espera
+- Si la llamada falla, run_async lanza la excepción en el yield (throw), así
+  que los try/except del handler la tratan igual en los dos modos
+- El handler termina con return de lo que devolvería una vista (cuerpo y
+  estado o una respuesta); run_sync/run_async lo devuelven a la ruta
+- Fuera de los yield no se hace E/S ni se usa nada propio de un framework:
+  request y app son los proxies que recibe PlayerHandlers y la respuesta en
+  streaming la construye stream_players
+"""
+from marshmallow import ValidationError
+from app.utils.http_cache import compute_etag, is_not_modified, not_modified_response, with_etag
+from app.utils.timing import phase
+from app.utils.request_params import (
+    bulk_payload_error,
+    bulk_status,
+    load_many,
+    parse_fields,
+    parse_filters,
+    parse_leaders,
+    parse_pagination,
+    parse_search_limit,
+    wants_stream
+)
+from app.schemas.player_schema import (
+    PlayerCreateSchema,
+    PlayerUpdateSchema,
+    StatsUpdateSchema,
+    GameStatsSchema
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Schemas
+create_schema = PlayerCreateSchema()
+update_schema = PlayerUpdateSchema()
+stats_schema = StatsUpdateSchema()
+bulk_create_schema = PlayerCreateSchema(many=True)
+bulk_stats_schema = StatsUpdateSchema(many=True)
+game_stats_schema = GameStatsSchema()
+
+
+def run_sync(handler):
+    """Ejecuta un handler con E/S síncrona: cada yield ya trae su valor"""
+    value = None
+    while True:
+        try:
+            value = handler.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+
+async def run_async(handler):
+    """
+    Ejecuta un handler con E/S asíncrona: espera cada corrutina y le devuelve
+    el resultado (o le lanza la excepción, para que la trate su try/except)
+    """
+    value, error = None, None
+    while True:
+        try:
+            awaitable = handler.throw(error) if error is not None else handler.send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = await awaitable, None
+        except Exception as e:
+            value, error = None, e
+
+
+def _error(message, status, details=None, error=None):
+    """
+    Cuerpo de error: {success, error} más details (validación) o message
+    (error genérico de la ruta con el detalle de la excepción)
+    """
+    body = {'success': False, 'error': error or message}
+    if details is not None:
+        body['details'] = details
+    elif error is not None:
+        body['message'] = message
+    return body, status
+
+
+def _not_found():
+    return _error('Jugador no encontrado', 404)
+
+
+class PlayerHandlers:
+    """
+    Handlers de /api/players para una app concreta
+    
+    request y app son los proxies de la petición y la aplicación del framework
+    (Flask o Quart); stream_players construye la respuesta NDJSON, que es lo
+    único que depende de cómo se itera el cursor
+    """
+    
+    def __init__(self, player_service, request, app, stream_players):
+        self.player_service = player_service
+        self.request = request
+        self.app = app
+        self.stream_players = stream_players
+    
+    def _json(self, body, etag: str):
+        """Respuesta JSON con ETag (el resto de cuerpos los serializa la app)"""
+        return with_etag(self.app.json.response(body), etag)
+    
+    def _not_modified(self, etag: str):
+        """Respuesta 304 si If-None-Match coincide con etag; None si no"""
+        if is_not_modified(etag, self.request):
+            return not_modified_response(etag, self.app.response_class)
+        return None
+    
+    def _server_error(self, e: Exception, error: str):
+        logger.error(f"Error en {self.request.method} {self.request.path}: {str(e)}")
+        return _error(str(e), 500, error=error)
+    
+    def get_all_players(self):
+        try:
+            # Filtros desde query params
+            filters = parse_filters(self.request.args)
+            fields = parse_fields(self.request.args)
+            
+            if wants_stream(self.request.args, self.request.accept_mimetypes):
+                return self.stream_players(filters, fields)
+            
+            limit, cursor = parse_pagination(self.request.args, self.app.config)
+            
+            if limit is not None:
+                players, next_cursor = yield self.player_service.get_players_page(
+                    filters, limit, cursor, fields
+                )
+                return {
+                    'success': True,
+                    'count': len(players),
+                    'data': players,
+                    'nextCursor': next_cursor
+                }, 200
+            
+            players = yield self.player_service.get_all_players(filters, fields)
+            
+            return {
+                'success': True,
+                'count': len(players),
+                'data': players
+            }, 200
+            
+        except ValueError as e:
+            logger.warning(f"Parámetros inválidos: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error obteniendo jugadores')
+    
+    def get_leaders(self):
+        try:
+            stat, limit, team_id = parse_leaders(self.request.args, self.app.config)
+            
+            leaders = yield self.player_service.get_leaders(stat, limit, team_id)
+            
+            return {
+                'success': True,
+                'stat': stat,
+                'equipoId': team_id,
+                'count': len(leaders),
+                'data': leaders
+            }, 200
+            
+        except ValueError as e:
+            logger.warning(f"Parámetros inválidos: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error obteniendo líderes')
+    
+    def search_players(self):
+        try:
+            limit = parse_search_limit(self.request.args, self.app.config)
+            
+            players = yield self.player_service.search_players(
+                self.request.args.get('q', ''), limit, parse_fields(self.request.args)
+            )
+            
+            return {
+                'success': True,
+                'count': len(players),
+                'data': players
+            }, 200
+            
+        except ValueError as e:
+            logger.warning(f"Parámetros inválidos: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error buscando jugadores')
+    
+    def get_player(self, player_id):
+        try:
+            fields = parse_fields(self.request.args)
+            
+            # El ETag sale del mismo documento que se devuelve
+            found = yield self.player_service.get_player_with_version(player_id, fields)
+            if found is None:
+                return _not_found()
+            
+            player, version = found
+            etag = compute_etag(*version, self.request.query_string)
+            not_modified = self._not_modified(etag)
+            if not_modified is not None:
+                return not_modified
+            
+            return self._json({
+                'success': True,
+                'data': player
+            }, etag), 200
+            
+        except ValueError as e:
+            logger.warning(f"Parámetros inválidos: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error obteniendo jugador')
+    
+    def get_players_by_team(self, team_id):
+        try:
+            fields = parse_fields(self.request.args)
+            
+            if wants_stream(self.request.args, self.request.accept_mimetypes):
+                return self.stream_players({'equipoId': team_id}, fields)
+            
+            limit, cursor = parse_pagination(self.request.args, self.app.config)
+            
+            # La versión se consulta antes de leer los jugadores
+            count, last_update = yield self.player_service.get_roster_version(team_id)
+            etag = compute_etag('team', team_id, count, last_update, self.request.query_string)
+            not_modified = self._not_modified(etag)
+            if not_modified is not None:
+                return not_modified
+            
+            if limit is not None:
+                players, next_cursor = yield self.player_service.get_players_page(
+                    {'equipoId': team_id}, limit, cursor, fields, primary=True
+                )
+                return self._json({
+                    'success': True,
+                    'teamId': team_id,
+                    'count': len(players),
+                    'data': players,
+                    'nextCursor': next_cursor
+                }, etag), 200
+            
+            players = yield self.player_service.get_players_by_team(
+                team_id, fields, (count, last_update)
+            )
+            
+            return self._json({
+                'success': True,
+                'teamId': team_id,
+                'count': len(players),
+                'data': players
+            }, etag), 200
+            
+        except ValueError as e:
+            logger.warning(f"Parámetros inválidos: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error obteniendo jugadores del equipo')
+    
+    def create_player(self):
+        try:
+            payload = yield self.request.get_json()
+            
+            # Validar datos
+            with phase('validate'):
+                data = create_schema.load(payload)
+            
+            # Crear jugador
+            teams_url = self.app.config.get('TEAMS_SERVICE_URL')
+            player = yield self.player_service.create_player(data, teams_url)
+            
+            return {
+                'success': True,
+                'message': 'Jugador creado exitosamente',
+                'data': player
+            }, 201
+            
+        except ValidationError as e:
+            logger.warning(f"Error de validación: {e.messages}")
+            return _error('Datos inválidos', 400, details=e.messages)
+            
+        except ValueError as e:
+            logger.warning(f"Error de negocio: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error creando jugador')
+    
+    def create_players_bulk(self):
+        try:
+            payload = yield self.request.get_json()
+            error = bulk_payload_error(payload, self.app.config, 'jugadores', 'jugadores')
+            if error:
+                return _error(error, 400)
+            
+            # Validar todos; los elementos con errores se reportan individualmente
+            with phase('validate'):
+                valid_data, errors = load_many(bulk_create_schema, payload)
+            
+            entries = [
+                (index, data) for index, data in enumerate(valid_data)
+                if index not in errors
+            ]
+            
+            teams_url = self.app.config.get('TEAMS_SERVICE_URL')
+            results = yield self.player_service.create_players_bulk(entries, teams_url)
+            
+            results.extend(
+                {'index': index, 'success': False, 'error': 'Datos inválidos', 'details': details}
+                for index, details in errors.items()
+            )
+            results.sort(key=lambda result: result['index'])
+            
+            created = sum(1 for result in results if result['success'])
+            
+            return {
+                'success': created == len(payload),
+                'message': f'{created} de {len(payload)} jugadores creados',
+                'created': created,
+                'failed': len(payload) - created,
+                'results': results
+            }, bulk_status(created, len(payload))
+            
+        except Exception as e:
+            return self._server_error(e, 'Error creando jugadores')
+    
+    def update_player(self, player_id):
+        try:
+            payload = yield self.request.get_json()
+            
+            # Validar datos
+            with phase('validate'):
+                data = update_schema.load(payload)
+            
+            player = yield self.player_service.update_player(player_id, data)
+            if not player:
+                return _not_found()
+            
+            return {
+                'success': True,
+                'message': 'Jugador actualizado exitosamente',
+                'data': player
+            }, 200
+            
+        except ValidationError as e:
+            logger.warning(f"Error de validación: {e.messages}")
+            return _error('Datos inválidos', 400, details=e.messages)
+            
+        except ValueError as e:
+            logger.warning(f"Error de negocio: {str(e)}")
+            return _error(str(e), 400)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error actualizando jugador')
+    
+    def delete_player(self, player_id):
+        try:
+            success = yield self.player_service.delete_player(player_id)
+            if not success:
+                return _not_found()
+            
+            return {
+                'success': True,
+                'message': 'Jugador eliminado exitosamente'
+            }, 200
+            
+        except Exception as e:
+            return self._server_error(e, 'Error eliminando jugador')
+    
+    def get_player_stats(self, player_id):
+        try:
+            player = yield self.player_service.get_player_by_id(
+                player_id, self.player_service.STATS_FIELDS
+            )
+            if not player:
+                return _not_found()
+            
+            return {
+                'success': True,
+                'playerId': player_id,
+                'nombre': f"{player['nombre']} {player['apellidos']}",
+                'data': player.get('estadisticas', {})
+            }, 200
+            
+        except Exception as e:
+            return self._server_error(e, 'Error obteniendo estadísticas')
+    
+    def update_player_stats(self, player_id):
+        try:
+            payload = yield self.request.get_json()
+            
+            # Validar datos
+            with phase('validate'):
+                stats = stats_schema.load(payload)
+            
+            player = yield self.player_service.update_player_stats(player_id, stats)
+            if not player:
+                return _not_found()
+            
+            return {
+                'success': True,
+                'message': 'Estadísticas actualizadas exitosamente',
+                'data': player
+            }, 200
+            
+        except ValidationError as e:
+            logger.warning(f"Error de validación: {e.messages}")
+            return _error('Datos inválidos', 400, details=e.messages)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error actualizando estadísticas')
+    
+    def record_game_stats(self, player_id):
+        try:
+            payload = yield self.request.get_json()
+            
+            # Validar datos
+            with phase('validate'):
+                game = game_stats_schema.load(payload)
+            
+            player = yield self.player_service.record_game_stats(player_id, game)
+            if not player:
+                return _not_found()
+            
+            return {
+                'success': True,
+                'message': 'Partido registrado exitosamente',
+                'data': player
+            }, 200
+            
+        except ValidationError as e:
+            logger.warning(f"Error de validación: {e.messages}")
+            return _error('Datos inválidos', 400, details=e.messages)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error registrando partido')
+    
+    def update_stats_bulk(self):
+        try:
+            payload = yield self.request.get_json()
+            error = bulk_payload_error(
+                payload, self.app.config, '{playerId, stats}', 'actualizaciones de estadísticas'
+            )
+            if error:
+                return _error(error, 400)
+            
+            if not all(isinstance(entry, dict) and entry.get('playerId') for entry in payload):
+                return _error('Cada elemento debe tener playerId y stats', 400)
+            
+            # Validar todas las estadísticas de una vez
+            with phase('validate'):
+                stats_list, errors = load_many(
+                    bulk_stats_schema, [entry.get('stats') or {} for entry in payload]
+                )
+            
+            entries = [
+                (index, entry['playerId'], stats_list[index])
+                for index, entry in enumerate(payload)
+                if index not in errors
+            ]
+            
+            include_players = self.request.args.get('includePlayers', '').lower() == 'true'
+            results, players = yield self.player_service.update_stats_bulk(entries, include_players)
+            
+            results.extend(
+                {
+                    'index': index,
+                    'playerId': payload[index]['playerId'],
+                    'success': False,
+                    'error': 'Datos inválidos',
+                    'details': details
+                }
+                for index, details in errors.items()
+            )
+            results.sort(key=lambda result: result['index'])
+            
+            updated = sum(1 for result in results if result['success'])
+            response = {
+                'success': updated == len(payload),
+                'updated': updated,
+                'failed': len(payload) - updated,
+                'results': results
+            }
+            if players is not None:
+                response['data'] = players
+            
+            return response, bulk_status(updated, len(payload), 200)
+            
+        except Exception as e:
+            return self._server_error(e, 'Error actualizando estadísticas')
@@ -3,6 +3,8 @@ Blueprint para health check
 """
 from flask import Blueprint, jsonify
 from app.utils.database import get_db
+from app.utils.cache import get_player_cache
+from app.services.teams_client import get_teams_client
 from datetime import datetime
 
 health_bp = Blueprint('health', __name__)
@@ -22,6 +24,8 @@ def health_check():
             'service': 'players-service',
             'timestamp': datetime.utcnow().isoformat(),
             'database': 'connected',
+            'cache': get_player_cache().stats(),
+            'teamsService': get_teams_client().stats(),
             'version': '1.0.0'
         }), 200
         
@@ -0,0 +1,15 @@
+"""
+Blueprint para métricas Prometheus
+"""
+from flask import Blueprint, Response
+from app.utils.metrics import render_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Endpoint de métricas en formato de texto de Prometheus
+    """
+    data, content_type = render_metrics()
+    return Response(data, mimetype=content_type.split(';')[0], content_type=content_type)
@@ -1,27 +1,32 @@
 """
 Blueprint para endpoints de jugadores
+
+La lógica de cada ruta está en app/routes/handlers.py, compartida con el
+modo ASGI; aquí solo se ejecuta con el servicio síncrono
 """
-from flask import Blueprint, request, jsonify, current_app
-from marshmallow import ValidationError
+from flask import Blueprint, Response, request, current_app, stream_with_context
+from app.routes.handlers import PlayerHandlers, run_sync
 from app.services.player_service import PlayerService
-from app.schemas.player_schema import (
-    PlayerCreateSchema,
-    PlayerUpdateSchema,
-    PlayerResponseSchema,
-    StatsUpdateSchema
-)
-import logging
-
-logger = logging.getLogger(__name__)
-
+from app.utils.request_params import NDJSON_MIMETYPE
 players_bp = Blueprint('players', __name__)
 player_service = PlayerService()
 
-# Schemas
-create_schema = PlayerCreateSchema()
-update_schema = PlayerUpdateSchema()
-response_schema = PlayerResponseSchema()
-stats_schema = StatsUpdateSchema()
+
+def _stream_players(filters, fields=None):
+    """
+    Respuesta NDJSON: un jugador serializado por línea, enviado a medida que
+    se lee el cursor de MongoDB
+    """
+    batch_size = current_app.config['PLAYERS_STREAM_BATCH_SIZE']
+    
+    def generate():
+        for player in player_service.iter_players(filters, batch_size, fields):
+            yield current_app.json.dumps(player) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+handlers = PlayerHandlers(player_service, request, current_app, _stream_players)
 
 
 @players_bp.route('', methods=['GET'])
@@ -29,34 +34,30 @@ def get_all_players():
     """
     GET /api/players
     Obtiene todos los jugadores con filtros opcionales
-    Query params: equipoId, activo, posicion
+    Query params: equipoId, activo, posicion, limit, cursor, stream, fields
+    """
+    return run_sync(handlers.get_all_players())
+
+
+@players_bp.route('/leaders', methods=['GET'])
+def get_leaders():
+    """
+    GET /api/players/leaders
+    Ranking de jugadores activos por una estadística
+    Query params: stat (p. ej. promedioAnotaciones), limit, equipoId
+    """
+    return run_sync(handlers.get_leaders())
+
+
+@players_bp.route('/search', methods=['GET'])
+def search_players():
+    """
+    GET /api/players/search
+    Autocompletado: jugadores cuyo nombre, apellidos o nombre completo
+    empieza por q (sin distinguir mayúsculas ni acentos)
+    Query params: q, limit, fields
     """
-    try:
-        filters = {}
-        
-        # Filtros desde query params
-        if request.args.get('equipoId'):
-            filters['equipoId'] = request.args.get('equipoId')
-        if request.args.get('activo'):
-            filters['activo'] = request.args.get('activo')
-        if request.args.get('posicion'):
-            filters['posicion'] = request.args.get('posicion')
-        
-        players = player_service.get_all_players(filters)
-        
-        return jsonify({
-            'success': True,
-            'count': len(players),
-            'data': players
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error en GET /api/players: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error obteniendo jugadores',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.search_players())
 
 
 @players_bp.route('/<player_id>', methods=['GET'])
@@ -64,28 +65,13 @@ def get_player(player_id):
     """
     GET /api/players/:id
     Obtiene un jugador por ID
+    Query params: fields
+    
+    Responde 304 si If-None-Match coincide con el ETag (_id + updatedAt del
+    documento devuelto: de la caché mientras el change stream la mantiene
+    coherente, si no de una sola lectura del primario)
     """
-    try:
-        player = player_service.get_player_by_id(player_id)
-        
-        if not player:
-            return jsonify({
-                'success': False,
-                'error': 'Jugador no encontrado'
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'data': player
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error en GET /api/players/{player_id}: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error obteniendo jugador',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.get_player(player_id))
 
 
 @players_bp.route('/team/<int:team_id>', methods=['GET'])
@@ -93,24 +79,11 @@ def get_players_by_team(team_id):
     """
     GET /api/players/team/:teamId
     Obtiene todos los jugadores de un equipo
+    Query params: limit, cursor, stream, fields
+    
+    Responde 304 si If-None-Match coincide con la versión actual de la plantilla
     """
-    try:
-        players = player_service.get_players_by_team(team_id)
-        
-        return jsonify({
-            'success': True,
-            'teamId': team_id,
-            'count': len(players),
-            'data': players
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error en GET /api/players/team/{team_id}: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error obteniendo jugadores del equipo',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.get_players_by_team(team_id))
 
 
 @players_bp.route('', methods=['POST'])
@@ -119,44 +92,20 @@ def create_player():
     POST /api/players
     Crea un nuevo jugador
     """
-    try:
-        # Validar datos
-        data = create_schema.load(request.json)
-        
-        # Obtener URL del teams-service
-        teams_url = current_app.config.get('TEAMS_SERVICE_URL')
-        
-        # Crear jugador
-        player = player_service.create_player(data, teams_url)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Jugador creado exitosamente',
-            'data': player
-        }), 201
-        
-    except ValidationError as e:
-        logger.warning(f"Error de validación: {e.messages}")
-        return jsonify({
-            'success': False,
-            'error': 'Datos inválidos',
-            'details': e.messages
-        }), 400
-        
-    except ValueError as e:
-        logger.warning(f"Error de negocio: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 400
-        
-    except Exception as e:
-        logger.error(f"Error en POST /api/players: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error creando jugador',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.create_player())
+
+
+@players_bp.route('/bulk', methods=['POST'])
+def create_players_bulk():
+    """
+    POST /api/players/bulk
+    Crea varios jugadores en una sola petición
+    
+    Body: lista de jugadores con el mismo formato que POST /api/players.
+    Devuelve un resultado por elemento (201 si se crearon todos, 207 si solo
+    algunos, 400 si ninguno)
+    """
+    return run_sync(handlers.create_players_bulk())
 
 
 @players_bp.route('/<player_id>', methods=['PUT'])
@@ -165,47 +114,7 @@ def update_player(player_id):
     PUT /api/players/:id
     Actualiza un jugador existente
     """
-    try:
-        # Validar datos
-        data = update_schema.load(request.json)
-        
-        # Actualizar jugador
-        player = player_service.update_player(player_id, data)
-        
-        if not player:
-            return jsonify({
-                'success': False,
-                'error': 'Jugador no encontrado'
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'message': 'Jugador actualizado exitosamente',
-            'data': player
-        }), 200
-        
-    except ValidationError as e:
-        logger.warning(f"Error de validación: {e.messages}")
-        return jsonify({
-            'success': False,
-            'error': 'Datos inválidos',
-            'details': e.messages
-        }), 400
-        
-    except ValueError as e:
-        logger.warning(f"Error de negocio: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 400
-        
-    except Exception as e:
-        logger.error(f"Error en PUT /api/players/{player_id}: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error actualizando jugador',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.update_player(player_id))
 
 
 @players_bp.route('/<player_id>', methods=['DELETE'])
@@ -214,27 +123,7 @@ def delete_player(player_id):
     DELETE /api/players/:id
     Elimina un jugador (soft delete)
     """
-    try:
-        success = player_service.delete_player(player_id)
-        
-        if not success:
-            return jsonify({
-                'success': False,
-                'error': 'Jugador no encontrado'
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'message': 'Jugador eliminado exitosamente'
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error en DELETE /api/players/{player_id}: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error eliminando jugador',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.delete_player(player_id))
 
 
 @players_bp.route('/<player_id>/stats', methods=['GET'])
@@ -243,29 +132,7 @@ def get_player_stats(player_id):
     GET /api/players/:id/stats
     Obtiene las estadísticas de un jugador
     """
-    try:
-        player = player_service.get_player_by_id(player_id)
-        
-        if not player:
-            return jsonify({
-                'success': False,
-                'error': 'Jugador no encontrado'
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'playerId': player_id,
-            'nombre': f"{player['nombre']} {player['apellidos']}",
-            'data': player.get('estadisticas', {})
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error en GET /api/players/{player_id}/stats: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error obteniendo estadísticas',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.get_player_stats(player_id))
 
 
 @players_bp.route('/<player_id>/stats', methods=['PUT'])
@@ -274,37 +141,30 @@ def update_player_stats(player_id):
     PUT /api/players/:id/stats
     Actualiza las estadísticas de un jugador
     """
-    try:
-        # Validar datos
-        stats = stats_schema.load(request.json)
-        
-        # Actualizar estadísticas
-        player = player_service.update_player_stats(player_id, stats)
-        
-        if not player:
-            return jsonify({
-                'success': False,
-                'error': 'Jugador no encontrado'
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'message': 'Estadísticas actualizadas exitosamente',
-            'data': player
-        }), 200
-        
-    except ValidationError as e:
-        logger.warning(f"Error de validación: {e.messages}")
-        return jsonify({
-            'success': False,
-            'error': 'Datos inválidos',
-            'details': e.messages
-        }), 400
-        
-    except Exception as e:
-        logger.error(f"Error en PUT /api/players/{player_id}/stats: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': 'Error actualizando estadísticas',
-            'message': str(e)
-        }), 500
+    return run_sync(handlers.update_player_stats(player_id))
+
+
+@players_bp.route('/<player_id>/games', methods=['POST'])
+def record_game_stats(player_id):
+    """
+    POST /api/players/:id/games
+    Registra la línea de estadísticas de un partido y recalcula los promedios
+    
+    Body: puntos, rebotes, asistencias, robos, bloqueos, minutos y tiros
+    anotados/intentados de campo, triples y tiros libres
+    """
+    return run_sync(handlers.record_game_stats(player_id))
+
+
+@players_bp.route('/stats/bulk', methods=['PUT'])
+def update_stats_bulk():
+    """
+    PUT /api/players/stats/bulk
+    Actualiza las estadísticas de varios jugadores (p. ej. al terminar un partido)
+    
+    Body: [{"playerId": "...", "stats": {...}}, ...]
+    Query params: includePlayers=true para devolver los jugadores actualizados
+    
+    Responde 200 si se actualizaron todos, 207 si solo algunos y 400 si ninguno
+    """
+    return run_sync(handlers.update_stats_bulk())
@@ -149,3 +149,33 @@ class StatsUpdateSchema(Schema):
     porcentajeTirosCampo = fields.Float()
     porcentajeTiros3Puntos = fields.Float()
     porcentajeTirosLibres = fields.Float()
+
+
+class GameStatsSchema(Schema):
+    """Schema para la línea de estadísticas de un jugador en un partido"""
+    class Meta:
+        unknown = EXCLUDE
+    
+    puntos = fields.Integer(missing=0, validate=validate.Range(min=0))
+    rebotes = fields.Integer(missing=0, validate=validate.Range(min=0))
+    asistencias = fields.Integer(missing=0, validate=validate.Range(min=0))
+    robos = fields.Integer(missing=0, validate=validate.Range(min=0))
+    bloqueos = fields.Integer(missing=0, validate=validate.Range(min=0))
+    minutos = fields.Float(missing=0.0, validate=validate.Range(min=0, max=70))
+    
+    tirosCampoAnotados = fields.Integer(missing=0, validate=validate.Range(min=0))
+    tirosCampoIntentados = fields.Integer(missing=0, validate=validate.Range(min=0))
+    triplesAnotados = fields.Integer(missing=0, validate=validate.Range(min=0))
+    triplesIntentados = fields.Integer(missing=0, validate=validate.Range(min=0))
+    tirosLibresAnotados = fields.Integer(missing=0, validate=validate.Range(min=0))
+    tirosLibresIntentados = fields.Integer(missing=0, validate=validate.Range(min=0))
+    
+    @validates_schema
+    def validate_tiros(self, data, **kwargs):
+        """Validar que los tiros anotados no superen a los intentados"""
+        for tipo in ('tirosCampo', 'triples', 'tirosLibres'):
+            if data.get(f'{tipo}Anotados', 0) > data.get(f'{tipo}Intentados', 0):
+                raise ValidationError(
+                    f'{tipo}Anotados no puede ser mayor que {tipo}Intentados',
+                    field_name=f'{tipo}Anotados'
+                )
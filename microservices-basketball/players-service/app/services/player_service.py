@@ -4,11 +4,25 @@ Servicio de lógica de negocio para Jugadores
 from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
-from typing import List, Dict, Optional
-from app.models.player import Player
-from app.utils.database import get_db
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import List, Dict, Iterator, Optional, Tuple
+from app.models.player import (
+    GAME_SHOOTING_PERCENTAGES,
+    GAME_TOTAL_AVERAGES,
+    LEADERBOARD_STATS,
+    Player,
+    normalize_search_text,
+    search_terms,
+    serialize_player
+)
+from app.utils.database import get_db, get_read_preference, reads_from_secondaries
+from app.utils.cache import get_player_cache, publish_invalidation
+from app.utils.change_stream import cache_is_coherent
+from app.services.teams_client import get_teams_client
+from app.utils.timing import phase, record_documents
 import logging
-import requests
+import re
 
 logger = logging.getLogger(__name__)
 
@@ -23,31 +37,30 @@ class PlayerService:
         db = get_db()
         return db[self.collection_name]
     
-    def get_all_players(self, filters: Dict = None) -> List[Dict]:
+    def get_read_collection(self):
+        """
+        Colección para consultas de solo lectura, con la preferencia de lectura
+        configurada (MONGO_READ_PREFERENCE); las escrituras usan get_collection
+        """
+        return self.get_collection().with_options(read_preference=get_read_preference())
+    
+    def get_all_players(self, filters: Dict = None, fields: Tuple[str, ...] = None) -> List[Dict]:
         """
         Obtiene todos los jugadores con filtros opcionales
+        
+        fields limita los campos leídos de MongoDB y los de la respuesta
         """
         try:
-            collection = self.get_collection()
+            collection = self.get_read_collection()
             
             # Preparar query
-            query = {}
-            if filters:
-                if 'equipoId' in filters:
-                    query['equipoId'] = int(filters['equipoId'])
-                if 'activo' in filters:
-                    query['activo'] = filters['activo'] == 'true'
-                if 'posicion' in filters:
-                    query['posicion'] = filters['posicion']
+            query = self._build_query(filters)
             
             # Buscar jugadores
-            players = list(collection.find(query))
+            players = list(collection.find(query, Player.projection(fields)))
             
             # Convertir a lista de diccionarios
-            result = []
-            for player_doc in players:
-                player = Player.from_mongo(player_doc)
-                result.append(player.to_dict())
+            result = self._serialize_all(players, fields)
             
             logger.info(f"Encontrados {len(result)} jugadores")
             return result
@@ -56,25 +69,169 @@ class PlayerService:
             logger.error(f"Error obteniendo jugadores: {str(e)}")
             raise
     
-    def get_player_by_id(self, player_id: str) -> Optional[Dict]:
+    def get_players_page(self, filters: Dict = None, limit: int = 50, cursor: str = None,
+                         fields: Tuple[str, ...] = None,
+                         primary: bool = False) -> Tuple[List[Dict], Optional[str]]:
         """
-        Obtiene un jugador por su ID
+        Obtiene una página de jugadores usando paginación por cursor (keyset sobre _id)
+        
+        Devuelve la página y el cursor de la siguiente (None si es la última).
+        primary lee del primario: una página no se puede comparar con la
+        versión de la plantilla que va en el ETag
         """
         try:
-            collection = self.get_collection()
+            collection = self.get_collection() if primary else self.get_read_collection()
+            
+            query = self._page_query(filters, cursor)
+            
+            # Se pide un documento extra para saber si hay más páginas
+            player_docs = list(
+                collection.find(query, Player.projection(fields)).sort('_id', 1).limit(limit + 1)
+            )
+            result, next_cursor = self._page_result(player_docs, limit, fields)
             
+            logger.info(f"Página con {len(result)} jugadores (siguiente: {next_cursor})")
+            return result, next_cursor
+            
+        except ValueError as e:
+            logger.error(f"Error de validación: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error obteniendo página de jugadores: {str(e)}")
+            raise
+    
+    def _page_query(self, filters: Dict = None, cursor: str = None) -> Dict:
+        """
+        Query de una página: filtros más el _id posterior al cursor (el _id del
+        último jugador de la página anterior)
+        """
+        query = self._build_query(filters)
+        if cursor:
+            try:
+                query['_id'] = {'$gt': ObjectId(cursor)}
+            except (InvalidId, TypeError):
+                raise ValueError("Cursor inválido")
+        return query
+    
+    def _page_result(self, player_docs: List[Dict], limit: int,
+                     fields: Tuple[str, ...] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Página serializada y cursor de la siguiente a partir de limit + 1 documentos
+        """
+        has_more = len(player_docs) > limit
+        player_docs = player_docs[:limit]
+        result = self._serialize_all(player_docs, fields)
+        next_cursor = str(player_docs[-1]['_id']) if has_more else None
+        return result, next_cursor
+    
+    def _serialize_all(self, player_docs, fields: Tuple[str, ...] = None) -> List[Dict]:
+        """Convierte documentos de MongoDB a diccionarios de respuesta"""
+        with phase('model'):
+            result = [serialize_player(player_doc, fields) for player_doc in player_docs]
+        record_documents(len(result))
+        return result
+    
+    def iter_players(self, filters: Dict = None, batch_size: int = 500,
+                     fields: Tuple[str, ...] = None) -> Iterator[Dict]:
+        """
+        Itera los jugadores uno a uno sin cargar toda la colección en memoria
+        
+        El cursor de MongoDB se recorre por lotes de batch_size documentos
+        """
+        collection = self.get_read_collection()
+        query = self._build_query(filters)
+        
+        cursor = collection.find(query, Player.projection(fields)).sort('_id', 1).batch_size(batch_size)
+        count = 0
+        try:
+            for player_doc in cursor:
+                count += 1
+                yield serialize_player(player_doc, fields)
+        finally:
+            cursor.close()
+            record_documents(count)
+            logger.info(f"Exportados {count} jugadores en streaming")
+    
+    def get_player_by_id(self, player_id: str, fields: Tuple[str, ...] = None) -> Optional[Dict]:
+        """
+        Obtiene un jugador por su ID
+        
+        Con la caché activa se guarda el jugador completo y fields se aplica
+        sobre la copia en caché
+        """
+        try:
             # Convertir string a ObjectId
             obj_id = ObjectId(player_id)
             
-            # Buscar jugador
-            player_doc = collection.find_one({'_id': obj_id})
+            cache = get_player_cache()
+            if not cache.enabled:
+                return self._find_player(obj_id, fields)
+            
+            cache_key = str(obj_id)
+            player = cache.get(cache_key)
+            if player is None:
+                player = self._find_player(obj_id)
+                if player is None:
+                    return None
+                cache.set(cache_key, player)
+            
+            return self._from_cache(player, fields)
             
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return None
+        except Exception as e:
+            logger.error(f"Error obteniendo jugador: {str(e)}")
+            raise
+    
+    def _find_player(self, obj_id: ObjectId, fields: Tuple[str, ...] = None,
+                     primary: bool = False) -> Optional[Dict]:
+        """
+        Lee un jugador de MongoDB (sin caché)
+        """
+        collection = self.get_collection() if primary else self.get_read_collection()
+        player_doc = collection.find_one({'_id': obj_id}, Player.projection(fields))
+        
+        if not player_doc:
+            logger.warning(f"Jugador no encontrado: {obj_id}")
+            return None
+        
+        record_documents(1)
+        with phase('model'):
+            return serialize_player(player_doc, fields)
+    
+    def get_player_with_version(self, player_id: str, fields: Tuple[str, ...] = None
+                                ) -> Optional[Tuple[Dict, Tuple[str, Optional[datetime]]]]:
+        """
+        Jugador y su versión (_id, updatedAt) para el ETag, o None si no existe
+        
+        Mientras el change stream mantiene la caché coherente la versión sale
+        de la copia en caché y un acierto no consulta MongoDB. Si no, se hace
+        una sola lectura del primario con fields más updatedAt
+        """
+        try:
+            obj_id = ObjectId(player_id)
+            
+            cache = self._coherent_cache()
+            if cache is not None:
+                cache_key = str(obj_id)
+                player = cache.get(cache_key)
+                if player is None:
+                    player = self._find_player(obj_id, primary=True)
+                    if player is None:
+                        return None
+                    cache.set(cache_key, player)
+                return self._with_version(player, fields)
+            
+            player_doc = self.get_collection().find_one(
+                {'_id': obj_id}, self._version_projection(fields, True)
+            )
             if not player_doc:
-                logger.warning(f"Jugador no encontrado: {player_id}")
                 return None
             
-            player = Player.from_mongo(player_doc)
-            return player.to_dict()
+            record_documents(1)
+            with phase('model'):
+                return serialize_player(player_doc, fields), self._player_version(player_doc)
             
         except InvalidId:
             logger.error(f"ID inválido: {player_id}")
@@ -83,20 +240,56 @@ class PlayerService:
             logger.error(f"Error obteniendo jugador: {str(e)}")
             raise
     
-    def get_players_by_team(self, team_id: int) -> List[Dict]:
+    @staticmethod
+    def _coherent_cache():
+        """Caché de jugadores si está activa y coherente (ver cache_is_coherent); si no None"""
+        cache = get_player_cache()
+        if cache.enabled and cache_is_coherent():
+            return cache
+        return None
+    
+    @classmethod
+    def _with_version(cls, player: Dict, fields: Tuple[str, ...] = None
+                      ) -> Tuple[Dict, Tuple[str, Optional[datetime]]]:
+        """Jugador en caché con fields aplicado y su versión"""
+        return cls._from_cache(player, fields), cls._player_version(player)
+    
+    @staticmethod
+    def _from_cache(player: Dict, fields: Tuple[str, ...] = None) -> Dict:
+        """
+        Copia del jugador en caché con fields aplicado: quien la recibe puede
+        modificarla sin cambiar la entrada compartida (los subdocumentos como
+        estadisticas no se copian y no deben modificarse)
+        """
+        if fields is not None:
+            return {name: player[name] for name in fields}
+        return dict(player)
+    
+    @staticmethod
+    def _player_version(player: Dict) -> Tuple[str, Optional[datetime]]:
+        return str(player['_id']), player.get('updatedAt')
+    
+    def get_players_by_team(self, team_id: int, fields: Tuple[str, ...] = None,
+                            version: Tuple[int, Optional[datetime]] = None) -> List[Dict]:
         """
         Obtiene todos los jugadores de un equipo
+        
+        version es la de get_roster_version (leída del primario) con la que se
+        calculó el ETag: si la plantilla leída de un secundario no llega a esa
+        versión, se vuelve a leer del primario
         """
         try:
-            collection = self.get_collection()
+            check = version is not None and reads_from_secondaries()
+            query = {'equipoId': team_id}
             
             # Buscar jugadores del equipo
-            players = list(collection.find({'equipoId': team_id}))
+            players = list(self.get_read_collection().find(query, self._version_projection(fields, check)))
             
-            result = []
-            for player_doc in players:
-                player = Player.from_mongo(player_doc)
-                result.append(player.to_dict())
+            if check and not self._matches_version(players, version):
+                logger.info(f"Plantilla del equipo {team_id} atrasada en el secundario, se lee del primario")
+                players = list(self.get_collection().find(query, Player.projection(fields)))
+            
+            result = self._serialize_all(players, fields)
             
             logger.info(f"Encontrados {len(result)} jugadores del equipo {team_id}")
             return result
@@ -105,6 +298,154 @@ class PlayerService:
             logger.error(f"Error obteniendo jugadores del equipo: {str(e)}")
             raise
     
+    @staticmethod
+    def _version_projection(fields: Tuple[str, ...] = None, with_version: bool = False) -> Optional[Dict]:
+        """
+        Proyección de fields; with_version añade updatedAt para poder calcular
+        o comprobar la versión (serialize_player con fields no lo devuelve)
+        """
+        projection = Player.projection(fields)
+        if with_version and projection is not None:
+            projection['updatedAt'] = 1
+        return projection
+    
+    @staticmethod
+    def _matches_version(player_docs: List[Dict], version: Tuple[int, Optional[datetime]]) -> bool:
+        """
+        Indica si los documentos leídos corresponden a la versión (número de
+        jugadores, última modificación) de get_roster_version
+        """
+        count, last_update = version
+        updates = [doc['updatedAt'] for doc in player_docs if doc.get('updatedAt') is not None]
+        return len(player_docs) == count and max(updates, default=None) == last_update
+    
+    # Campos que necesita GET /api/players/:id/stats
+    STATS_FIELDS = ('_id', 'nombre', 'apellidos', 'estadisticas')
+    
+    # Campos de cada jugador en el ranking de líderes
+    LEADER_FIELDS = ('_id', 'nombre', 'apellidos', 'nombreCompleto', 'numeroCamiseta',
+                     'equipoId', 'equipoNombre')
+    
+    def get_leaders(self, stat: str, limit: int = 10, team_id: int = None) -> List[Dict]:
+        """
+        Top-N de jugadores activos por una estadística, de la liga o de un equipo
+        
+        Para la liga se recorre el índice parcial idx_lider_<stat> (solo los N
+        primeros); para un equipo basta idx_equipo
+        """
+        query, projection = self._leaders_query(stat, team_id)
+        
+        try:
+            collection = self.get_read_collection()
+            
+            player_docs = collection.find(query, projection).sort(f'estadisticas.{stat}', -1).limit(limit)
+            result = self._leaders_result(player_docs, stat)
+            
+            logger.info(f"Líderes de {stat}: {len(result)} jugadores")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo líderes: {str(e)}")
+            raise
+    
+    def _leaders_query(self, stat: str, team_id: int = None) -> Tuple[Dict, Dict]:
+        """Query y proyección del ranking de stat (ValueError si no es una estadística)"""
+        if stat not in LEADERBOARD_STATS:
+            raise ValueError(
+                f"Estadística inválida: {stat}. Opciones: {', '.join(LEADERBOARD_STATS)}"
+            )
+        
+        stat_field = f'estadisticas.{stat}'
+        query = {'activo': True, stat_field: {'$exists': True}}
+        if team_id is not None:
+            query['equipoId'] = team_id
+        
+        projection = Player.projection(self.LEADER_FIELDS)
+        projection[stat_field] = 1
+        return query, projection
+    
+    def _leaders_result(self, player_docs, stat: str) -> List[Dict]:
+        """Entradas del ranking con su posición y el valor de la estadística"""
+        with phase('model'):
+            result = []
+            for rank, player_doc in enumerate(player_docs, start=1):
+                leader = serialize_player(player_doc, self.LEADER_FIELDS)
+                leader['rank'] = rank
+                leader['valor'] = player_doc['estadisticas'].get(stat)
+                result.append(leader)
+        record_documents(len(result))
+        return result
+    
+    # Campos por defecto de cada resultado de búsqueda (autocompletado)
+    SEARCH_FIELDS = ('_id', 'nombre', 'apellidos', 'nombreCompleto', 'numeroCamiseta',
+                     'posicion', 'equipoId', 'equipoNombre', 'foto')
+    
+    def search_players(self, text: str, limit: int = 10, fields: Tuple[str, ...] = None) -> List[Dict]:
+        """
+        Busca jugadores cuyo nombre, apellidos o nombre completo empiece por text,
+        sin distinguir mayúsculas ni acentos
+        
+        El prefijo normalizado se resuelve con un rango sobre idx_search_terms
+        """
+        query = self._search_query(text)
+        
+        try:
+            collection = self.get_read_collection()
+            fields = fields or self.SEARCH_FIELDS
+            
+            player_docs = collection.find(query, Player.projection(fields)).limit(limit)
+            result = self._serialize_all(player_docs, fields)
+            
+            logger.info(f"Búsqueda '{text}': {len(result)} jugadores")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error buscando jugadores: {str(e)}")
+            raise
+    
+    def _search_query(self, text: str) -> Dict:
+        """Rango de prefijo normalizado sobre idx_search_terms"""
+        term = normalize_search_text(text)
+        if not term:
+            raise ValueError("El parámetro q es requerido")
+        return {'searchTerms': {'$regex': f'^{re.escape(term)}'}}
+    
+    def get_roster_version(self, team_id: int) -> Tuple[int, Optional[datetime]]:
+        """
+        Versión de la plantilla de un equipo: (número de jugadores, último updatedAt)
+        
+        Solo necesita equipoId y updatedAt, así que se resuelve desde idx_equipo_updated.
+        Se lee siempre del primario: es la versión del ETag
+        """
+        try:
+            collection = self.get_collection()
+            
+            result = list(collection.aggregate(
+                self._roster_version_pipeline(team_id), hint='idx_equipo_updated'
+            ))
+            return self._roster_version(result)
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo versión de la plantilla: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _roster_version_pipeline(team_id: int) -> List[Dict]:
+        return [
+            {'$match': {'equipoId': team_id}},
+            {'$group': {
+                '_id': None,
+                'count': {'$sum': 1},
+                'lastUpdate': {'$max': '$updatedAt'}
+            }}
+        ]
+    
+    @staticmethod
+    def _roster_version(result: List[Dict]) -> Tuple[int, Optional[datetime]]:
+        if not result:
+            return 0, None
+        return result[0]['count'], result[0]['lastUpdate']
+    
     def create_player(self, player_data: Dict, teams_service_url: str = None) -> Dict:
         """
         Crea un nuevo jugador
@@ -118,30 +459,15 @@ class PlayerService:
             
             collection = self.get_collection()
             
-            # Crear modelo de jugador
-            player = Player(player_data)
-            player.createdAt = datetime.utcnow()
-            player.updatedAt = datetime.utcnow()
-            
-            # Validar
-            is_valid, error_msg = player.validate()
-            if not is_valid:
-                raise ValueError(error_msg)
-            
-            # Verificar que no exista el mismo número de camiseta en el equipo
-            existing = collection.find_one({
-                'equipoId': player.equipoId,
-                'numeroCamiseta': player.numeroCamiseta
-            })
-            
-            if existing:
-                raise ValueError(
-                    f"Ya existe un jugador con el número {player.numeroCamiseta} en este equipo"
-                )
+            # Crear y validar el modelo de jugador
+            player = self._new_player(player_data)
             
-            # Insertar en MongoDB
+            # Insertar en MongoDB; idx_equipo_numero rechaza números repetidos
             player_mongo = player.to_mongo()
-            result = collection.insert_one(player_mongo)
+            try:
+                result = collection.insert_one(player_mongo)
+            except DuplicateKeyError as e:
+                raise ValueError(self._duplicate_number_message(e, player.numeroCamiseta))
             
             # Obtener jugador creado
             player._id = result.inserted_id
@@ -157,6 +483,116 @@ class PlayerService:
             logger.error(f"Error creando jugador: {str(e)}")
             raise
     
+    @staticmethod
+    def _new_player(player_data: Dict, now: datetime = None) -> Player:
+        """Modelo de un jugador nuevo ya validado (ValueError si no es válido)"""
+        player = Player(player_data)
+        player.createdAt = now or datetime.utcnow()
+        player.updatedAt = player.createdAt
+        
+        is_valid, error_msg = player.validate()
+        if not is_valid:
+            raise ValueError(error_msg)
+        return player
+    
+    def create_players_bulk(self, entries: List[Tuple[int, Dict]],
+                            teams_service_url: str = None) -> List[Dict]:
+        """
+        Crea varios jugadores con un solo insert_many
+        
+        entries son pares (índice en la petición, datos validados). Cada equipo
+        distinto se verifica una sola vez y los números de camiseta repetidos los
+        detecta el índice único idx_equipo_numero. Devuelve un resultado por
+        índice, ordenado
+        """
+        try:
+            results = {}
+            
+            # Verificar cada equipo una sola vez
+            teams_ok = {}
+            if teams_service_url:
+                for team_id in {data.get('equipoId') for _, data in entries}:
+                    teams_ok[team_id] = self._verify_team_exists(team_id, teams_service_url)
+            
+            docs, doc_indexes, results = self._bulk_docs(entries, teams_ok)
+            
+            # Insertar todo de una vez; ordered=False sigue tras los errores
+            failed = {}
+            if docs:
+                try:
+                    self.get_collection().insert_many(docs, ordered=False)
+                except BulkWriteError as e:
+                    failed = self._bulk_failures(e, docs)
+            
+            return self._bulk_results(results, docs, doc_indexes, failed, len(entries))
+            
+        except Exception as e:
+            logger.error(f"Error en creación masiva de jugadores: {str(e)}")
+            raise
+    
+    def _bulk_docs(self, entries: List[Tuple[int, Dict]],
+                   teams_ok: Dict) -> Tuple[List[Dict], List[int], Dict]:
+        """
+        Construye y valida los documentos de una creación masiva
+        
+        Devuelve los documentos, el índice en la petición de cada uno y los
+        resultados de los elementos descartados
+        """
+        now = datetime.utcnow()
+        docs = []
+        doc_indexes = []
+        results = {}
+        for index, data in entries:
+            team_id = data.get('equipoId')
+            if teams_ok.get(team_id) is False:
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'error': f"El equipo con ID {team_id} no existe"
+                }
+                continue
+            
+            try:
+                player = self._new_player(data, now)
+            except ValueError as e:
+                results[index] = {'index': index, 'success': False, 'error': str(e)}
+                continue
+            
+            docs.append(player.to_mongo())
+            doc_indexes.append(index)
+        return docs, doc_indexes, results
+    
+    @staticmethod
+    def _bulk_failures(error: BulkWriteError, docs: List[Dict]) -> Dict[int, str]:
+        """Mensaje de error por posición de cada documento que insert_many rechazó"""
+        failed = {}
+        for write_error in error.details.get('writeErrors', []):
+            doc = docs[write_error['index']]
+            if write_error.get('code') == 11000:
+                message = (
+                    f"Ya existe un jugador con el número "
+                    f"{doc['numeroCamiseta']} en este equipo"
+                )
+            else:
+                message = write_error.get('errmsg', 'Error insertando jugador')
+            failed[write_error['index']] = message
+        return failed
+    
+    @staticmethod
+    def _bulk_results(results: Dict, docs: List[Dict], doc_indexes: List[int],
+                      failed: Dict[int, str], total: int) -> List[Dict]:
+        """Resultado por índice de la petición, ordenado"""
+        for position, doc in enumerate(docs):
+            index = doc_indexes[position]
+            if position in failed:
+                results[index] = {'index': index, 'success': False, 'error': failed[position]}
+            else:
+                results[index] = {'index': index, 'success': True, '_id': str(doc['_id'])}
+        
+        created = len(docs) - len(failed)
+        logger.info(f"Creación masiva: {created} de {total} jugadores creados")
+        return [results[index] for index in sorted(results)]
+    
     def update_player(self, player_id: str, update_data: Dict) -> Optional[Dict]:
         """
         Actualiza un jugador existente
@@ -165,65 +601,42 @@ class PlayerService:
             collection = self.get_collection()
             obj_id = ObjectId(player_id)
             
-            # Verificar que existe
-            existing = collection.find_one({'_id': obj_id})
-            if not existing:
-                return None
+            partial_rename = self._prepare_update(update_data)
             
-            # Procesar nombreCompleto si viene (dividir en nombre y apellidos)
-            if 'nombreCompleto' in update_data and update_data['nombreCompleto']:
-                partes = update_data['nombreCompleto'].split(' ', 1)
-                update_data['nombre'] = partes[0] if len(partes) > 0 else ''
-                update_data['apellidos'] = partes[1] if len(partes) > 1 else ''
-                # Remover nombreCompleto del update (no se guarda en DB)
-                del update_data['nombreCompleto']
-            
-            # Manejar alias: numero → numeroCamiseta
-            if 'numero' in update_data:
-                update_data['numeroCamiseta'] = update_data['numero']
-                del update_data['numero']
-            
-            # Manejar alias: estatura → altura
-            if 'estatura' in update_data:
-                update_data['altura'] = update_data['estatura']
-                del update_data['estatura']
-            
-            # Manejar alias: isActivo → activo (para compatibilidad con frontend Angular)
-            if 'isActivo' in update_data:
-                update_data['activo'] = update_data['isActivo']
-                del update_data['isActivo']
-            
-            # Preparar actualización
-            update_data['updatedAt'] = datetime.utcnow()
-            
-            # Si se cambia equipoId o numeroCamiseta, validar unicidad
-            if 'equipoId' in update_data or 'numeroCamiseta' in update_data:
-                equipo_id = update_data.get('equipoId', existing['equipoId'])
-                numero = update_data.get('numeroCamiseta', existing['numeroCamiseta'])
+            # Actualizar y leer el resultado en una sola operación; si cambia
+            # equipoId o numeroCamiseta, idx_equipo_numero garantiza la unicidad.
+            # Con solo nombre o solo apellidos, searchTerms necesita el otro
+            # campo guardado: se lee antes y el update exige que no haya cambiado
+            for _ in range(self.RENAME_ATTEMPTS):
+                query = {'_id': obj_id}
+                if partial_rename:
+                    current = collection.find_one({'_id': obj_id}, self.NAME_PROJECTION)
+                    if current is None:
+                        return None
+                    query = self._rename_query(obj_id, update_data, current)
                 
-                duplicate = collection.find_one({
-                    'equipoId': equipo_id,
-                    'numeroCamiseta': numero,
-                    '_id': {'$ne': obj_id}
-                })
-                
-                if duplicate:
+                try:
+                    updated_doc = collection.find_one_and_update(
+                        query,
+                        {'$set': update_data},
+                        return_document=ReturnDocument.AFTER
+                    )
+                except DuplicateKeyError as e:
                     raise ValueError(
-                        f"Ya existe un jugador con el número {numero} en este equipo"
+                        self._duplicate_number_message(e, update_data.get('numeroCamiseta'))
                     )
+                if updated_doc or not partial_rename:
+                    break
+            else:
+                raise ValueError(self.RENAME_CONFLICT_MESSAGE)
             
-            # Actualizar
-            collection.update_one(
-                {'_id': obj_id},
-                {'$set': update_data}
-            )
+            if not updated_doc:
+                return None
             
-            # Obtener jugador actualizado
-            updated_doc = collection.find_one({'_id': obj_id})
-            player = Player.from_mongo(updated_doc)
+            self._invalidate_cache(obj_id)
             
             logger.info(f"Jugador actualizado: {player_id}")
-            return player.to_dict()
+            return serialize_player(updated_doc)
             
         except InvalidId:
             logger.error(f"ID inválido: {player_id}")
@@ -235,6 +648,74 @@ class PlayerService:
             logger.error(f"Error actualizando jugador: {str(e)}")
             raise
     
+    @staticmethod
+    def _prepare_update(update_data: Dict) -> bool:
+        """
+        Convierte los alias de la petición a los campos guardados y añade
+        updatedAt (modifica update_data). Devuelve si cambia solo nombre o
+        solo apellidos (searchTerms necesita leer el otro)
+        """
+        # Procesar nombreCompleto si viene (dividir en nombre y apellidos)
+        if 'nombreCompleto' in update_data and update_data['nombreCompleto']:
+            partes = update_data['nombreCompleto'].split(' ', 1)
+            update_data['nombre'] = partes[0] if len(partes) > 0 else ''
+            update_data['apellidos'] = partes[1] if len(partes) > 1 else ''
+            # Remover nombreCompleto del update (no se guarda en DB)
+            del update_data['nombreCompleto']
+        
+        # Manejar alias: numero → numeroCamiseta
+        if 'numero' in update_data:
+            update_data['numeroCamiseta'] = update_data['numero']
+            del update_data['numero']
+        
+        # Manejar alias: estatura → altura
+        if 'estatura' in update_data:
+            update_data['altura'] = update_data['estatura']
+            del update_data['estatura']
+        
+        # Manejar alias: isActivo → activo (para compatibilidad con frontend Angular)
+        if 'isActivo' in update_data:
+            update_data['activo'] = update_data['isActivo']
+            del update_data['isActivo']
+        
+        # Preparar actualización
+        update_data['updatedAt'] = datetime.utcnow()
+        
+        # Claves de búsqueda: si llegan nombre y apellidos se calculan aquí;
+        # si llega solo uno, con el otro leído del documento (ver _rename_query)
+        if 'nombre' in update_data and 'apellidos' in update_data:
+            update_data['searchTerms'] = search_terms(
+                update_data['nombre'], update_data['apellidos']
+            )
+            return False
+        return 'nombre' in update_data or 'apellidos' in update_data
+    
+    # Campos guardados de los que sale el nombre (ver serialize_player)
+    NAME_PROJECTION = {'nombre': 1, 'apellidos': 1, 'nombreCompleto': 1}
+    
+    # Intentos de un cambio de solo nombre o solo apellidos si otra escritura
+    # cambia el nombre entre la lectura y el update
+    RENAME_ATTEMPTS = 3
+    RENAME_CONFLICT_MESSAGE = "El nombre del jugador cambió durante la actualización, inténtalo de nuevo"
+    
+    @classmethod
+    def _rename_query(cls, obj_id: ObjectId, update_data: Dict, current: Dict) -> Dict:
+        """
+        Añade a update_data el searchTerms de un cambio de solo nombre o solo
+        apellidos, calculado con search_terms sobre el documento current ya
+        modificado, y devuelve el filtro del update: el _id y los campos del
+        nombre que no cambian con el valor leído
+        """
+        changed = {field: update_data[field] for field in cls.NAME_PROJECTION if field in update_data}
+        names = serialize_player({**current, **changed}, ('nombre', 'apellidos'))
+        update_data['searchTerms'] = search_terms(names['nombre'], names['apellidos'])
+        
+        query = {'_id': obj_id}
+        for field in cls.NAME_PROJECTION:
+            if field not in changed:
+                query[field] = current.get(field)
+        return query
+    
     def delete_player(self, player_id: str) -> bool:
         """
         Elimina un jugador (soft delete - marca como inactivo)
@@ -244,21 +725,18 @@ class PlayerService:
             obj_id = ObjectId(player_id)
             
             # Marcar como inactivo
-            result = collection.update_one(
-                {'_id': obj_id},
-                {
-                    '$set': {
-                        'activo': False,
-                        'updatedAt': datetime.utcnow()
-                    }
-                }
+            deleted_doc = collection.find_one_and_update(
+                self._soft_delete_filter(obj_id),
+                self._soft_delete_update(),
+                projection={'_id': 1}
             )
             
-            if result.modified_count > 0:
-                logger.info(f"Jugador eliminado (soft): {player_id}")
-                return True
+            if not deleted_doc:
+                return False
             
-            return False
+            self._invalidate_cache(obj_id)
+            logger.info(f"Jugador eliminado (soft): {player_id}")
+            return True
             
         except InvalidId:
             logger.error(f"ID inválido: {player_id}")
@@ -267,6 +745,23 @@ class PlayerService:
             logger.error(f"Error eliminando jugador: {str(e)}")
             raise
     
+    @staticmethod
+    def _soft_delete_filter(obj_id: ObjectId) -> Dict:
+        """
+        Solo jugadores activos: borrar uno ya inactivo responde 404, como
+        antes con modified_count, y no cambia su updatedAt (ni su ETag)
+        """
+        return {'_id': obj_id, 'activo': {'$ne': False}}
+    
+    @staticmethod
+    def _soft_delete_update() -> Dict:
+        return {
+            '$set': {
+                'activo': False,
+                'updatedAt': datetime.utcnow()
+            }
+        }
+    
     def update_player_stats(self, player_id: str, stats: Dict) -> Optional[Dict]:
         """
         Actualiza las estadísticas de un jugador
@@ -275,30 +770,22 @@ class PlayerService:
             collection = self.get_collection()
             obj_id = ObjectId(player_id)
             
-            # Preparar actualización
-            update_data = {
-                'updatedAt': datetime.utcnow()
-            }
-            
-            # Actualizar campos de estadísticas
-            for key, value in stats.items():
-                update_data[f'estadisticas.{key}'] = value
-            
-            # Actualizar
-            result = collection.update_one(
+            # Actualizar y leer el resultado en una sola operación. updatedAt
+            # cambia siempre: no encontrar el documento equivale al
+            # modified_count == 0 de antes
+            updated_doc = collection.find_one_and_update(
                 {'_id': obj_id},
-                {'$set': update_data}
+                self._stats_write(stats),
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count == 0:
+            if not updated_doc:
                 return None
             
-            # Obtener jugador actualizado
-            updated_doc = collection.find_one({'_id': obj_id})
-            player = Player.from_mongo(updated_doc)
+            self._invalidate_cache(obj_id)
             
             logger.info(f"Estadísticas actualizadas: {player_id}")
-            return player.to_dict()
+            return serialize_player(updated_doc)
             
         except InvalidId:
             logger.error(f"ID inválido: {player_id}")
@@ -307,17 +794,242 @@ class PlayerService:
             logger.error(f"Error actualizando estadísticas: {str(e)}")
             raise
     
-    def _verify_team_exists(self, team_id: int, teams_service_url: str) -> bool:
+    def record_game_stats(self, player_id: str, game: Dict) -> Optional[Dict]:
         """
-        Verifica que un equipo existe llamando al teams-service
+        Suma la línea de un partido a los totales del jugador y recalcula sus
+        promedios y porcentajes a partir de esos totales
+        
+        Es una sola actualización atómica (pipeline de update), sin leer antes
+        el documento, así que escrituras concurrentes no pierden partidos
         """
         try:
-            response = requests.get(
-                f"{teams_service_url}/{team_id}",
-                timeout=5
+            collection = self.get_collection()
+            obj_id = ObjectId(player_id)
+            
+            updated_doc = collection.find_one_and_update(
+                {'_id': obj_id},
+                self._game_stats_pipeline(game),
+                return_document=ReturnDocument.AFTER
             )
-            return response.status_code == 200
+            
+            if not updated_doc:
+                return None
+            
+            self._invalidate_cache(obj_id)
+            
+            logger.info(f"Partido registrado para el jugador: {player_id}")
+            return serialize_player(updated_doc)
+            
+        except InvalidId:
+            logger.error(f"ID inválido: {player_id}")
+            return None
         except Exception as e:
-            logger.warning(f"No se pudo verificar equipo: {str(e)}")
-            # En caso de error, permitir la operación
-            return True
+            logger.error(f"Error registrando partido: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _game_stats_pipeline(game: Dict) -> List[Dict]:
+        """
+        Pipeline de update que equivale a un $inc de los totales más el
+        recálculo de estadisticas en la misma operación
+        
+        Jugadores sin totales (anteriores a los partidos o con estadísticas
+        editadas a mano, ver _stats_write): los totales de conteo parten de
+        promedio × partidos. Los porcentajes de tiro no se pueden convertir en
+        anotados/intentados, así que se guardan en totales.porcentajesPrevios
+        con sus partidos (totales.partidosPrevios) y el porcentaje resultante
+        es la media de ese valor y el de los partidos registrados, ponderada
+        por partidos. Sin tiros registrados se mantiene el porcentaje previo
+        """
+        partidos = {'$ifNull': ['$estadisticas.partidosJugados', 0]}
+        
+        # 1) Incrementar totales. Si el jugador aún no tiene totales, se parte
+        #    de promedio × partidos para no perder el historial anterior
+        increments = {
+            'estadisticas.partidosJugados': {'$add': [partidos, 1]},
+            'totales.partidosPrevios': {'$ifNull': [
+                '$totales.partidosPrevios',
+                {'$cond': [{'$gt': ['$totales', None]}, 0, partidos]}
+            ]},
+            'updatedAt': datetime.utcnow()
+        }
+        for total, promedio in GAME_TOTAL_AVERAGES.items():
+            previous = {'$multiply': [{'$ifNull': [f'$estadisticas.{promedio}', 0]}, partidos]}
+            increments[f'totales.{total}'] = {
+                '$add': [{'$ifNull': [f'$totales.{total}', previous]}, game.get(total, 0)]
+            }
+        for porcentaje, (anotados, intentados) in GAME_SHOOTING_PERCENTAGES.items():
+            increments[f'totales.porcentajesPrevios.{porcentaje}'] = {'$ifNull': [
+                f'$totales.porcentajesPrevios.{porcentaje}',
+                {'$ifNull': [f'$estadisticas.{porcentaje}', 0.0]}
+            ]}
+            for total in (anotados, intentados):
+                increments[f'totales.{total}'] = {
+                    '$add': [{'$ifNull': [f'$totales.{total}', 0]}, game.get(total, 0)]
+                }
+        
+        # 2) Derivar promedios y porcentajes de los totales ya incrementados
+        previos = '$totales.partidosPrevios'
+        registrados = {'$subtract': ['$estadisticas.partidosJugados', previos]}
+        derived = {}
+        for total, promedio in GAME_TOTAL_AVERAGES.items():
+            derived[f'estadisticas.{promedio}'] = {
+                '$round': [{'$divide': [f'$totales.{total}', '$estadisticas.partidosJugados']}, 1]
+            }
+        for porcentaje, (anotados, intentados) in GAME_SHOOTING_PERCENTAGES.items():
+            previo = f'$totales.porcentajesPrevios.{porcentaje}'
+            registrado = {'$multiply': [{'$divide': [f'$totales.{anotados}', f'$totales.{intentados}']}, 100]}
+            derived[f'estadisticas.{porcentaje}'] = {
+                '$cond': [
+                    {'$gt': [f'$totales.{intentados}', 0]},
+                    {'$round': [
+                        {'$divide': [
+                            {'$add': [
+                                {'$multiply': [previo, previos]},
+                                {'$multiply': [registrado, registrados]}
+                            ]},
+                            '$estadisticas.partidosJugados'
+                        ]},
+                        1
+                    ]},
+                    {'$cond': [{'$gt': [previos, 0]}, previo, 0.0]}
+                ]
+            }
+        
+        return [{'$set': increments}, {'$set': derived}]
+    
+    def update_stats_bulk(self, entries: List[Tuple[int, str, Dict]],
+                          include_players: bool = False) -> Tuple[List[Dict], Optional[List[Dict]]]:
+        """
+        Actualiza las estadísticas de varios jugadores con un solo bulk_write
+        
+        entries son tuplas (índice en la petición, ID del jugador, estadísticas
+        validadas). Devuelve el resumen por índice y, si include_players, los
+        jugadores actualizados
+        """
+        try:
+            collection = self.get_collection()
+            operations, updated, results = self._stats_bulk_operations(entries)
+            
+            missing = set()
+            if operations:
+                result = collection.bulk_write(operations, ordered=False)
+                
+                # Solo si alguno no existía hace falta averiguar cuáles. Cada
+                # UpdateOne cambia updatedAt, así que matched_count equivale
+                # al modified_count de la versión anterior
+                if result.matched_count < len(operations):
+                    ids = [obj_id for _, obj_id in updated]
+                    found = {doc['_id'] for doc in collection.find({'_id': {'$in': ids}}, {'_id': 1})}
+                    missing = set(ids) - found
+            
+            results = self._stats_bulk_results(results, updated, missing, len(entries))
+            
+            players = None
+            if include_players:
+                ids = [obj_id for _, obj_id in updated if obj_id not in missing]
+                players = [serialize_player(doc) for doc in collection.find({'_id': {'$in': ids}})]
+            
+            return results, players
+            
+        except Exception as e:
+            logger.error(f"Error actualizando estadísticas en lote: {str(e)}")
+            raise
+    
+    def _stats_bulk_operations(self, entries: List[Tuple[int, str, Dict]]) -> Tuple[List, List, Dict]:
+        """
+        UpdateOne de cada elemento con ID válido, pares (índice, ObjectId) de
+        esos elementos y resultados de los IDs inválidos
+        """
+        now = datetime.utcnow()
+        results = {}
+        operations = []
+        updated = []
+        for index, player_id, stats in entries:
+            try:
+                obj_id = ObjectId(player_id)
+            except (InvalidId, TypeError):
+                results[index] = {
+                    'index': index,
+                    'playerId': player_id,
+                    'success': False,
+                    'error': 'ID inválido'
+                }
+                continue
+            operations.append(UpdateOne({'_id': obj_id}, self._stats_write(stats, now)))
+            updated.append((index, obj_id))
+        return operations, updated, results
+    
+    def _stats_bulk_results(self, results: Dict, updated: List[Tuple[int, ObjectId]],
+                            missing: set, total: int) -> List[Dict]:
+        """Invalida la caché de los actualizados y devuelve el resultado por índice"""
+        for index, obj_id in updated:
+            self._invalidate_cache(obj_id)
+            if obj_id in missing:
+                results[index] = {
+                    'index': index,
+                    'playerId': str(obj_id),
+                    'success': False,
+                    'error': 'Jugador no encontrado'
+                }
+            else:
+                results[index] = {'index': index, 'playerId': str(obj_id), 'success': True}
+        
+        logger.info(f"Estadísticas actualizadas en lote: {len(updated) - len(missing)} de {total}")
+        return [results[index] for index in sorted(results)]
+    
+    def _stats_write(self, stats: Dict, now: datetime = None) -> Dict:
+        """
+        Update de una edición manual de estadisticas: $set de los campos
+        recibidos sin reemplazar el bloque completo
+        
+        Los totales por partido se descartan: dejarían de cuadrar con los
+        promedios editados y el siguiente POST /games desharía la edición. Ese
+        partido vuelve a partir de estadisticas (ver _game_stats_pipeline)
+        """
+        update_data = {
+            'updatedAt': now or datetime.utcnow()
+        }
+        for key, value in stats.items():
+            update_data[f'estadisticas.{key}'] = value
+        return {'$set': update_data, '$unset': {'totales': ''}}
+    
+    def _invalidate_cache(self, obj_id: ObjectId):
+        """
+        Invalida las copias en caché de un jugador tras modificarlo
+        """
+        publish_invalidation(str(obj_id))
+    
+    @staticmethod
+    def _duplicate_number_message(error: DuplicateKeyError, numero=None) -> str:
+        """
+        Mensaje para un número de camiseta repetido (violación de idx_equipo_numero)
+        """
+        key_value = (error.details or {}).get('keyValue') or {}
+        numero = key_value.get('numeroCamiseta', numero)
+        if numero is None:
+            return "Ya existe un jugador con ese número en este equipo"
+        return f"Ya existe un jugador con el número {numero} en este equipo"
+    
+    def _build_query(self, filters: Dict = None) -> Dict:
+        """
+        Construye el query de MongoDB a partir de los filtros de la petición
+        """
+        query = {}
+        if filters:
+            if 'equipoId' in filters:
+                try:
+                    query['equipoId'] = int(filters['equipoId'])
+                except (TypeError, ValueError):
+                    raise ValueError("equipoId debe ser un entero")
+            if 'activo' in filters:
+                query['activo'] = filters['activo'] == 'true'
+            if 'posicion' in filters:
+                query['posicion'] = filters['posicion']
+        return query
+    
+    def _verify_team_exists(self, team_id: int, teams_service_url: str) -> bool:
+        """
+        Verifica que un equipo existe llamando al teams-service
+        """
+        return get_teams_client(teams_service_url).team_exists(team_id)
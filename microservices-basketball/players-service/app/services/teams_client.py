@@ -0,0 +1,281 @@
+"""
+Cliente HTTP del teams-service para verificar equipos
+"""
+from flask import current_app
+from threading import Lock
+from app.utils.cache import TTLCache
+from app.utils.metrics import (
+    TEAMS_CIRCUIT_TRANSITIONS,
+    TEAMS_SERVICE_CHECKS,
+    TEAMS_SERVICE_LATENCY,
+    set_circuit_state
+)
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cliente global (uno por worker)
+teams_client = None
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker sencillo: tras failure_threshold fallos seguidos se abre y
+    deja de llamar al servicio durante reset_timeout segundos; después pasa a
+    half-open y deja pasar una sola llamada de prueba que lo cierra o lo
+    vuelve a abrir
+    
+    Todo el estado se lee y se cambia con _lock: con workers gthread varios
+    hilos comparten el circuito y sin él podían pasar varias pruebas a la vez
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    STATES = (CLOSED, OPEN, HALF_OPEN)
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None
+        self.times_opened = 0
+        self._state = self.CLOSED
+        self._lock = Lock()
+        set_circuit_state(self.CLOSED, self.STATES)
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+    
+    def snapshot(self) -> dict:
+        """Estado, aperturas y fallos seguidos leídos a la vez"""
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'timesOpened': self.times_opened,
+                'failures': self.failures
+            }
+    
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._set_state(self.HALF_OPEN)
+            self.probe_at = None
+        return self._state
+    
+    def _set_state(self, state: str):
+        """Cambia de estado (con _lock tomado) y lo refleja en las métricas"""
+        if state == self._state:
+            return
+        self._state = state
+        TEAMS_CIRCUIT_TRANSITIONS.labels(state).inc()
+        set_circuit_state(state, self.STATES)
+    
+    def allow_request(self) -> bool:
+        """Indica si se puede llamar al servicio"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.HALF_OPEN:
+                # Solo una llamada de prueba; si no termina en reset_timeout
+                # (p. ej. el hilo murió) se deja pasar otra
+                now = time.monotonic()
+                if self.probe_at is not None and now - self.probe_at < self.reset_timeout:
+                    return False
+                self.probe_at = now
+                return True
+            return state == self.CLOSED
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.probe_at = None
+            self._set_state(self.CLOSED)
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state != self.CLOSED or self.failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"Circuito del teams-service abierto tras {self.failures} fallos")
+                self._set_state(self.OPEN)
+                self.opened_at = time.monotonic()
+                self.probe_at = None
+
+
+class TeamsClient:
+    """
+    Verificación de equipos contra el teams-service con conexiones reutilizadas,
+    caché de respuestas (positivas y negativas) y circuit breaker
+    """
+    
+    def __init__(self, base_url: str, timeout: float = 5.0, connect_timeout: float = 1.0,
+                 pool_size: int = 10, cache_ttl: float = 300.0, negative_cache_ttl: float = 30.0,
+                 cache_size: int = 1024, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, timeout)
+        self.pool_size = pool_size
+        self.negative_cache_ttl = negative_cache_ttl
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl, name='teams')
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.counters = {
+            'requests': 0,
+            'errors': 0,
+            'shortCircuited': 0
+        }
+        self._session = None
+    
+    @classmethod
+    def from_config(cls, config, base_url: str = None):
+        """
+        Cliente con la configuración TEAMS_* de la aplicación; base_url
+        sustituye a TEAMS_SERVICE_URL
+        """
+        return cls(
+            base_url=base_url or config['TEAMS_SERVICE_URL'],
+            timeout=config['TEAMS_SERVICE_TIMEOUT'],
+            connect_timeout=config['TEAMS_SERVICE_CONNECT_TIMEOUT'],
+            pool_size=config['TEAMS_SERVICE_POOL_SIZE'],
+            cache_ttl=config['TEAMS_CACHE_TTL'],
+            negative_cache_ttl=config['TEAMS_NEGATIVE_CACHE_TTL'],
+            failure_threshold=config['TEAMS_CIRCUIT_FAILURE_THRESHOLD'],
+            reset_timeout=config['TEAMS_CIRCUIT_RESET_TIMEOUT']
+        )
+    
+    @property
+    def session(self):
+        """
+        Sesión con pool de conexiones (se crea en el primer uso, después del fork)
+        
+        requests se importa aquí: solo lo usan las altas y no retrasa el arranque
+        """
+        if self._session is None:
+            import requests
+            
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self.pool_size
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+    
+    def team_exists(self, team_id: int) -> bool:
+        """
+        Indica si el equipo existe
+        
+        Si el teams-service no responde (o el circuito está abierto) se permite
+        la operación, igual que antes
+        """
+        known = self._precheck(team_id)
+        if known is not None:
+            return known
+        
+        import requests
+        
+        start = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}/{team_id}", timeout=self.timeout)
+        except requests.RequestException as e:
+            return self._record_error(start, f"No se pudo verificar equipo: {str(e)}")
+        return self._record_response(team_id, response.status_code, start)
+    
+    def _precheck(self, team_id: int):
+        """
+        Resultado sin llamar al servicio (caché o circuito abierto); None si
+        hay que llamarlo
+        """
+        cached = self.cache.get(team_id)
+        if cached is not None:
+            TEAMS_SERVICE_CHECKS.labels('cache').inc()
+            return cached
+        
+        if not self.breaker.allow_request():
+            self.counters['shortCircuited'] += 1
+            TEAMS_SERVICE_CHECKS.labels('short_circuited').inc()
+            logger.warning(f"Circuito abierto, no se verifica el equipo {team_id}")
+            return True
+        
+        self.counters['requests'] += 1
+        return None
+    
+    def _record_error(self, start: float, message: str) -> bool:
+        """Registra un fallo del servicio; la operación se permite"""
+        TEAMS_SERVICE_LATENCY.labels('error').observe(time.perf_counter() - start)
+        TEAMS_SERVICE_CHECKS.labels('error').inc()
+        self.counters['errors'] += 1
+        self.breaker.record_failure()
+        logger.warning(message)
+        return True
+    
+    def _record_response(self, team_id: int, status_code: int, start: float) -> bool:
+        """Interpreta la respuesta del servicio y la guarda en caché"""
+        if status_code >= 500:
+            return self._record_error(
+                start, f"teams-service respondió {status_code} para el equipo {team_id}"
+            )
+        
+        self.breaker.record_success()
+        exists = status_code == 200
+        outcome = 'ok' if exists else 'not_found'
+        TEAMS_SERVICE_LATENCY.labels(outcome).observe(time.perf_counter() - start)
+        TEAMS_SERVICE_CHECKS.labels(outcome).inc()
+        self.cache.set(team_id, exists, None if exists else self.negative_cache_ttl)
+        return exists
+    
+    def stats(self) -> dict:
+        """Estado del circuito y contadores del cliente"""
+        breaker = self.breaker.snapshot()
+        return {
+            'circuit': breaker['state'],
+            'circuitOpened': breaker['timesOpened'],
+            'consecutiveFailures': breaker['failures'],
+            **self.counters,
+            'cache': self.cache.stats()
+        }
+    
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def init_teams_client(app):
+    """
+    Crea el cliente del teams-service con la configuración de la aplicación
+    """
+    global teams_client
+    
+    teams_client = TeamsClient.from_config(app.config)
+    return teams_client
+
+
+def get_teams_client(base_url: str = None) -> TeamsClient:
+    """
+    Obtiene el cliente del teams-service
+    
+    Si base_url no coincide con la del cliente inicializado se crea otro con
+    el resto de la configuración TEAMS_* de la aplicación (timeouts, circuito,
+    TTLs); la caché del anterior se pierde, así que se avisa en el log
+    """
+    global teams_client
+    if teams_client is None or (base_url and base_url != teams_client.base_url):
+        replaced = teams_client
+        teams_client = TeamsClient.from_config(current_app.config, base_url)
+        if replaced is not None:
+            log_replaced_client(replaced, teams_client)
+            replaced.close()
+    return teams_client
+
+
+def log_replaced_client(replaced: TeamsClient, client: TeamsClient):
+    """Avisa de que se sustituyó el cliente (y su caché) por otra URL"""
+    logger.warning(
+        f"URL del teams-service cambió ({replaced.base_url} -> {client.base_url}): "
+        f"se crea un cliente nuevo y se descarta la caché de equipos"
+    )
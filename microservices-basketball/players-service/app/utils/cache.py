@@ -0,0 +1,153 @@
+"""
+Caché en memoria (por worker) para lecturas de jugadores
+"""
+from collections import OrderedDict
+from threading import Lock
+from app.utils.metrics import record_cache_access
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Valor de player_id que invalida todas las entradas
+ALL = '*'
+
+# Caché global de jugadores por ID
+player_cache = None
+
+# Funciones listener(player_id) suscritas a invalidaciones
+_invalidation_listeners = []
+
+
+class TTLCache:
+    """
+    Caché LRU acotada con expiración por TTL, segura entre hilos
+    
+    Los valores se devuelven tal cual se guardaron: no deben modificarse
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, name: str = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+    
+    def get(self, key, default=None):
+        """Obtiene un valor vigente (y lo marca como usado recientemente)"""
+        value = _MISSING
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(key)
+                    value = entry[1]
+                else:
+                    del self._data[key]
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if self.name:
+            record_cache_access(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+    
+    def set(self, key, value, ttl: float = None):
+        """Guarda un valor, expulsando el menos usado si la caché está llena"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, key):
+        """Elimina una entrada si existe"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> dict:
+        """Contadores de uso de la caché"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / requests, 4) if requests else 0.0
+            }
+
+
+def add_invalidation_listener(listener):
+    """
+    Suscribe una caché local a las invalidaciones de jugadores
+    """
+    _invalidation_listeners.append(listener)
+
+
+def publish_invalidation(player_id):
+    """
+    Notifica a las cachés locales que un jugador cambió. ALL invalida todos
+    los jugadores
+    
+    Las plantillas no se cachean: su ETag sale de la versión leída del primario
+    """
+    for listener in list(_invalidation_listeners):
+        try:
+            listener(player_id)
+        except Exception as e:
+            logger.warning(f"Error invalidando caché: {str(e)}")
+
+
+def _invalidate_player(player_id):
+    """Listener de la caché de jugadores por ID"""
+    if player_id == ALL:
+        get_player_cache().clear()
+    else:
+        get_player_cache().invalidate(player_id)
+
+
+def init_cache(app):
+    """
+    Inicializa la caché de jugadores con la configuración de la aplicación
+    """
+    global player_cache
+    
+    player_cache = TTLCache(
+        maxsize=app.config['PLAYER_CACHE_SIZE'],
+        ttl=app.config['PLAYER_CACHE_TTL'],
+        name='players'
+    )
+    if _invalidate_player not in _invalidation_listeners:
+        add_invalidation_listener(_invalidate_player)
+    logger.info(
+        f"Caché de jugadores: {player_cache.maxsize} entradas, TTL {player_cache.ttl}s"
+    )
+    return player_cache
+
+
+def get_player_cache() -> TTLCache:
+    """
+    Obtiene la caché de jugadores (una caché vacía si no se ha inicializado)
+    """
+    global player_cache
+    if player_cache is None:
+        player_cache = TTLCache(maxsize=0)
+    return player_cache
@@ -0,0 +1,161 @@
+"""
+Coherencia de cachés entre workers usando change streams de MongoDB
+"""
+from pymongo.errors import OperationFailure, PyMongoError
+from app.utils.cache import ALL, get_player_cache, publish_invalidation
+from app.utils.database import get_db, reads_from_secondaries
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Códigos de error de MongoDB sin soporte de change streams (servidor standalone)
+CHANGE_STREAMS_UNSUPPORTED = (40573, 40324)
+
+# Código de error cuando el resume token ya no está en el oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+# Listener del worker actual
+change_listener = None
+
+
+def handle_change(change):
+    """
+    Traduce un evento del change stream de players a invalidaciones locales
+    """
+    operation = change.get('operationType')
+    
+    if operation not in ('insert', 'update', 'replace', 'delete'):
+        # drop, rename, dropDatabase, invalidate: se descarta todo
+        publish_invalidation(ALL)
+        return
+    
+    publish_invalidation(str(change['documentKey']['_id']))
+
+
+class PlayerChangeListener(threading.Thread):
+    """
+    Hilo en segundo plano que escucha el change stream de la colección players
+    
+    Mientras el stream está activo la caché de jugadores usa coherent_ttl; si
+    se pierde (o el servidor no soporta change streams) vuelve a base_ttl y
+    la coherencia queda en manos de la expiración por TTL
+    """
+    
+    def __init__(self, base_ttl: float, coherent_ttl: float, retry_delay: float = 5.0):
+        super().__init__(name='players-change-stream', daemon=True)
+        self.base_ttl = base_ttl
+        self.coherent_ttl = coherent_ttl
+        self.retry_delay = retry_delay
+        self.active = False
+        self._stop_event = threading.Event()
+    
+    def stop(self):
+        self._stop_event.set()
+    
+    def _set_active(self, active: bool):
+        if active == self.active:
+            return
+        self.active = active
+        cache = get_player_cache()
+        if active:
+            cache.ttl = self.coherent_ttl
+            logger.info(f"Change stream de players activo (TTL de caché {self.coherent_ttl}s)")
+        else:
+            # Lo cacheado con el TTL largo ya no está garantizado
+            cache.ttl = self.base_ttl
+            publish_invalidation(ALL)
+            logger.warning(f"Change stream de players inactivo (TTL de caché {self.base_ttl}s)")
+    
+    def run(self):
+        resume_token = None
+        collection = get_db().players
+        
+        while not self._stop_event.is_set():
+            try:
+                # Basta con documentKey (el _id del jugador): no se pide fullDocument
+                with collection.watch(
+                    resume_after=resume_token,
+                    max_await_time_ms=1000
+                ) as stream:
+                    if resume_token is None:
+                        # Sin resume token no se sabe qué cambió antes de abrir el stream
+                        publish_invalidation(ALL)
+                    self._set_active(True)
+                    
+                    while stream.alive and not self._stop_event.is_set():
+                        change = stream.try_next()
+                        if change is not None:
+                            handle_change(change)
+                        resume_token = stream.resume_token
+                    
+            except OperationFailure as e:
+                self._set_active(False)
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning(
+                        f"MongoDB no soporta change streams, se usa solo TTL: {str(e)}"
+                    )
+                    return
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    resume_token = None
+                logger.warning(f"Error en change stream de players: {str(e)}")
+                
+            except PyMongoError as e:
+                self._set_active(False)
+                logger.warning(f"Error en change stream de players: {str(e)}")
+            
+            self._stop_event.wait(self.retry_delay)
+        
+        self._set_active(False)
+
+
+def start_change_listener(app):
+    """
+    Arranca el listener del change stream en el proceso actual
+    
+    Debe llamarse en cada worker después del fork (los hilos no sobreviven al fork)
+    """
+    global change_listener
+    
+    if not app.config['PLAYER_CHANGE_STREAM_ENABLED']:
+        return None
+    
+    if change_listener is not None and change_listener.is_alive():
+        return change_listener
+    
+    # Con lecturas en secundarios, una entrada invalidada puede volver a
+    # llenarse desde un secundario atrasado: el TTL largo ya no es seguro
+    coherent_ttl = app.config['PLAYER_CACHE_COHERENT_TTL']
+    if reads_from_secondaries():
+        coherent_ttl = app.config['PLAYER_CACHE_TTL']
+        logger.info(
+            f"MONGO_READ_PREFERENCE={app.config['MONGO_READ_PREFERENCE']}: se ignora "
+            f"PLAYER_CACHE_COHERENT_TTL y la caché usa {coherent_ttl}s"
+        )
+    
+    change_listener = PlayerChangeListener(
+        base_ttl=app.config['PLAYER_CACHE_TTL'],
+        coherent_ttl=coherent_ttl,
+        retry_delay=app.config['PLAYER_CHANGE_STREAM_RETRY_DELAY']
+    )
+    change_listener.start()
+    return change_listener
+
+
+def stop_change_listener():
+    """
+    Detiene el listener del proceso actual
+    """
+    global change_listener
+    if change_listener is not None:
+        change_listener.stop()
+        change_listener = None
+
+
+def cache_is_coherent() -> bool:
+    """
+    Indica si la caché de jugadores de este proceso está al día: el change
+    stream está activo y la caché solo se rellena desde el primario (con
+    lecturas en secundarios una entrada invalidada puede volver atrasada)
+    """
+    return change_listener is not None and change_listener.active and not reads_from_secondaries()
@@ -0,0 +1,132 @@
+"""
+Compresión de respuestas (br/gzip) negociada con Accept-Encoding
+
+Solo se comprimen las respuestas JSON completas de al menos
+COMPRESSION_MIN_SIZE bytes. Las que llevan ETag (plantillas, jugador) guardan
+los bytes comprimidos por ETag y codificación, así que un cliente que consulta
+la misma versión no obliga a recomprimir. Al comprimir el ETag pasa a débil
+(W/"..."): la representación cambia pero la versión del recurso es la misma
+"""
+from flask import current_app, request
+from app.utils.cache import TTLCache
+from app.utils.timing import phase
+import gzip
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bytes comprimidos por (ETag, codificación)
+compressed_cache = None
+
+
+def available_encodings():
+    """Codificaciones soportadas, en orden de preferencia del servidor"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings):
+    """
+    Codificación con mayor calidad en Accept-Encoding (None si el cliente no
+    acepta ninguna); a igual calidad gana el orden de available_encodings
+    """
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, config) -> bytes:
+    """Comprime data con la codificación indicada"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+
+def compressible_encoding(response, streamed: bool, request, config):
+    """
+    Codificación con la que comprimir la respuesta (Flask o Quart) o None si
+    no se comprime; el tamaño mínimo se comprueba después, con el cuerpo
+    """
+    if (response.status_code != 200
+            or streamed
+            or response.mimetype not in config['COMPRESSION_MIMETYPES']
+            or 'Content-Encoding' in response.headers
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return None
+    
+    # La respuesta puede variar según Accept-Encoding aunque esta no se comprima
+    response.vary.add('Accept-Encoding')
+    return choose_encoding(request.accept_encodings)
+
+
+def apply_compression(response, data: bytes, encoding: str, path: str, config) -> bool:
+    """
+    Sustituye el cuerpo por data comprimido (reutilizando los bytes de la
+    misma versión si la respuesta lleva ETag); False si data es demasiado
+    pequeño para comprimirlo
+    """
+    if len(data) < config['COMPRESSION_MIN_SIZE']:
+        return False
+    
+    with phase('serialize'):
+        etag, weak = response.get_etag()
+        cache_key = (path, etag, encoding) if etag and not weak else None
+        
+        cached = compressed_cache.get(cache_key) if cache_key else None
+        # Se comprueba el tamaño por si el cuerpo cambió sin cambiar la versión
+        if cached is not None and cached[0] == len(data):
+            body = cached[1]
+        else:
+            body = compress(data, encoding, config)
+            if cache_key:
+                compressed_cache.set(cache_key, (len(data), body))
+    
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    return True
+
+
+def _compress_response(response):
+    config = current_app.config
+    encoding = compressible_encoding(response, response.is_streamed, request, config)
+    if encoding is not None:
+        apply_compression(response, response.get_data(), encoding, request.path, config)
+    return response
+
+
+def init_compressed_cache(config):
+    """
+    Crea la caché de bytes comprimidos (compartida por la app Flask y la Quart)
+    """
+    global compressed_cache
+    
+    compressed_cache = TTLCache(
+        maxsize=config['COMPRESSION_CACHE_SIZE'],
+        ttl=config['COMPRESSION_CACHE_TTL'],
+        name='compressed'
+    )
+    if config['COMPRESSION_ENABLED']:
+        logger.info(f"Compresión de respuestas: {', '.join(available_encodings())}")
+    return compressed_cache
+
+
+def init_compression(app):
+    """
+    Registra la compresión de respuestas y su caché
+    
+    Debe llamarse después de init_timing para que el tiempo de compresión
+    entre en la medición de la petición
+    """
+    init_compressed_cache(app.config)
+    if app.config['COMPRESSION_ENABLED']:
+        app.after_request(_compress_response)
+    return compressed_cache
@@ -4,6 +4,15 @@ Utilidades para la conexión a MongoDB
 from flask import current_app
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred
+)
+from app.utils.indexes import backfill_search_terms, sync_indexes, verify_indexes, verify_search_terms
+from app.utils.metrics import mongo_event_listeners
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,9 +21,82 @@ logger = logging.getLogger(__name__)
 mongo_client = None
 db = None
 
-def init_db(app):
+# Preferencia de lectura de las consultas de solo lectura
+read_preference = Primary()
+
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+
+def mongo_client_options(config) -> dict:
+    """
+    Opciones de MongoClient: timeouts, pool de conexiones y compresión
+    """
+    options = {
+        'serverSelectionTimeoutMS': 5000,
+        'connectTimeoutMS': 10000,
+        'socketTimeoutMS': 10000,
+        'maxPoolSize': config['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': config['MONGO_MIN_POOL_SIZE']
+    }
+    if config['MONGO_MAX_IDLE_TIME_MS'] is not None:
+        options['maxIdleTimeMS'] = config['MONGO_MAX_IDLE_TIME_MS']
+    if config['MONGO_WAIT_QUEUE_TIMEOUT_MS'] is not None:
+        options['waitQueueTimeoutMS'] = config['MONGO_WAIT_QUEUE_TIMEOUT_MS']
+    if config['MONGO_COMPRESSORS']:
+        options['compressors'] = config['MONGO_COMPRESSORS']
+    return options
+
+
+def init_read_preference(config):
+    """
+    Configura la preferencia de lectura de las consultas de solo lectura
+    (MONGO_READ_PREFERENCE con MONGO_MAX_STALENESS_SECONDS)
+    """
+    global read_preference
+    
+    name = config['MONGO_READ_PREFERENCE']
+    if name not in READ_PREFERENCES:
+        raise ValueError(
+            f"MONGO_READ_PREFERENCE inválida: {name}. Opciones: {', '.join(READ_PREFERENCES)}"
+        )
+    
+    if name == 'primary':
+        read_preference = Primary()
+    else:
+        max_staleness = config['MONGO_MAX_STALENESS_SECONDS'] or -1
+        read_preference = READ_PREFERENCES[name](max_staleness=max_staleness)
+    
+    logger.info(f"Preferencia de lectura: {read_preference}")
+    return read_preference
+
+
+def get_read_preference():
+    """
+    Preferencia de lectura para consultas de solo lectura
+    """
+    return read_preference
+
+
+def reads_from_secondaries() -> bool:
+    """
+    Indica si las consultas de solo lectura pueden ir a un secundario
+    """
+    return read_preference.mode != Primary().mode
+
+
+def init_db(app, indexes: bool = True):
     """
     Inicializa la conexión a MongoDB
+    
+    El cliente es propio de cada proceso (MongoClient no sobrevive a un fork):
+    con gunicorn y preload_app se llama en post_fork sin revisar los índices
+    (indexes=False), porque el master ya lo hizo con check_indexes_once
     """
     global mongo_client, db
     
@@ -27,10 +109,10 @@ def init_db(app):
         # Crear cliente MongoDB
         mongo_client = MongoClient(
             mongo_uri,
-            serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=10000,
-            socketTimeoutMS=10000
+            event_listeners=mongo_event_listeners(),
+            **mongo_client_options(app.config)
         )
+        init_read_preference(app.config)
         
         # Verificar conexión
         mongo_client.admin.command('ping')
@@ -38,8 +120,9 @@ def init_db(app):
         # Seleccionar base de datos
         db = mongo_client[database_name]
         
-        # Crear índices
-        create_indexes(db)
+        # Verificar (o crear, en desarrollo) los índices declarados
+        if indexes:
+            check_indexes(db, app.config['MONGO_INDEXES_ON_STARTUP'])
         
         logger.info(f"Conectado exitosamente a MongoDB: {database_name}")
         
@@ -53,36 +136,42 @@ def init_db(app):
         raise
 
 
-def create_indexes(db):
+def check_indexes(db, mode: str = 'verify'):
+    """
+    Revisión de índices al arrancar según MONGO_INDEXES_ON_STARTUP
+
+    verify solo comprueba que existen (y que no faltan searchTerms); sync crea
+    los que faltan (sin eliminar obsoletos) y calcula los searchTerms
+    pendientes; off no hace nada. Los errores solo se registran
+    """
+    if mode == 'verify':
+        indexes_ok = verify_indexes(db.players)
+        return verify_search_terms(db.players) and indexes_ok
+    if mode == 'sync':
+        try:
+            sync_indexes(db.players, drop_obsolete=False)
+            backfill_search_terms(db.players)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Error creando índices: {str(e)}")
+    return False
+
+
+def check_indexes_once(app):
     """
-    Crea índices en las colecciones de MongoDB
+    Revisa los índices con un cliente temporal que se cierra al terminar
+    
+    Pensado para el master de gunicorn: revisa una sola vez antes del fork sin
+    que quede ningún cliente abierto que los workers hereden
     """
     try:
-        # Índices para la colección players
-        players_collection = db.players
-        
-        # Índice único por equipoId + numeroCamiseta (un número por equipo)
-        players_collection.create_index([
-            ('equipoId', 1),
-            ('numeroCamiseta', 1)
-        ], unique=True, name='idx_equipo_numero')
-        
-        # Índice para búsquedas por equipo
-        players_collection.create_index('equipoId', name='idx_equipo')
-        
-        # Índice para búsquedas por nombre
-        players_collection.create_index([
-            ('nombre', 1),
-            ('apellidos', 1)
-        ], name='idx_nombre_completo')
-        
-        # Índice para filtrar activos
-        players_collection.create_index('activo', name='idx_activo')
-        
-        logger.info("Índices de MongoDB creados exitosamente")
-        
+        client = MongoClient(app.config['MONGO_URI'], **mongo_client_options(app.config))
+        try:
+            check_indexes(client[app.config['MONGO_DATABASE']], app.config['MONGO_INDEXES_ON_STARTUP'])
+        finally:
+            client.close()
     except Exception as e:
-        logger.warning(f"⚠️ Error creando índices: {str(e)}")
+        logger.warning(f"⚠️ No se pudieron revisar los índices: {str(e)}")
 
 
 def get_db():
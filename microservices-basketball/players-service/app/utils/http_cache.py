@@ -0,0 +1,43 @@
+"""
+Utilidades para GET condicionales (ETag / If-None-Match)
+"""
+from flask import current_app, request
+import hashlib
+
+
+def compute_etag(*parts) -> str:
+    """
+    ETag fuerte a partir de las partes que identifican la versión del recurso
+    """
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def is_not_modified(etag: str, req=None) -> bool:
+    """
+    Indica si el cliente ya tiene la versión etag (If-None-Match)
+    
+    req permite pasar la petición de otra app (Quart); por defecto la de Flask.
+    La comparación es débil: las respuestas comprimidas llevan W/"etag"
+    """
+    if req is None:
+        req = request
+    return req.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag: str, response_class=None):
+    """
+    Respuesta 304 Not Modified sin cuerpo
+    """
+    if response_class is None:
+        response_class = current_app.response_class
+    return with_etag(response_class(status=304), etag)
+
+
+def with_etag(response, etag: str):
+    """
+    Añade el ETag a la respuesta y obliga al cliente a revalidar antes de reutilizarla
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,185 @@
+"""
+Índices declarados de la colección players y su sincronización
+
+La lista PLAYER_INDEXES es la fuente de verdad. `flask players-indexes sync`
+compara con los índices de MongoDB, crea los que faltan o cambiaron y elimina
+los que ya no están declarados. Al arrancar la app solo se verifica (ver
+MONGO_INDEXES_ON_STARTUP), así que ningún worker construye índices en el boot
+
+La sincronización también calcula searchTerms (los datos de idx_search_terms)
+de los jugadores que no lo tienen
+"""
+from typing import Dict, List
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from app.models.player import LEADERBOARD_STATS, search_terms, serialize_player
+import logging
+
+logger = logging.getLogger(__name__)
+
+PLAYER_INDEXES = [
+    # Un número de camiseta por equipo
+    IndexModel([('equipoId', ASCENDING), ('numeroCamiseta', ASCENDING)],
+               name='idx_equipo_numero', unique=True),
+    # Búsquedas por equipo
+    IndexModel([('equipoId', ASCENDING)], name='idx_equipo'),
+    # Paginación por cursor (_id) dentro de un equipo
+    IndexModel([('equipoId', ASCENDING), ('_id', ASCENDING)], name='idx_equipo_cursor'),
+    # Versión de la plantilla (ETag) resuelta solo desde el índice
+    IndexModel([('equipoId', ASCENDING), ('updatedAt', DESCENDING)], name='idx_equipo_updated'),
+    # Búsquedas por nombre
+    IndexModel([('nombre', ASCENDING), ('apellidos', ASCENDING)], name='idx_nombre_completo'),
+    # Búsqueda por prefijo (autocompletado) sobre el nombre normalizado
+    IndexModel([('searchTerms', ASCENDING)], name='idx_search_terms'),
+    # Filtrar activos
+    IndexModel([('activo', ASCENDING)], name='idx_activo'),
+] + [
+    # Parciales (solo activos) para los rankings de líderes de la liga
+    IndexModel([(f'estadisticas.{stat}', DESCENDING)], name=f'idx_lider_{stat}',
+               partialFilterExpression={'activo': True})
+    for stat in LEADERBOARD_STATS
+]
+
+# Opciones que distinguen dos definiciones del mismo índice
+COMPARED_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds')
+
+
+def _definition(index: Dict) -> Dict:
+    """Claves y opciones relevantes de un índice (declarado o de index_information)"""
+    keys = index['key'].items() if hasattr(index['key'], 'items') else index['key']
+    definition = {
+        'key': [(field, int(direction) if isinstance(direction, float) else direction)
+                for field, direction in keys]
+    }
+    for option in COMPARED_OPTIONS:
+        if index.get(option):
+            definition[option] = index[option]
+    return definition
+
+
+def index_diff(collection, declared: List[IndexModel] = None) -> Dict[str, List[str]]:
+    """
+    Compara los índices declarados con los de la colección
+    
+    Devuelve los nombres agrupados en missing (no existen), changed (existen
+    con otra definición), obsolete (no declarados) y ok
+    """
+    declared = PLAYER_INDEXES if declared is None else declared
+    live = collection.index_information()
+    diff = {'missing': [], 'changed': [], 'obsolete': [], 'ok': []}
+    
+    names = set()
+    for model in declared:
+        name = model.document['name']
+        names.add(name)
+        if name not in live:
+            diff['missing'].append(name)
+        elif _definition(model.document) != _definition(live[name]):
+            diff['changed'].append(name)
+        else:
+            diff['ok'].append(name)
+    
+    diff['obsolete'] = sorted(name for name in live if name != '_id_' and name not in names)
+    return diff
+
+
+def sync_indexes(collection, declared: List[IndexModel] = None, drop_obsolete: bool = True,
+                 dry_run: bool = False) -> Dict[str, List[str]]:
+    """
+    Deja la colección con los índices declarados y devuelve la diferencia encontrada
+    
+    Los índices con otra definición se eliminan y se vuelven a crear; los
+    obsoletos se eliminan al final, cuando los nuevos ya existen
+    """
+    declared = PLAYER_INDEXES if declared is None else declared
+    diff = index_diff(collection, declared)
+    if dry_run:
+        return diff
+    
+    for name in diff['changed']:
+        collection.drop_index(name)
+        logger.info(f"Índice {name} eliminado para recrearlo")
+    
+    pending = set(diff['missing']) | set(diff['changed'])
+    to_create = [model for model in declared if model.document['name'] in pending]
+    if to_create:
+        collection.create_indexes(to_create)
+        logger.info(f"Índices creados: {', '.join(sorted(pending))}")
+    
+    if drop_obsolete:
+        for name in diff['obsolete']:
+            collection.drop_index(name)
+            logger.info(f"Índice obsoleto eliminado: {name}")
+    
+    return diff
+
+
+def verify_indexes(collection) -> bool:
+    """
+    Comprueba al arrancar que existen los índices declarados, sin construir
+    ninguno; solo avisa en el log si hay que ejecutar la sincronización
+    """
+    try:
+        diff = index_diff(collection)
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron verificar los índices: {str(e)}")
+        return False
+    
+    pending = diff['missing'] + diff['changed']
+    if pending:
+        logger.warning(
+            f"⚠️ Índices pendientes en {collection.name}: {', '.join(pending)}. "
+            f"Ejecuta `flask players-indexes sync`"
+        )
+        return False
+    
+    logger.info(f"Índices de {collection.name} verificados ({len(diff['ok'])})")
+    return True
+
+
+def backfill_search_terms(collection, batch_size: int = 1000) -> int:
+    """
+    Calcula searchTerms de los jugadores que no lo tienen (datos anteriores a
+    la búsqueda o insertados fuera del servicio). Devuelve cuántos se actualizaron
+    """
+    cursor = collection.find(
+        {'searchTerms': {'$exists': False}},
+        {'nombre': 1, 'apellidos': 1, 'nombreCompleto': 1}
+    ).batch_size(batch_size)
+    
+    updated = 0
+    operations = []
+    for player_doc in cursor:
+        nombre = serialize_player(player_doc, ('nombre', 'apellidos'))
+        operations.append(UpdateOne(
+            {'_id': player_doc['_id']},
+            {'$set': {'searchTerms': search_terms(nombre['nombre'], nombre['apellidos'])}}
+        ))
+        if len(operations) >= batch_size:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += collection.bulk_write(operations, ordered=False).modified_count
+    
+    if updated:
+        logger.info(f"searchTerms calculado para {updated} jugadores")
+    return updated
+
+
+def verify_search_terms(collection) -> bool:
+    """
+    Comprueba al arrancar que todos los jugadores tienen searchTerms: sin él
+    la búsqueda no los encuentra, así que solo avisa en el log
+    """
+    try:
+        pending = collection.find_one({'searchTerms': {'$exists': False}}, {'_id': 1})
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudo verificar searchTerms: {str(e)}")
+        return False
+    
+    if pending is not None:
+        logger.warning(
+            f"⚠️ Hay jugadores sin searchTerms en {collection.name}: la búsqueda no los "
+            f"encuentra. Ejecuta `flask players-indexes sync` o `flask players-search reindex`"
+        )
+        return False
+    return True
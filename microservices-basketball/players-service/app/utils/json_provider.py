@@ -0,0 +1,84 @@
+"""
+Proveedor JSON de la aplicación
+"""
+from flask.json.provider import DefaultJSONProvider
+from bson import ObjectId
+from datetime import date, datetime, timezone
+import decimal
+import orjson
+from app.utils.timing import phase
+
+# Formatos de fecha de JSON_DATETIME_FORMAT
+#   iso       2024-03-01T18:30:00.123000 (igual que datetime.isoformat())
+#   iso-utc   2024-03-01T18:30:00.123000Z (las fechas de MongoDB son UTC)
+#   epoch-ms  1709317800123 (milisegundos desde epoch; date como 'YYYY-MM-DD')
+DATETIME_FORMATS = {
+    'iso': 0,
+    'iso-utc': orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+    'epoch-ms': orjson.OPT_NAIVE_UTC | orjson.OPT_PASSTHROUGH_DATETIME,
+}
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON por defecto de Flask que mide la serialización (fase serialize)"""
+    
+    def response(self, *args, **kwargs):
+        with phase('serialize'):
+            return super().response(*args, **kwargs)
+
+
+def _default(value):
+    """Tipos que orjson no serializa por sí mismo"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        # Solo llega aquí con epoch-ms (OPT_PASSTHROUGH_DATETIME)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Objeto de tipo {type(value).__name__} no serializable a JSON")
+
+
+class OrjsonJSONProvider(TimedJSONProvider):
+    """
+    Proveedor JSON con orjson: serializa datetime, date y ObjectId sin
+    convertirlos antes en el modelo
+    
+    El formato de las fechas sale de JSON_DATETIME_FORMAT; sort_keys y compact
+    se respetan como en el proveedor por defecto. Sirve también para Quart
+    """
+    
+    def __init__(self, app):
+        super().__init__(app)
+        datetime_format = app.config.get('JSON_DATETIME_FORMAT', 'iso')
+        if datetime_format not in DATETIME_FORMATS:
+            raise ValueError(
+                f"JSON_DATETIME_FORMAT inválido: {datetime_format}. "
+                f"Opciones: {', '.join(DATETIME_FORMATS)}"
+            )
+        self.options = DATETIME_FORMATS[datetime_format]
+        if self.sort_keys:
+            self.options |= orjson.OPT_SORT_KEYS
+    
+    def encode(self, obj, indent: bool = False) -> bytes:
+        """Serializa obj a bytes UTF-8"""
+        options = self.options | orjson.OPT_INDENT_2 if indent else self.options
+        return orjson.dumps(obj, default=_default, option=options)
+    
+    def dumps(self, obj, **kwargs) -> str:
+        # Los kwargs de json.dumps no aplican a orjson
+        return self.encode(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        with phase('serialize'):
+            body = self.encode(obj, indent)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,223 @@
+"""
+Métricas Prometheus del servicio (peticiones HTTP, MongoDB, teams-service y cachés)
+
+Con varios workers de gunicorn hay que definir PROMETHEUS_MULTIPROC_DIR (un
+directorio vacío y escribible) antes de arrancar: cada worker escribe sus
+valores ahí y /metrics los agrega
+"""
+from flask import g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from app.utils.timing import record_db_finished, record_db_started
+import os
+import threading
+import time
+
+# Buckets en segundos, de 1 ms a 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    'players_http_requests_total',
+    'Peticiones HTTP atendidas',
+    ['method', 'route', 'status']
+)
+HTTP_LATENCY = Histogram(
+    'players_http_request_duration_seconds',
+    'Latencia de las peticiones HTTP',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    'players_mongo_command_duration_seconds',
+    'Duración de los comandos de MongoDB',
+    ['command', 'collection', 'outcome'],
+    buckets=LATENCY_BUCKETS
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    'players_mongo_pool_connections',
+    'Conexiones del pool de MongoDB (open: abiertas, checked_out: en uso)',
+    ['state'],
+    multiprocess_mode='livesum'
+)
+MONGO_POOL_WAIT = Histogram(
+    'players_mongo_pool_wait_seconds',
+    'Espera para obtener una conexión del pool de MongoDB',
+    buckets=LATENCY_BUCKETS
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    'players_mongo_pool_checkout_failures_total',
+    'Fallos al obtener una conexión del pool de MongoDB',
+    ['reason']
+)
+TEAMS_SERVICE_LATENCY = Histogram(
+    'players_teams_service_duration_seconds',
+    'Latencia de las llamadas al teams-service',
+    ['outcome'],
+    buckets=LATENCY_BUCKETS
+)
+TEAMS_SERVICE_CHECKS = Counter(
+    'players_teams_service_checks_total',
+    'Verificaciones de equipo por resultado (cache, short_circuited, ok, not_found, error)',
+    ['result']
+)
+TEAMS_CIRCUIT_TRANSITIONS = Counter(
+    'players_teams_circuit_transitions_total',
+    'Cambios de estado del circuit breaker del teams-service',
+    ['state']
+)
+TEAMS_CIRCUIT_STATE = Gauge(
+    'players_teams_circuit_state',
+    'Estado del circuit breaker del teams-service (1 en el estado actual; con '
+    'varios workers, cuántos están en cada estado)',
+    ['state'],
+    multiprocess_mode='livesum'
+)
+CACHE_REQUESTS = Counter(
+    'players_cache_requests_total',
+    'Consultas a las cachés en memoria por resultado (hit, miss)',
+    ['cache', 'result']
+)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Registra la duración de cada comando de MongoDB por comando y colección"""
+    
+    def __init__(self):
+        self._collections = {}
+    
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if event.command_name == 'getMore':
+            collection = event.command.get('collection')
+        collection = collection if isinstance(collection, str) else ''
+        self._collections[(event.connection_id, event.request_id)] = collection
+        record_db_started(event.command_name, collection, event.command)
+    
+    def _observe(self, event, outcome):
+        collection = self._collections.pop((event.connection_id, event.request_id), '')
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_LATENCY.labels(event.command_name, collection, outcome).observe(seconds)
+        record_db_finished(seconds)
+    
+    def succeeded(self, event):
+        self._observe(event, 'success')
+    
+    def failed(self, event):
+        self._observe(event, 'failure')
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Conexiones abiertas/en uso del pool y tiempo de espera para obtener una"""
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.labels('open').inc()
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.labels('open').dec()
+    
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+    
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        MONGO_POOL_CHECKOUT_FAILURES.labels(str(event.reason)).inc()
+    
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        if started is not None:
+            MONGO_POOL_WAIT.observe(time.perf_counter() - started)
+            self._local.started = None
+        MONGO_POOL_CONNECTIONS.labels('checked_out').inc()
+    
+    def connection_checked_in(self, event):
+        MONGO_POOL_CONNECTIONS.labels('checked_out').dec()
+
+
+def mongo_event_listeners() -> list:
+    """Listeners de pymongo para pasar a MongoClient(event_listeners=...)"""
+    return [MongoCommandListener(), MongoPoolListener()]
+
+
+def set_circuit_state(state: str, states):
+    """Marca state como el estado actual del circuito del teams-service"""
+    for name in states:
+        TEAMS_CIRCUIT_STATE.labels(name).set(1 if name == state else 0)
+
+
+def record_cache_access(cache_name: str, hit: bool):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        labels = request_labels(request, response.status_code)
+        if response.is_streamed:
+            # NDJSON: el cuerpo se genera al enviarlo, se mide hasta cerrar el stream
+            response.call_on_close(lambda: observe_request(labels, start))
+        else:
+            observe_request(labels, start)
+    return response
+
+
+def request_labels(request, status: int) -> tuple:
+    """Etiquetas method, route y status de una petición de Flask o de Quart"""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    return (request.method, route, str(status))
+
+
+def observe_request(labels, start: float):
+    HTTP_REQUESTS.labels(*labels).inc()
+    HTTP_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+
+
+def init_metrics(app):
+    """
+    Registra la medición de latencia por ruta y estado en la aplicación
+    """
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+
+
+def render_metrics():
+    """
+    Métricas en formato de texto de Prometheus (agregadas entre workers si
+    PROMETHEUS_MULTIPROC_DIR está definido)
+    """
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,124 @@
+"""
+Lectura y validación de query params y cuerpos de /api/players
+
+Reciben args (MultiDict de la petición) y config en lugar de usar los proxies
+de Flask, para que los compartan la app WSGI (Flask) y la ASGI (Quart)
+"""
+from typing import Dict, List, Optional, Tuple
+from marshmallow import ValidationError
+from app.models.player import Player
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def parse_filters(args) -> Dict:
+    """Filtros de GET /api/players: equipoId, activo y posicion"""
+    filters = {}
+    for name in ('equipoId', 'activo', 'posicion'):
+        if args.get(name):
+            filters[name] = args.get(name)
+    return filters
+
+
+def parse_fields(args) -> Optional[Tuple[str, ...]]:
+    """Lee el query param fields (None si se piden todos los campos)"""
+    return Player.parse_fields(args.get('fields'))
+
+
+def parse_pagination(args, config) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Lee los query params limit y cursor
+
+    Devuelve (None, None) si la petición no pide paginación
+    """
+    limit = args.get('limit')
+    cursor = args.get('cursor')
+
+    if limit is None and cursor is None:
+        return None, None
+
+    if limit is None:
+        limit = config['PLAYERS_DEFAULT_PAGE_SIZE']
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("El parámetro limit debe ser un entero")
+        if limit < 1:
+            raise ValueError("El parámetro limit debe ser mayor que 0")
+
+    return min(limit, config['PLAYERS_MAX_PAGE_SIZE']), cursor
+
+
+def wants_stream(args, accept_mimetypes) -> bool:
+    """
+    Indica si el cliente pidió la exportación en streaming
+    (Accept: application/x-ndjson o ?stream=1)
+    """
+    if args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    best = accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def parse_leaders(args, config) -> Tuple[str, int, Optional[int]]:
+    """Query params de GET /api/players/leaders: (stat, limit, equipoId)"""
+    stat = args.get('stat', 'promedioAnotaciones')
+
+    try:
+        limit = int(args.get('limit', config['PLAYERS_LEADERS_DEFAULT_LIMIT']))
+        team_id = args.get('equipoId')
+        team_id = int(team_id) if team_id else None
+    except ValueError:
+        raise ValueError("limit y equipoId deben ser enteros")
+    if limit < 1:
+        raise ValueError("El parámetro limit debe ser mayor que 0")
+
+    return stat, min(limit, config['PLAYERS_LEADERS_MAX_LIMIT']), team_id
+
+
+def parse_search_limit(args, config) -> int:
+    """Query param limit de GET /api/players/search"""
+    try:
+        limit = int(args.get('limit', config['PLAYERS_SEARCH_DEFAULT_LIMIT']))
+    except ValueError:
+        raise ValueError("El parámetro limit debe ser un entero")
+    if limit < 1:
+        raise ValueError("El parámetro limit debe ser mayor que 0")
+    return min(limit, config['PLAYERS_SEARCH_MAX_LIMIT'])
+
+
+def bulk_payload_error(payload, config, expected: str, entity: str) -> Optional[str]:
+    """
+    Error del cuerpo de un endpoint masivo (None si es una lista válida de
+    tamaño permitido). expected describe cada elemento y entity los nombra
+    en el mensaje del máximo
+    """
+    if not isinstance(payload, list) or not payload:
+        return f'Se esperaba una lista de {expected}'
+
+    max_items = config['PLAYERS_BULK_MAX_ITEMS']
+    if len(payload) > max_items:
+        return f'Máximo {max_items} {entity} por petición'
+    return None
+
+
+def load_many(schema, items: List) -> Tuple[List, Dict]:
+    """
+    Valida una lista con un schema many=True; los elementos con errores se
+    devuelven aparte, por índice
+    """
+    try:
+        return schema.load(items), {}
+    except ValidationError as e:
+        return e.valid_data, e.messages
+
+
+def bulk_status(succeeded: int, total: int, success_status: int = 201) -> int:
+    """
+    success_status (201 al crear, 200 al actualizar) si todos salieron bien,
+    207 si solo algunos, 400 si ninguno
+    """
+    if succeeded == total:
+        return success_status
+    return 207 if succeeded else 400
@@ -0,0 +1,195 @@
+"""
+Medición por fases de cada petición: cabecera Server-Timing y log de peticiones lentas
+
+Fases: validate (marshmallow), db (comandos de MongoDB), model (conversión de
+documentos) y serialize (JSON). El tiempo de db que ocurre dentro de otra fase
+(p. ej. getMore mientras se recorre un cursor) se descuenta de esa fase
+"""
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+import json
+import logging
+import time
+
+try:
+    import quart
+except ImportError:  # quart solo se instala para el modo ASGI
+    quart = None
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('app.slow_requests')
+
+# Máximo de formas de consulta guardadas por petición para el log de lentas
+MAX_QUERY_SHAPES = 20
+
+PHASES = ('validate', 'db', 'model', 'serialize')
+
+
+class RequestTimer:
+    """Acumulador de tiempos de una petición"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.db_commands = 0
+        self.documents = 0
+        self.queries = []
+    
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def current_timer():
+    """
+    Timer de la petición en curso, de Flask o de Quart (None fuera de una
+    petición). motor copia el contexto a sus hilos, así que los comandos de
+    MongoDB del modo ASGI también se suman a su petición
+    """
+    if has_request_context():
+        return g.get('request_timer')
+    if quart is not None and quart.has_request_context():
+        return quart.g.get('request_timer')
+    return None
+
+
+@contextmanager
+def phase(name: str):
+    """Mide un bloque como la fase name de la petición en curso"""
+    timer = current_timer()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    db_before = timer.phases['db']
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timer.add(name, elapsed - (timer.phases['db'] - db_before))
+
+
+def record_documents(count: int):
+    """Suma documentos devueltos por la petición en curso"""
+    timer = current_timer()
+    if timer is not None:
+        timer.documents += count
+
+
+def query_shape(value, depth: int = 0):
+    """Forma de una consulta: mismas claves y operadores, valores sustituidos por '?'"""
+    if depth > 4:
+        return '...'
+    if isinstance(value, dict):
+        return {key: query_shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, list):
+        return [query_shape(value[0], depth + 1)] if value else []
+    return '?'
+
+
+def command_shape(command_name: str, collection: str, command) -> dict:
+    """Resumen de un comando de MongoDB para el log de peticiones lentas"""
+    shape = {'command': command_name, 'collection': collection}
+    if 'filter' in command:
+        shape['filter'] = query_shape(command['filter'])
+    elif 'query' in command:
+        shape['filter'] = query_shape(command['query'])
+    elif 'pipeline' in command:
+        shape['pipeline'] = [next(iter(stage), '?') for stage in command['pipeline']]
+    elif command_name in ('update', 'delete') and command.get(f'{command_name}s'):
+        shape['filter'] = query_shape(command[f'{command_name}s'][0].get('q', {}))
+    if 'sort' in command:
+        shape['sort'] = list(command['sort'])
+    return shape
+
+
+def record_db_started(command_name: str, collection: str, command):
+    """Guarda la forma del comando (lo llama el CommandListener de pymongo)"""
+    timer = current_timer()
+    if timer is not None and len(timer.queries) < MAX_QUERY_SHAPES:
+        timer.queries.append(command_shape(command_name, collection, command))
+
+
+def record_db_finished(seconds: float):
+    """Suma la duración de un comando de MongoDB a la fase db"""
+    timer = current_timer()
+    if timer is not None:
+        timer.db_commands += 1
+        timer.add('db', seconds)
+
+
+def _start_timer():
+    g.request_timer = RequestTimer()
+
+
+def _finish_timer(response):
+    timer = g.get('request_timer')
+    if timer is None:
+        return response
+    
+    if current_app.config['SERVER_TIMING_ENABLED']:
+        response.headers['Server-Timing'] = server_timing(timer, response.is_streamed)
+    
+    threshold = current_app.config['SLOW_REQUEST_THRESHOLD_MS']
+    summary = slow_request_summary(request, response.status_code, response.is_streamed)
+    
+    if response.is_streamed:
+        # El timer sigue en g: las fases de la generación del cuerpo (NDJSON)
+        # se suman mientras se envía y el log usa la duración hasta cerrar el stream
+        response.call_on_close(lambda: log_slow_request(timer, threshold, summary))
+    else:
+        g.pop('request_timer', None)
+        log_slow_request(timer, threshold, summary)
+    
+    return response
+
+
+def slow_request_summary(request, status: int, streamed: bool) -> dict:
+    """Datos de la petición para el log de lentas (request de Flask o de Quart)"""
+    summary = {
+        'event': 'slow_request',
+        'method': request.method,
+        'path': request.path,
+        'route': request.url_rule.rule if request.url_rule else None,
+        'query': request.query_string.decode('utf-8', 'replace'),
+        'status': status
+    }
+    if streamed:
+        summary['streamed'] = True
+    return summary
+
+
+def server_timing(timer: RequestTimer, streamed: bool) -> str:
+    """
+    Cabecera Server-Timing con las fases medidas hasta ahora
+    
+    En una respuesta en streaming las cabeceras salen antes que el cuerpo: en
+    vez de total se informa headers, el tiempo hasta enviarlas
+    """
+    elapsed = time.perf_counter() - timer.start
+    entries = [
+        f'{name};dur={seconds * 1000:.2f}'
+        for name, seconds in timer.phases.items() if seconds > 0
+    ]
+    entries.append(f'{"headers" if streamed else "total"};dur={elapsed * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def log_slow_request(timer: RequestTimer, threshold: float, summary: dict):
+    total = time.perf_counter() - timer.start
+    if threshold and total * 1000 >= threshold:
+        slow_logger.warning(json.dumps({
+            **summary,
+            'durationMs': round(total * 1000, 2),
+            'phasesMs': {name: round(seconds * 1000, 2) for name, seconds in timer.phases.items()},
+            'dbCommands': timer.db_commands,
+            'documents': timer.documents,
+            'queries': timer.queries
+        }, default=str))
+
+
+def init_timing(app):
+    """
+    Registra la medición por fases en la aplicación
+    """
+    app.before_request(_start_timer)
+    app.after_request(_finish_timer)
@@ -0,0 +1,84 @@
+"""
+Microbenchmark del camino de lectura: Player.from_mongo(doc).to_dict()
+frente a serialize_player(doc)
+
+Uso (desde players-service/):
+    python -m benchmarks.bench_serializer [--players 10000] [--repeat 5]
+
+Imprime un JSON con el tiempo (mejor de N) de convertir --players documentos
+y la memoria asignada por jugador convertido
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from app.models.player import Player, serialize_player
+from benchmarks.common import make_league
+
+
+def via_model(doc):
+    return Player.from_mongo(doc).to_dict()
+
+
+def via_serializer(doc):
+    return serialize_player(doc)
+
+
+def measure(func, docs, repeat):
+    """
+    Mejor tiempo de repeat conversiones de toda la lista y memoria asignada
+    por conversión (pico de tracemalloc, incluye los objetos intermedios)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        [func(doc) for doc in docs]
+        best = min(best, time.perf_counter() - start)
+
+    sample = docs[:1000]
+    tracemalloc.start()
+    total_peak = 0
+    for doc in sample:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func(doc)
+        _, peak = tracemalloc.get_traced_memory()
+        total_peak += peak - base
+        del result
+    tracemalloc.stop()
+
+    return {
+        'seconds': round(best, 6),
+        'usPerPlayer': round(best / len(docs) * 1e6, 3),
+        'bytesPerPlayer': round(total_peak / len(sample))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    docs = make_league(args.players)
+    model = measure(via_model, docs, args.repeat)
+    serializer = measure(via_serializer, docs, args.repeat)
+
+    report = {
+        'players': args.players,
+        'fromMongoToDict': model,
+        'serializePlayer': serializer,
+        'speedup': round(model['seconds'] / serializer['seconds'], 2),
+        'memoryRatio': round(model['bytesPerPlayer'] / serializer['bytesPerPlayer'], 2)
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    faster = serializer['seconds'] < model['seconds']
+    lighter = serializer['bytesPerPlayer'] < model['bytesPerPlayer']
+    return 0 if faster and lighter else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
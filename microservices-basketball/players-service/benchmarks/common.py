@@ -0,0 +1,83 @@
+"""
+Generador de datos sintéticos de liga compartido por los benchmarks
+"""
+import random
+import subprocess
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.models.player import search_terms
+
+POSICIONES = ['Base', 'Escolta', 'Alero', 'Ala-Pívot', 'Pívot']
+NOMBRES = ['Juan', 'Carlos', 'José', 'Luis', 'Miguel', 'Andrés', 'Diego', 'Ángel', 'Óscar', 'Iván']
+APELLIDOS = ['Pérez', 'García', 'López', 'Martínez', 'Hernández', 'González', 'Rodríguez',
+             'Sánchez', 'Ramírez', 'Muñoz', 'Álvarez', 'Castillo']
+NACIONALIDADES = ['Guatemala', 'México', 'España', 'Argentina', 'Estados Unidos']
+
+
+def make_stats(rng: random.Random) -> dict:
+    """Bloque estadisticas con valores aleatorios plausibles"""
+    return {
+        'partidosJugados': rng.randint(0, 82),
+        'promedioMinutos': round(rng.uniform(5, 38), 1),
+        'promedioAnotaciones': round(rng.uniform(0, 30), 1),
+        'promedioRebotes': round(rng.uniform(0, 12), 1),
+        'promedioAsistencias': round(rng.uniform(0, 10), 1),
+        'promedioRobos': round(rng.uniform(0, 3), 1),
+        'promedioBloqueos': round(rng.uniform(0, 3), 1),
+        'porcentajeTirosCampo': round(rng.uniform(30, 60), 1),
+        'porcentajeTiros3Puntos': round(rng.uniform(20, 45), 1),
+        'porcentajeTirosLibres': round(rng.uniform(55, 95), 1)
+    }
+
+
+def make_player_doc(index: int, team_count: int = 30, rng: random.Random = None,
+                    with_id: bool = True) -> dict:
+    """
+    Documento de jugador tal como lo guarda Player.to_mongo
+
+    index determina equipo y número de camiseta, de modo que (equipoId,
+    numeroCamiseta) es único mientras cada equipo tenga a lo sumo 100 jugadores
+    """
+    rng = rng or random.Random(index)
+    now = datetime.utcnow()
+    nombre = rng.choice(NOMBRES)
+    apellidos = f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+    doc = {
+        'nombre': nombre,
+        'apellidos': apellidos,
+        'fechaNacimiento': now - timedelta(days=rng.randint(18 * 365, 38 * 365)),
+        'edad': rng.randint(18, 38),
+        'posicion': rng.choice(POSICIONES),
+        'numeroCamiseta': (index // team_count) % 100,
+        'altura': round(rng.uniform(1.70, 2.20), 2),
+        'peso': round(rng.uniform(65, 130), 1),
+        'nacionalidad': rng.choice(NACIONALIDADES),
+        'foto': '',
+        'equipoId': index % team_count + 1,
+        'equipoNombre': f"Equipo {index % team_count + 1}",
+        'estadisticas': make_stats(rng),
+        'activo': rng.random() > 0.05,
+        'searchTerms': search_terms(nombre, apellidos),
+        'createdAt': now,
+        'updatedAt': now
+    }
+    if with_id:
+        doc['_id'] = ObjectId()
+    return doc
+
+
+def make_league(player_count: int, team_count: int = 30, seed: int = 42,
+                with_id: bool = True) -> list:
+    """Lista de documentos de jugadores repartidos entre team_count equipos"""
+    rng = random.Random(seed)
+    return [make_player_doc(i, team_count, rng, with_id) for i in range(player_count)]
+
+
+def git_commit():
+    """Commit actual (abreviado) para etiquetar los informes; None fuera de git"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
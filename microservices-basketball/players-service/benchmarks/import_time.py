@@ -0,0 +1,126 @@
+"""
+Tiempo de arranque en frío: importar run (create_app incluido) en un proceso nuevo
+
+Uso (desde players-service/):
+    python -m benchmarks.import_time [--runs 7] [--target run] [--top 15]
+    python -m benchmarks.import_time --output antes.json
+    python -m benchmarks.import_time --compare antes.json
+
+Cada ejecución lanza `python -X importtime -c "import <target>"` con
+FLASK_ENV=production y MONGO_CONNECT_ON_STARTUP=False, como un worker de
+gunicorn antes del fork pero sin red. Imprime un JSON con la mediana del
+tiempo total, la del intérprete vacío (para restarla) y los paquetes que más
+tardan en importarse (tiempo propio por paquete), etiquetado con el commit
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from benchmarks.common import git_commit
+
+
+def run_once(code, env):
+    """Tiempo total (ms) del proceso y tiempo propio (us) de cada módulo importado"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        env=env, capture_output=True, text=True
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        sys.exit(f"Error importando:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(self_us)
+    return elapsed_ms, modules
+
+
+def by_package(modules):
+    """Suma el tiempo propio de los módulos por paquete de primer nivel (ms)"""
+    packages = defaultdict(float)
+    for name, self_us in modules.items():
+        packages[name.split('.')[0]] += self_us / 1000
+    return packages
+
+
+def compare(report, baseline):
+    """Variación porcentual del tiempo de la app y por paquete respecto a baseline"""
+    before = baseline.get('appMs')
+    changes = {
+        'appChangePct': round((report['appMs'] - before) / before * 100, 1) if before else None,
+        'packagesMs': {}
+    }
+    old_packages = baseline.get('packagesMs', {})
+    for name in set(report['packagesMs']) | set(old_packages):
+        delta = report['packagesMs'].get(name, 0.0) - old_packages.get(name, 0.0)
+        if abs(delta) >= 1:
+            changes['packagesMs'][name] = round(delta, 1)
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--target', default='run', help='Módulo a importar (run o run_async)')
+    parser.add_argument('--top', type=int, default=15, help='Paquetes más lentos a mostrar en stderr')
+    parser.add_argument('--output', default=None, help='Guarda también el JSON en este archivo')
+    parser.add_argument('--compare', default=None, help='Informe JSON anterior con el que comparar')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, FLASK_ENV='production', MONGO_CONNECT_ON_STARTUP='False')
+
+    # La primera ejecución calienta la caché de bytecode y del sistema de archivos
+    run_once(f'import {args.target}', env)
+
+    interpreter, totals, counts, packages = [], [], [], defaultdict(list)
+    for _ in range(args.runs):
+        interpreter.append(run_once('pass', env)[0])
+        elapsed_ms, modules = run_once(f'import {args.target}', env)
+        totals.append(elapsed_ms)
+        counts.append(len(modules))
+        for name, ms in by_package(modules).items():
+            packages[name].append(ms)
+
+    interpreter_ms = statistics.median(interpreter)
+    total_ms = statistics.median(totals)
+    package_ms = {name: statistics.median(values) for name, values in packages.items()}
+    package_ms = dict(sorted(package_ms.items(), key=lambda item: item[1], reverse=True))
+    for name, ms in list(package_ms.items())[:args.top]:
+        print(f"{name}: {ms:.1f} ms", file=sys.stderr)
+
+    report = {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'target': args.target,
+        'runs': args.runs,
+        'totalMs': round(total_ms, 1),
+        'interpreterMs': round(interpreter_ms, 1),
+        'appMs': round(total_ms - interpreter_ms, 1),
+        'modules': int(statistics.median(counts)),
+        'packagesMs': {name: round(ms, 1) for name, ms in package_ms.items() if ms >= 0.1}
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
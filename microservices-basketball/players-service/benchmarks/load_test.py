@@ -0,0 +1,519 @@
+"""
+Benchmark de carga de los endpoints de /api/players
+
+Uso (desde players-service/):
+    # 1. Poblar la base del servicio (MONGO_* / .env) con una liga sintética
+    #    de 100 a 1.000.000 jugadores
+    MONGO_DATABASE=players_bench python -m benchmarks.load_test seed --players 100000 --drop
+
+    # 2. Levantar el teams-service de prueba y el servicio contra esa base
+    python -m benchmarks.load_test teams-stub --port 5099 &
+    TEAMS_SERVICE_URL=http://localhost:5099/api/teams MONGO_DATABASE=players_bench python run.py
+
+    # 3. Medir
+    python -m benchmarks.load_test run --base-url http://localhost:5002 \\
+        --concurrency 16 --requests 500 --output resultado.json
+
+run recorre cada escenario (uno o más por ruta de app/routes/players.py) con
+--concurrency hilos e imprime un JSON con latencias p50/p95/p99 y throughput
+por escenario, comparable entre commits. Toda respuesta fuera de 2xx (salvo
+las esperadas, como el 304 de team_roster_etag) cuenta como error
+
+Las altas usan equipos reservados (BENCH_TEAM_BASE, BULK_TEAM_BASE) que el
+teams-service real no tiene: sin teams-stub el servicio las rechaza con 400
+y create_player/create_bulk medirían el camino de error
+"""
+import argparse
+import json
+import re
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.config import Config
+from benchmarks.common import APELLIDOS, NOMBRES, POSICIONES, git_commit, make_player_doc
+
+# Equipos reservados para los jugadores que crea el propio benchmark (solo
+# existen para el teams-service de prueba, ver teams-stub)
+BENCH_TEAM_BASE = 900000000
+BULK_TEAM_BASE = 950000000
+
+MIN_PLAYERS = 100
+MAX_PLAYERS = 1000000
+
+
+# ---------------------------------------------------------------------------
+# seed
+# ---------------------------------------------------------------------------
+
+def seed(args):
+    """Inserta una liga sintética en MongoDB por lotes de insert_many"""
+    from pymongo import MongoClient
+    from app.utils.indexes import sync_indexes
+
+    if not MIN_PLAYERS <= args.players <= MAX_PLAYERS:
+        sys.exit(f"--players debe estar entre {MIN_PLAYERS} y {MAX_PLAYERS}")
+
+    # Por defecto plantillas de 15 jugadores; como máximo 100 por equipo
+    # (numeroCamiseta es único por equipo y va de 0 a 99)
+    teams = args.teams or max(1, math.ceil(args.players / 15))
+    if teams * 100 < args.players:
+        sys.exit(f"Con {teams} equipos caben como máximo {teams * 100} jugadores")
+
+    client = MongoClient(args.mongo_uri)
+    db = client[args.database]
+    if args.drop:
+        db.players.drop()
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    inserted = 0
+    while inserted < args.players:
+        size = min(args.batch_size, args.players - inserted)
+        batch = [
+            make_player_doc(index, teams, rng, with_id=False)
+            for index in range(inserted, inserted + size)
+        ]
+        db.players.insert_many(batch, ordered=False)
+        inserted += size
+        print(f"Insertados {inserted}/{args.players}", file=sys.stderr)
+    insert_seconds = time.perf_counter() - start
+
+    sync_indexes(db.players, drop_obsolete=False)
+    client.close()
+
+    print(json.dumps({
+        'database': args.database,
+        'players': inserted,
+        'teams': teams,
+        'insertSeconds': round(insert_seconds, 2),
+        'playersPerSecond': round(inserted / insert_seconds, 1)
+    }, indent=2))
+
+
+# ---------------------------------------------------------------------------
+# teams-stub
+# ---------------------------------------------------------------------------
+
+class TeamsStubHandler(BaseHTTPRequestHandler):
+    """GET /api/teams/<id>: todo equipo existe (200), para medir las altas con éxito"""
+
+    def do_GET(self):
+        match = re.fullmatch(r'/api/teams/(\d+)', self.path)
+        if match is None:
+            self.send_error(404)
+            return
+        body = json.dumps({'id': int(match.group(1)), 'nombre': f'Equipo {match.group(1)}'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def teams_stub(args):
+    """Sirve un teams-service de prueba hasta Ctrl+C"""
+    server = ThreadingHTTPServer((args.host, args.port), TeamsStubHandler)
+    print(f"teams-service de prueba en http://{args.host}:{args.port}/api/teams", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ---------------------------------------------------------------------------
+# run
+# ---------------------------------------------------------------------------
+
+class Context:
+    """Datos de la liga que usan los escenarios (IDs, equipos, ETags)"""
+
+    def __init__(self, player_ids, team_ids, rng):
+        self.player_ids = player_ids
+        self.team_ids = team_ids
+        self.rng = rng
+        self.roster_etags = {}
+        self.created = []
+        self.bulk_created = []
+        self.lock = threading.Lock()
+        # DELETE es un soft delete: los jugadores creados siguen ocupando su
+        # (equipoId, numeroCamiseta), así que cada ejecución usa equipos nuevos
+        self.sequence = int(time.time()) % 100000 * 1000
+
+    def player(self):
+        return self.rng.choice(self.player_ids)
+
+    def team(self):
+        return self.rng.choice(self.team_ids)
+
+    def next_sequence(self):
+        with self.lock:
+            self.sequence += 1
+            return self.sequence
+
+
+def _new_player(sequence, team_base):
+    """Cuerpo de POST /api/players para un equipo reservado del benchmark"""
+    return {
+        'nombre': random.choice(NOMBRES),
+        'apellidos': random.choice(APELLIDOS),
+        'posicion': random.choice(POSICIONES),
+        'numeroCamiseta': sequence % 99 + 1,
+        'equipoId': team_base + sequence // 99,
+        'altura': 1.95,
+        'peso': 90
+    }
+
+
+def _game_line():
+    return {
+        'puntos': random.randint(0, 35), 'rebotes': random.randint(0, 12),
+        'asistencias': random.randint(0, 10), 'robos': random.randint(0, 3),
+        'bloqueos': random.randint(0, 3), 'minutos': random.randint(10, 40),
+        'tirosCampoAnotados': 5, 'tirosCampoIntentados': 11,
+        'triplesAnotados': 2, 'triplesIntentados': 5,
+        'tirosLibresAnotados': 3, 'tirosLibresIntentados': 4
+    }
+
+
+def _stats():
+    return {
+        'promedioAnotaciones': round(random.uniform(0, 30), 1),
+        'promedioRebotes': round(random.uniform(0, 12), 1),
+        'promedioAsistencias': round(random.uniform(0, 10), 1)
+    }
+
+
+def _create_player(ctx):
+    return 'POST', '/api/players', {'json': _new_player(ctx.next_sequence(), BENCH_TEAM_BASE)}
+
+
+def _create_bulk(ctx):
+    players = [_new_player(ctx.next_sequence(), BULK_TEAM_BASE) for _ in range(15)]
+    return 'POST', '/api/players/bulk', {'json': players}
+
+
+def _delete_player(ctx):
+    with ctx.lock:
+        player_id = ctx.created.pop() if ctx.created else None
+    if player_id is None:
+        return None
+    return 'DELETE', f'/api/players/{player_id}', {}
+
+
+def _roster_etag(ctx):
+    team_id = ctx.team()
+    headers = {'If-None-Match': ctx.roster_etags[team_id]} if team_id in ctx.roster_etags else {}
+    return 'GET', f'/api/players/team/{team_id}', {'headers': headers}
+
+
+# Escenarios: nombre -> función(ctx) que devuelve (método, ruta, kwargs de requests)
+SCENARIOS = {
+    'list_page': lambda ctx: ('GET', '/api/players?limit=50', {}),
+    'list_page_fields': lambda ctx: (
+        'GET', '/api/players?limit=50&fields=nombreCompleto,equipoId,posicion', {}
+    ),
+    'list_team_filter': lambda ctx: ('GET', f'/api/players?equipoId={ctx.team()}', {}),
+    'list_stream_team': lambda ctx: ('GET', f'/api/players?stream=1&equipoId={ctx.team()}', {}),
+    'get_player': lambda ctx: ('GET', f'/api/players/{ctx.player()}', {}),
+    'get_player_fields': lambda ctx: (
+        'GET', f'/api/players/{ctx.player()}?fields=nombreCompleto,estadisticas', {}
+    ),
+    'team_roster': lambda ctx: ('GET', f'/api/players/team/{ctx.team()}', {}),
+    'team_roster_etag': _roster_etag,
+    'leaders': lambda ctx: ('GET', '/api/players/leaders?stat=promedioAnotaciones&limit=10', {}),
+    'leaders_team': lambda ctx: (
+        'GET', f'/api/players/leaders?stat=promedioRebotes&equipoId={ctx.team()}', {}
+    ),
+    'search': lambda ctx: (
+        'GET', f'/api/players/search?q={random.choice(NOMBRES + APELLIDOS)[:3]}', {}
+    ),
+    'get_stats': lambda ctx: ('GET', f'/api/players/{ctx.player()}/stats', {}),
+    'update_player': lambda ctx: (
+        'PUT', f'/api/players/{ctx.player()}', {'json': {'peso': round(random.uniform(70, 120), 1)}}
+    ),
+    'update_stats': lambda ctx: ('PUT', f'/api/players/{ctx.player()}/stats', {'json': _stats()}),
+    'record_game': lambda ctx: ('POST', f'/api/players/{ctx.player()}/games', {'json': _game_line()}),
+    'stats_bulk': lambda ctx: (
+        'PUT', '/api/players/stats/bulk',
+        {'json': [{'playerId': ctx.player(), 'stats': _stats()} for _ in range(15)]}
+    ),
+    'create_player': _create_player,
+    'create_bulk': _create_bulk,
+    'delete_player': _delete_player,
+}
+
+# Respuestas fuera de 2xx que un escenario espera (no cuentan como error)
+EXPECTED_STATUSES = {
+    'team_roster_etag': (304,),
+}
+
+# Escenario que descarga la colección completa: solo bajo petición (--scenarios)
+OPTIONAL_SCENARIOS = {
+    'list_all': lambda ctx: ('GET', '/api/players', {}),
+}
+
+
+def percentile(sorted_values, percent):
+    """Percentil por el método del rango más cercano"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, statuses, errors, elapsed):
+    """Resumen de un escenario (latencias en ms)"""
+    values = sorted(latency * 1000 for latency in latencies)
+    summary = {
+        'requests': len(values),
+        'errors': errors,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughputRps': round(len(values) / elapsed, 1) if elapsed else None
+    }
+    if values:
+        summary.update({
+            'p50Ms': round(percentile(values, 50), 2),
+            'p95Ms': round(percentile(values, 95), 2),
+            'p99Ms': round(percentile(values, 99), 2),
+            'meanMs': round(statistics.fmean(values), 2),
+            'maxMs': round(values[-1], 2)
+        })
+    return summary
+
+
+def is_expected(name, status):
+    """Indica si el escenario name espera la respuesta status"""
+    return 200 <= status < 300 or status in EXPECTED_STATUSES.get(name, ())
+
+
+def run_scenario(name, builder, ctx, args, sessions):
+    """Lanza args.requests peticiones del escenario con args.concurrency hilos"""
+    latencies = []
+    statuses = {}
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(_):
+        nonlocal errors
+        request_args = builder(ctx)
+        if request_args is None:
+            return
+        method, path, kwargs = request_args
+        session = sessions.session()
+        start = time.perf_counter()
+        try:
+            response = session.request(method, args.base_url + path, timeout=args.timeout, **kwargs)
+            response.content
+            latency = time.perf_counter() - start
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(latency)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if not is_expected(name, response.status_code):
+                errors += 1
+        _remember(name, ctx, response)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, statuses, errors, elapsed)
+
+
+def _remember(name, ctx, response):
+    """Guarda los jugadores creados para borrarlos después"""
+    if name == 'create_player' and response.status_code == 201:
+        with ctx.lock:
+            ctx.created.append(response.json()['data']['_id'])
+    elif name == 'create_bulk' and response.status_code in (201, 207):
+        ids = [result['_id'] for result in response.json()['results'] if result.get('_id')]
+        with ctx.lock:
+            ctx.bulk_created.extend(ids)
+
+
+class SessionPool:
+    """Una requests.Session (conexiones keep-alive) por hilo"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._sessions = []
+
+    def session(self):
+        import requests
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+            self._sessions.append(session)
+        return session
+
+    def close(self):
+        for session in self._sessions:
+            session.close()
+
+
+def load_context(args, sessions):
+    """Lee una muestra de IDs y equipos de la liga a través de la propia API"""
+    session = sessions.session()
+    response = session.get(
+        f'{args.base_url}/api/players',
+        params={'limit': args.sample, 'fields': '_id,equipoId'},
+        timeout=args.timeout
+    )
+    response.raise_for_status()
+    players = [
+        player for player in response.json()['data']
+        if player['equipoId'] < BENCH_TEAM_BASE
+    ]
+    if not players:
+        sys.exit("La base no tiene jugadores: ejecuta primero 'seed'")
+
+    ctx = Context(
+        [player['_id'] for player in players],
+        sorted({player['equipoId'] for player in players}),
+        random.Random(args.seed)
+    )
+    for team_id in ctx.team_ids[:50]:
+        roster = session.get(f'{args.base_url}/api/players/team/{team_id}', timeout=args.timeout)
+        if roster.headers.get('ETag'):
+            ctx.roster_etags[team_id] = roster.headers['ETag']
+    return ctx
+
+
+def check_creates(args, ctx, sessions):
+    """
+    Crea un jugador de prueba y sale si el servicio lo rechaza: con el
+    teams-service real los equipos reservados no existen (ver teams-stub)
+    """
+    response = sessions.session().post(
+        f'{args.base_url}/api/players',
+        json=_new_player(ctx.next_sequence(), BENCH_TEAM_BASE),
+        timeout=args.timeout
+    )
+    if response.status_code != 201:
+        sys.exit(
+            f"POST /api/players respondió {response.status_code}: {response.text[:200]}. "
+            f"Arranca el servicio con TEAMS_SERVICE_URL apuntando a 'teams-stub'"
+        )
+    ctx.created.append(response.json()['data']['_id'])
+
+
+def cleanup(args, ctx, sessions):
+    """
+    Da de baja (sin medir) los jugadores que creó el benchmark; quedan
+    inactivos en los equipos reservados hasta el próximo 'seed --drop'
+    """
+    session = sessions.session()
+    for player_id in ctx.created + ctx.bulk_created:
+        try:
+            session.delete(f'{args.base_url}/api/players/{player_id}', timeout=args.timeout)
+        except Exception:
+            pass
+
+
+def run(args):
+    """Mide cada escenario y emite el informe JSON"""
+    available = {**SCENARIOS, **OPTIONAL_SCENARIOS}
+    names = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        sys.exit(f"Escenarios desconocidos: {', '.join(unknown)}. Opciones: {', '.join(available)}")
+    # delete_player borra lo creado por create_player, así que va después
+    if 'delete_player' in names and 'create_player' in names:
+        names.remove('delete_player')
+        names.insert(names.index('create_player') + 1, 'delete_player')
+
+    sessions = SessionPool()
+    ctx = load_context(args, sessions)
+    if 'create_player' in names or 'create_bulk' in names:
+        check_creates(args, ctx, sessions)
+
+    # Calentamiento: conexiones keep-alive, cachés y planes de consulta
+    for name in names:
+        for _ in range(args.warmup):
+            request_args = available[name](ctx)
+            if request_args is not None and request_args[0] == 'GET':
+                method, path, kwargs = request_args
+                sessions.session().request(method, args.base_url + path, timeout=args.timeout, **kwargs)
+
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, available[name], ctx, args, sessions)
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    cleanup(args, ctx, sessions)
+    sessions.close()
+
+    report = {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'commit': git_commit(),
+        'baseUrl': args.base_url,
+        'concurrency': args.concurrency,
+        'requestsPerScenario': args.requests,
+        'samplePlayers': len(ctx.player_ids),
+        'sampleTeams': len(ctx.team_ids),
+        'scenarios': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 1 if any(result['errors'] for result in results.values()) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = subparsers.add_parser('seed', help='Pobla MongoDB con una liga sintética')
+    # Por defecto, la misma base que usa el servicio (variables MONGO_* / .env)
+    seed_parser.add_argument('--mongo-uri', default=Config.MONGO_URI)
+    seed_parser.add_argument('--database', default=Config.MONGO_DATABASE)
+    seed_parser.add_argument('--players', type=int, default=10000)
+    seed_parser.add_argument('--teams', type=int, default=None,
+                             help='Número de equipos (por defecto, plantillas de 15)')
+    seed_parser.add_argument('--batch-size', type=int, default=10000)
+    seed_parser.add_argument('--seed', type=int, default=42)
+    seed_parser.add_argument('--drop', action='store_true', help='Vacía la colección antes de poblar')
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = subparsers.add_parser('run', help='Mide los endpoints con concurrencia')
+    run_parser.add_argument('--base-url', default='http://localhost:5002')
+    run_parser.add_argument('--concurrency', type=int, default=16)
+    run_parser.add_argument('--requests', type=int, default=500, help='Peticiones por escenario')
+    run_parser.add_argument('--warmup', type=int, default=5, help='Peticiones GET previas por escenario')
+    run_parser.add_argument('--scenarios', default=None,
+                            help=f"Lista separada por comas (por defecto todos salvo {', '.join(OPTIONAL_SCENARIOS)})")
+    run_parser.add_argument('--sample', type=int, default=500, help='Jugadores leídos para elegir IDs')
+    run_parser.add_argument('--timeout', type=float, default=30)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--output', default=None, help='Guarda también el JSON en este archivo')
+    run_parser.set_defaults(func=run)
+
+    stub_parser = subparsers.add_parser('teams-stub', help='teams-service de prueba que acepta todo equipo')
+    stub_parser.add_argument('--host', default='127.0.0.1')
+    stub_parser.add_argument('--port', type=int, default=5099)
+    stub_parser.set_defaults(func=teams_stub)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main() or 0)
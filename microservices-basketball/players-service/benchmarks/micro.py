@@ -0,0 +1,199 @@
+"""
+Microbenchmarks de los caminos calientes del modelo, los schemas y la
+serialización JSON (sin base de datos)
+
+Uso (desde players-service/):
+    python -m benchmarks.micro [--samples 7] [--only player_init,jsonify_roster_15]
+    python -m benchmarks.micro --output antes.json
+    python -m benchmarks.micro --compare antes.json
+
+Como pyperf: cada caso se calibra con timeit (bucles de al menos 0.2 s), se
+calienta y se mide --samples veces. Imprime un JSON con el tiempo por
+operación (mínimo, mediana, desviación) y la memoria asignada por operación
+(pico de tracemalloc); con --compare añade la variación respecto a otro informe
+"""
+import argparse
+import json
+import statistics
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from flask import Flask
+
+from app.models.player import Player, serialize_player
+from app.schemas.player_schema import PlayerCreateSchema, StatsUpdateSchema
+from app.utils.json_provider import OrjsonJSONProvider, TimedJSONProvider
+from benchmarks.common import make_league
+
+# Cuerpo típico de POST /api/players
+CREATE_PAYLOAD = {
+    'nombreCompleto': 'Óscar Pérez García',
+    'fechaNacimiento': '1998-04-12',
+    'edad': 26,
+    'posicion': 'Escolta',
+    'numero': 23,
+    'estatura': 1.96,
+    'peso': 92.5,
+    'nacionalidad': 'Guatemala',
+    'foto': '',
+    'equipoId': 7,
+    'equipoNombre': 'Equipo 7',
+    'isActivo': True
+}
+
+# Cuerpo típico de PUT /api/players/:id/stats
+STATS_PAYLOAD = {
+    'partidosJugados': 41,
+    'promedioMinutos': 31.2,
+    'promedioAnotaciones': 18.4,
+    'promedioRebotes': 5.1,
+    'promedioAsistencias': 4.7,
+    'promedioRobos': 1.3,
+    'promedioBloqueos': 0.4,
+    'porcentajeTirosCampo': 46.2,
+    'porcentajeTiros3Puntos': 37.9,
+    'porcentajeTirosLibres': 84.0
+}
+
+
+def legacy_player(player):
+    """
+    Conversión que hacía el modelo antes del proveedor orjson (str del _id e
+    isoformat de las fechas) para el caso de referencia con json de la stdlib
+    """
+    return {
+        **player,
+        '_id': str(player['_id']),
+        'createdAt': player['createdAt'].isoformat(),
+        'updatedAt': player['updatedAt'].isoformat()
+    }
+
+
+def build_cases():
+    """Casos: nombre -> función sin argumentos a medir"""
+    app = Flask(__name__)
+    app.json = OrjsonJSONProvider(app)
+    stdlib_app = Flask(__name__)
+    stdlib_app.json = TimedJSONProvider(stdlib_app)
+
+    docs = make_league(5000)
+    roster = [serialize_player(doc) for doc in docs[:15]]
+    league = [serialize_player(doc) for doc in docs]
+    player = Player(CREATE_PAYLOAD)
+    stored = Player.from_mongo(docs[0])
+    create_schema = PlayerCreateSchema()
+    stats_schema = StatsUpdateSchema()
+
+    def jsonify_payload(players, target=app, convert=None):
+        # Mismo cuerpo que GET /api/players y GET /api/players/team/:id
+        def run():
+            data = [convert(player) for player in players] if convert else players
+            with target.app_context():
+                target.json.response({'success': True, 'data': data, 'count': len(data)})
+        return run
+
+    return {
+        'player_init': lambda: Player(CREATE_PAYLOAD),
+        'player_to_dict': stored.to_dict,
+        'player_validate': player.validate,
+        'create_schema_load': lambda: create_schema.load(CREATE_PAYLOAD),
+        'stats_schema_load': lambda: stats_schema.load(STATS_PAYLOAD),
+        'jsonify_roster_15': jsonify_payload(roster),
+        'jsonify_players_5000': jsonify_payload(league),
+        'jsonify_players_5000_stdlib': jsonify_payload(league, stdlib_app, legacy_player),
+    }
+
+
+def measure_time(func, samples):
+    """Tiempo por operación en microsegundos sobre samples muestras calibradas"""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    timer.timeit(loops)  # calentamiento
+    per_op = [seconds / loops * 1e6 for seconds in timer.repeat(repeat=samples, number=loops)]
+    return {
+        'loops': loops,
+        'minUs': round(min(per_op), 3),
+        'medianUs': round(statistics.median(per_op), 3),
+        'stdevUs': round(statistics.stdev(per_op), 3) if len(per_op) > 1 else 0.0
+    }
+
+
+def measure_memory(func, calls):
+    """Bytes asignados por operación (pico de tracemalloc por llamada)"""
+    func()
+    tracemalloc.start()
+    total_bytes = 0
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        total_bytes += peak - base
+        del result
+    tracemalloc.stop()
+    return {'allocatedBytes': round(total_bytes / calls)}
+
+
+def compare(results, baseline):
+    """Variación porcentual de la mediana y de la memoria respecto al informe baseline"""
+    changes = {}
+    for name, result in results.items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before:
+            continue
+        changes[name] = {
+            'medianChangePct': round(
+                (result['medianUs'] - before['medianUs']) / before['medianUs'] * 100, 1
+            ),
+            'allocatedChangePct': round(
+                (result['allocatedBytes'] - before['allocatedBytes'])
+                / before['allocatedBytes'] * 100, 1
+            ) if before['allocatedBytes'] else None
+        }
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=7)
+    parser.add_argument('--only', default=None, help='Casos separados por comas')
+    parser.add_argument('--output', default=None, help='Guarda también el JSON en este archivo')
+    parser.add_argument('--compare', default=None, help='Informe JSON anterior con el que comparar')
+    args = parser.parse_args(argv)
+
+    cases = build_cases()
+    names = args.only.split(',') if args.only else list(cases)
+    unknown = [name for name in names if name not in cases]
+    if unknown:
+        parser.error(f"Casos desconocidos: {', '.join(unknown)}. Opciones: {', '.join(cases)}")
+
+    results = {}
+    for name in names:
+        timing = measure_time(cases[name], args.samples)
+        # tracemalloc ralentiza mucho: menos llamadas en los casos pesados
+        memory = measure_memory(cases[name], calls=max(3, min(50, timing['loops'])))
+        results[name] = {**timing, **memory}
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    report = {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': sys.version.split()[0],
+        'samples': args.samples,
+        'benchmarks': results
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare(results, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
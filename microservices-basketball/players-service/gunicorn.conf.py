@@ -0,0 +1,82 @@
+"""
+Configuración de gunicorn para Players Service
+
+    gunicorn -c gunicorn.conf.py run:app
+
+La app se carga una vez en el master (preload_app) y los workers la heredan
+por copy-on-write: arrancan antes y comparten la memoria del código. Lo que no
+sobrevive a un fork (cliente de MongoDB, hilo del change stream) se crea en
+post_fork. Los índices se revisan una sola vez desde el master
+
+Variables de entorno:
+    GUNICORN_BIND                  dirección (0.0.0.0:$PORT)
+    GUNICORN_WORKERS               procesos worker (4)
+    GUNICORN_WORKER_CLASS          sync o gthread (sync)
+    GUNICORN_THREADS               hilos por worker con gthread (1)
+    GUNICORN_TIMEOUT               segundos antes de reiniciar un worker colgado (120)
+    GUNICORN_KEEPALIVE             segundos de keep-alive (5)
+    GUNICORN_MAX_REQUESTS          peticiones antes de reciclar un worker (0: nunca)
+    GUNICORN_MAX_REQUESTS_JITTER   aleatorio sumado a max_requests (0)
+"""
+import os
+import shutil
+
+# La conexión a MongoDB se hace en post_fork, no al cargar la app en el master
+os.environ.setdefault('MONGO_CONNECT_ON_STARTUP', 'False')
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5002')}")
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Reciclar workers evita que crezca la memoria; el jitter evita que todos se
+# reinicien a la vez
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+preload_app = True
+
+# Heartbeat de los workers en memoria (en Docker /tmp puede ser overlayfs)
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Vacía el directorio de métricas multiproceso de ejecuciones anteriores"""
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not multiproc_dir or not os.path.isdir(multiproc_dir):
+        return
+    for name in os.listdir(multiproc_dir):
+        path = os.path.join(multiproc_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+def when_ready(server):
+    """Revisa los índices desde el master con un cliente que se cierra antes del fork"""
+    from app.utils.database import check_indexes_once
+
+    check_indexes_once(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    """Cliente de MongoDB y change stream propios de cada worker"""
+    from app import init_worker
+
+    init_worker(worker.app.wsgi(), indexes=False)
+    server.log.info(f"Worker {worker.pid}: MongoDB conectado")
+
+
+def child_exit(server, worker):
+    """Libera las métricas del worker que terminó (gauges livesum)"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
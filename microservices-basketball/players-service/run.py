@@ -1,9 +1,11 @@
 """
 Punto de entrada de la aplicación Players Service
 """
-from app import create_app
 import os
 
+# .env.development lo carga app.config al importarse (ver load_env_file)
+from app import create_app
+
 # Crear la aplicación Flask
 app = create_app()
 
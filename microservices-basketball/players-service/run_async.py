@@ -0,0 +1,33 @@
+"""
+Punto de entrada ASGI de Players Service (Quart + motor + httpx)
+
+Necesita las dependencias de requirements-asgi.txt (no están en la imagen
+Docker, que sirve la app Flask):
+    pip install -r requirements-asgi.txt
+
+Producción:
+    uvicorn run_async:app --host 0.0.0.0 --port 5002
+"""
+import os
+
+# .env.development lo carga app.config al importarse (ver load_env_file)
+from app.asgi import create_async_app
+
+# Crear la aplicación Quart
+app = create_async_app()
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    port = int(os.getenv('PORT', 5002))
+    
+    print(f"""
+      Players Service (ASGI) Starting...
+      Port: {port}
+      Database: {os.getenv('MONGO_DATABASE', 'players_service_db')}
+    
+      Server running at: http://localhost:{port}
+      Health check: http://localhost:{port}/health
+    """)
+    
+    uvicorn.run(app, host='0.0.0.0', port=port)
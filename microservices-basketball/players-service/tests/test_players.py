@@ -1,9 +1,32 @@
 """
 Tests para Player Service
 """
+import asyncio
+import gzip
+import json
+import os
+import runpy
+import subprocess
+import sys
+import time
 import pytest
+from datetime import date, datetime
+from types import SimpleNamespace
+from bson import ObjectId
 from app import create_app
-from app.utils.database import get_db
+from app.asgi import create_async_app
+from app.utils.database import (
+    check_indexes, get_db, get_read_preference, init_read_preference, mongo_client_options, reads_from_secondaries
+)
+from app.models.player import Player, search_terms, serialize_player
+from app.utils.cache import ALL, TTLCache, add_invalidation_listener
+from app.utils import change_stream
+from app.utils.change_stream import handle_change
+from app.services.player_service import PlayerService
+from app.services.teams_client import CircuitBreaker, get_teams_client
+from app.utils.timing import command_shape
+from app.utils.json_provider import OrjsonJSONProvider
+from app.utils import compression
 
 @pytest.fixture
 def app():
@@ -31,3 +54,648 @@ def test_get_all_players(client):
     data = response.get_json()
     assert 'data' in data
     assert 'count' in data
+
+@pytest.fixture
+def seeded_players(app):
+    """Inserta jugadores de prueba en un equipo aislado y los elimina al terminar"""
+    collection = get_db().players
+    team_id = 9999
+    docs = [
+        {
+            'nombre': f'Jugador{i}',
+            'apellidos': 'Prueba',
+            'posicion': 'Base',
+            'numeroCamiseta': i,
+            'equipoId': team_id,
+            'activo': True
+        }
+        for i in range(1, 6)
+    ]
+    collection.insert_many(docs)
+    yield team_id
+    collection.delete_many({'equipoId': team_id})
+
+def test_get_players_by_team_paginated(client, seeded_players):
+    """Test de paginación por cursor en los jugadores de un equipo"""
+    response = client.get(f'/api/players/team/{seeded_players}?limit=2')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == 2
+    assert data['nextCursor'] is not None
+    
+    seen = [p['_id'] for p in data['data']]
+    while data['nextCursor']:
+        response = client.get(
+            f"/api/players/team/{seeded_players}?limit=2&cursor={data['nextCursor']}"
+        )
+        data = response.get_json()
+        seen.extend(p['_id'] for p in data['data'])
+    
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+def test_get_all_players_invalid_cursor(client):
+    """Test de cursor inválido"""
+    response = client.get('/api/players?cursor=no-es-un-id')
+    assert response.status_code == 400
+
+def test_get_players_by_team_stream(client, seeded_players):
+    """Test de exportación en streaming (NDJSON)"""
+    response = client.get(
+        f'/api/players/team/{seeded_players}',
+        headers={'Accept': 'application/x-ndjson'}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 5
+    assert all(json.loads(line)['equipoId'] == seeded_players for line in lines)
+
+def test_get_players_by_team_fields(client, seeded_players):
+    """Test de proyección de campos (?fields=)"""
+    response = client.get(f'/api/players/team/{seeded_players}?fields=nombre,numero')
+    assert response.status_code == 200
+    for player in response.get_json()['data']:
+        assert set(player) == {'_id', 'nombre', 'numero'}
+
+def test_get_all_players_unknown_field(client):
+    """Test de campo desconocido en ?fields="""
+    response = client.get('/api/players?fields=nombre,password')
+    assert response.status_code == 400
+
+def test_serialize_player_matches_model():
+    """serialize_player produce lo mismo que Player.from_mongo(doc).to_dict()"""
+    now = datetime.utcnow()
+    docs = [
+        {
+            '_id': ObjectId(), 'nombre': 'LeBron', 'apellidos': 'James', 'posicion': 'Alero',
+            'numeroCamiseta': 23, 'altura': 2.06, 'equipoId': 1, 'activo': False,
+            'estadisticas': {'promedioAnotaciones': 27.1}, 'createdAt': now, 'updatedAt': now
+        },
+        {
+            '_id': ObjectId(), 'nombreCompleto': 'Stephen Curry', 'numero': 30, 'estatura': 1.88,
+            'equipoId': 2, 'isActivo': True, 'createdAt': now, 'updatedAt': now
+        }
+    ]
+    for doc in docs:
+        expected = Player.from_mongo(doc).to_dict()
+        assert serialize_player(doc) == expected
+        fields = ('_id', 'nombreCompleto', 'numero', 'isActivo')
+        assert serialize_player(doc, fields) == {name: expected[name] for name in fields}
+
+def test_ttl_cache_lru_and_stats():
+    """Test de la caché LRU/TTL: expulsión, invalidación y contadores"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # expulsa 'b' (el menos usado)
+    assert cache.get('b') is None
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['size'] == 1
+
+def test_get_player_cache_invalidated_on_update(client, seeded_players):
+    """La caché por ID se invalida al actualizar el jugador"""
+    player = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]
+    url = f"/api/players/{player['_id']}"
+    
+    assert client.get(url).get_json()['data']['equipoNombre'] == ''
+    client.put(url, json={'equipoNombre': 'Nuevo nombre'})
+    assert client.get(url).get_json()['data']['equipoNombre'] == 'Nuevo nombre'
+
+def test_get_player_returns_copy_of_cache(app, seeded_players, monkeypatch):
+    """Modificar el jugador devuelto no cambia la entrada de la caché"""
+    service = PlayerService()
+    player_id = str(get_db().players.find_one({'equipoId': seeded_players})['_id'])
+    monkeypatch.setattr(change_stream, 'change_listener', SimpleNamespace(active=True))
+    
+    service.get_player_by_id(player_id)['nombre'] = 'Modificado'
+    player, _ = service.get_player_with_version(player_id)
+    player['apellidos'] = 'Modificado'
+    
+    cached = service.get_player_by_id(player_id)
+    assert cached['nombre'] != 'Modificado'
+    assert cached['apellidos'] == 'Prueba'
+
+def test_change_stream_event_invalidates_caches():
+    """Un evento del change stream invalida el jugador; un drop invalida todo"""
+    received = []
+    add_invalidation_listener(received.append)
+    player_id = ObjectId()
+    
+    handle_change({
+        'operationType': 'update',
+        'documentKey': {'_id': player_id},
+        'updateDescription': {'updatedFields': {'peso': 90}}
+    })
+    handle_change({'operationType': 'drop'})
+    
+    assert received[-2:] == [str(player_id), ALL]
+
+def test_get_players_by_team_etag(client, seeded_players):
+    """La plantilla sin cambios responde 304 con If-None-Match"""
+    url = f'/api/players/team/{seeded_players}'
+    response = client.get(url)
+    etag = response.headers['ETag']
+    
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    
+    player_id = client.get(url).get_json()['data'][0]['_id']
+    client.put(f'/api/players/{player_id}', json={'peso': 95})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_get_player_etag(client, seeded_players):
+    """El jugador sin cambios responde 304 con If-None-Match"""
+    player_id = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]['_id']
+    url = f'/api/players/{player_id}?fields=nombre'
+    response = client.get(url)
+    assert set(response.get_json()['data']) == {'_id', 'nombre'}
+    
+    response = client.get(url, headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+def test_get_player_etag_ignores_stale_cache(client, seeded_players):
+    """Una copia atrasada en la caché del worker no produce un 304 ni datos viejos"""
+    player_id = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]['_id']
+    url = f'/api/players/{player_id}'
+    etag = client.get(url).headers['ETag']
+    
+    # Cambio sin pasar por el servicio: la caché no se entera
+    get_db().players.update_one(
+        {'_id': ObjectId(player_id)},
+        {'$set': {'peso': 101, 'updatedAt': datetime.utcnow()}}
+    )
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data']['peso'] == 101
+
+def test_get_player_etag_from_coherent_cache(client, seeded_players, monkeypatch):
+    """Con el change stream activo el jugador y su ETag salen de la caché sin leer MongoDB"""
+    monkeypatch.setattr(change_stream, 'change_listener', SimpleNamespace(active=True))
+    player_id = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]['_id']
+    url = f'/api/players/{player_id}'
+    etag = client.get(url).headers['ETag']
+    
+    # Cambio que el stream aún no notificó: responde la copia en caché
+    get_db().players.update_one(
+        {'_id': ObjectId(player_id)},
+        {'$set': {'peso': 102, 'updatedAt': datetime.utcnow()}}
+    )
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    
+    handle_change({'operationType': 'update', 'documentKey': {'_id': ObjectId(player_id)}})
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data']['peso'] == 102
+
+def test_create_players_bulk(app, client):
+    """Creación masiva con resultados por elemento"""
+    app.config['TEAMS_SERVICE_URL'] = None
+    team_id = 9998
+    payload = [
+        {'nombreCompleto': 'Uno Prueba', 'numero': 1, 'posicion': 'Base', 'equipoId': team_id},
+        {'nombreCompleto': 'Dos Prueba', 'numero': 1, 'posicion': 'Alero', 'equipoId': team_id},
+        {'nombreCompleto': 'Tres Prueba', 'numero': 3, 'posicion': 'Nada', 'equipoId': team_id}
+    ]
+    try:
+        response = client.post('/api/players/bulk', json=payload)
+        assert response.status_code == 207
+        data = response.get_json()
+        assert data['created'] == 1
+        assert [result['success'] for result in data['results']] == [True, False, False]
+    finally:
+        get_db().players.delete_many({'equipoId': team_id})
+
+def test_update_stats_bulk(client, seeded_players):
+    """Actualización masiva de estadísticas con resumen por jugador"""
+    players = client.get(f'/api/players/team/{seeded_players}').get_json()['data']
+    payload = [
+        {'playerId': players[0]['_id'], 'stats': {'promedioAnotaciones': 20.5}},
+        {'playerId': players[1]['_id'], 'stats': {'promedioRebotes': 8.0}},
+        {'playerId': str(ObjectId()), 'stats': {'promedioRebotes': 1.0}}
+    ]
+    response = client.put('/api/players/stats/bulk?includePlayers=true', json=payload)
+    # 207: uno de los jugadores no existe
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['updated'] == 2
+    assert [result['success'] for result in data['results']] == [True, True, False]
+    assert len(data['data']) == 2
+    
+    stats = client.get(f"/api/players/{players[0]['_id']}/stats").get_json()['data']
+    assert stats['promedioAnotaciones'] == 20.5
+
+def test_update_player_duplicate_number(client, seeded_players):
+    """El índice único idx_equipo_numero rechaza números repetidos al actualizar"""
+    players = client.get(f'/api/players/team/{seeded_players}').get_json()['data']
+    taken = players[1]['numeroCamiseta']
+    response = client.put(f"/api/players/{players[0]['_id']}", json={'numero': taken})
+    assert response.status_code == 400
+    assert str(taken) in response.get_json()['error']
+
+def test_delete_player_not_found(client):
+    """Eliminar un jugador inexistente devuelve 404"""
+    response = client.delete(f'/api/players/{ObjectId()}')
+    assert response.status_code == 404
+
+def test_delete_player_twice(client, seeded_players):
+    """Eliminar un jugador ya inactivo devuelve 404 y no cambia su ETag"""
+    player_id = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]['_id']
+    url = f'/api/players/{player_id}'
+    assert client.delete(url).status_code == 200
+    etag = client.get(url).headers['ETag']
+    
+    assert client.delete(url).status_code == 404
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+def test_teams_client_new_url_keeps_config(app):
+    """Otra URL del teams-service recrea el cliente con la configuración TEAMS_*"""
+    app.config['TEAMS_CIRCUIT_FAILURE_THRESHOLD'] = 2
+    app.config['TEAMS_SERVICE_TIMEOUT'] = 1.5
+    with app.app_context():
+        client = get_teams_client('http://otro-teams:5001/api/teams')
+    assert client.base_url == 'http://otro-teams:5001/api/teams'
+    assert client.breaker.failure_threshold == 2
+    assert client.timeout[1] == 1.5
+
+def test_circuit_breaker_opens_and_recovers():
+    """El circuito se abre tras N fallos y deja pasar una prueba tras el reset"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    
+    time.sleep(0.06)
+    assert breaker.allow_request()       # llamada de prueba (half-open)
+    assert not breaker.allow_request()   # solo una
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_circuit_breaker_single_probe_and_gauge():
+    """Con varios hilos solo pasa una prueba en half-open y el gauge sigue el estado"""
+    from concurrent.futures import ThreadPoolExecutor
+    from prometheus_client import REGISTRY
+    
+    def gauge(state):
+        return REGISTRY.get_sample_value('players_teams_circuit_state', {'state': state})
+    
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert gauge('open') == 1 and gauge('closed') == 0
+    
+    time.sleep(0.06)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        allowed = list(pool.map(lambda _: breaker.allow_request(), range(32)))
+    assert allowed.count(True) == 1
+    assert breaker.snapshot() == {'state': CircuitBreaker.HALF_OPEN, 'timesOpened': 1, 'failures': 1}
+    assert gauge('half_open') == 1 and gauge('open') == 0
+    
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+def test_record_game_stats(client, seeded_players):
+    """Los promedios y porcentajes se derivan de los totales acumulados"""
+    player_id = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]['_id']
+    url = f'/api/players/{player_id}/games'
+    
+    client.post(url, json={'puntos': 20, 'rebotes': 5, 'minutos': 30,
+                           'tirosCampoAnotados': 8, 'tirosCampoIntentados': 16})
+    response = client.post(url, json={'puntos': 10, 'rebotes': 8, 'minutos': 25,
+                                      'tirosCampoAnotados': 4, 'tirosCampoIntentados': 4})
+    assert response.status_code == 200
+    stats = response.get_json()['data']['estadisticas']
+    assert stats['partidosJugados'] == 2
+    assert stats['promedioAnotaciones'] == 15.0
+    assert stats['promedioRebotes'] == 6.5
+    assert stats['porcentajeTirosCampo'] == 60.0
+    assert stats['porcentajeTirosLibres'] == 0.0
+
+def test_record_game_stats_legacy_and_manual(client, seeded_players):
+    """Los porcentajes previos se ponderan por partidos y editar a mano reinicia los totales"""
+    player_id = client.get(f'/api/players/team/{seeded_players}').get_json()['data'][0]['_id']
+    url = f'/api/players/{player_id}/games'
+    get_db().players.update_one({'_id': ObjectId(player_id)}, {'$set': {
+        'estadisticas': {'partidosJugados': 10, 'promedioAnotaciones': 10.0,
+                         'porcentajeTirosCampo': 50.0, 'porcentajeTirosLibres': 80.0}
+    }, '$unset': {'totales': ''}})
+    
+    stats = client.post(url, json={'puntos': 21, 'tirosCampoAnotados': 10,
+                                   'tirosCampoIntentados': 10}).get_json()['data']['estadisticas']
+    assert stats['promedioAnotaciones'] == 11.0
+    assert stats['porcentajeTirosCampo'] == 54.5
+    assert stats['porcentajeTirosLibres'] == 80.0
+    
+    # El siguiente partido parte de la edición, no de los totales anteriores
+    client.put(f'/api/players/{player_id}/stats', json={'promedioAnotaciones': 20.0})
+    stats = client.post(url, json={'puntos': 42}).get_json()['data']['estadisticas']
+    assert stats['partidosJugados'] == 12
+    assert stats['promedioAnotaciones'] == 21.8
+    assert stats['porcentajeTirosCampo'] == 54.5
+
+def test_record_game_stats_invalid_shots(client):
+    """No se aceptan más tiros anotados que intentados"""
+    response = client.post(f'/api/players/{ObjectId()}/games',
+                           json={'triplesAnotados': 3, 'triplesIntentados': 2})
+    assert response.status_code == 400
+
+def test_get_leaders_by_team(client, seeded_players):
+    """Ranking de líderes de un equipo ordenado por la estadística"""
+    players = client.get(f'/api/players/team/{seeded_players}').get_json()['data']
+    for value, player in enumerate(players):
+        client.put(f"/api/players/{player['_id']}/stats", json={'promedioRebotes': float(value)})
+    client.delete(f"/api/players/{players[-1]['_id']}")  # los inactivos no cuentan
+    
+    response = client.get(f'/api/players/leaders?stat=promedioRebotes&limit=2&equipoId={seeded_players}')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert [leader['valor'] for leader in data] == [3.0, 2.0]
+    assert data[0]['rank'] == 1
+
+def test_get_leaders_invalid_stat(client):
+    """Estadística no permitida en el ranking"""
+    response = client.get('/api/players/leaders?stat=password')
+    assert response.status_code == 400
+
+def test_search_players(app, client):
+    """Búsqueda por prefijo sin distinguir mayúsculas ni acentos"""
+    app.config['TEAMS_SERVICE_URL'] = None
+    team_id = 9997
+    try:
+        client.post('/api/players', json={
+            'nombre': 'Iván', 'apellidos': 'Pérez Núñez', 'numero': 7,
+            'posicion': 'Base', 'equipoId': team_id
+        })
+        for q in ('iva', 'PEREZ N', 'nunez', 'ivan perez'):
+            data = client.get(f'/api/players/search?q={q}').get_json()['data']
+            assert [p['nombreCompleto'] for p in data] == ['Iván Pérez Núñez'], q
+        assert client.get('/api/players/search?q=garcia').get_json()['count'] == 0
+        
+        # Solo apellidos: searchTerms se recalcula con el nombre guardado
+        player_id = client.get('/api/players/search?q=ivan').get_json()['data'][0]['_id']
+        client.put(f'/api/players/{player_id}', json={'apellidos': 'Gómez'})
+        assert client.get('/api/players/search?q=ivan gomez').get_json()['count'] == 1
+        assert client.get('/api/players/search?q=perez').get_json()['count'] == 0
+        
+        # Documento antiguo solo con nombreCompleto: las claves coinciden con lo que se devuelve
+        legacy_id = get_db().players.insert_one({
+            'nombreCompleto': 'Ángel Ruiz', 'numero': 8, 'equipoId': team_id
+        }).inserted_id
+        player = client.put(f'/api/players/{legacy_id}', json={'nombre': 'Óscar'}).get_json()['data']
+        terms = get_db().players.find_one({'_id': legacy_id})['searchTerms']
+        assert terms == search_terms(player['nombre'], player['apellidos'])
+    finally:
+        get_db().players.delete_many({'equipoId': team_id})
+
+def test_index_sync_backfills_search_terms(client, caplog):
+    """Al arrancar, verify avisa de jugadores sin searchTerms y sync los calcula"""
+    team_id = 9996
+    collection = get_db().players
+    try:
+        collection.insert_one({'nombre': 'Óscar', 'apellidos': 'Antiguo', 'equipoId': team_id})
+        assert client.get('/api/players/search?q=oscar').get_json()['count'] == 0
+        
+        with caplog.at_level('WARNING'):
+            assert not check_indexes(get_db(), 'verify')
+        assert 'sin searchTerms' in caplog.text
+        
+        check_indexes(get_db(), 'sync')
+        assert client.get('/api/players/search?q=oscar').get_json()['count'] == 1
+    finally:
+        collection.delete_many({'equipoId': team_id})
+
+def test_metrics(client):
+    """El endpoint /metrics expone latencias por ruta en formato Prometheus"""
+    client.get('/api/players')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'players_http_request_duration_seconds_bucket' in body
+    assert 'route="/api/players"' in body
+    assert 'players_mongo_command_duration_seconds' in body
+
+def test_server_timing_and_slow_log(app, client, seeded_players, caplog):
+    """Cada respuesta lleva Server-Timing y las lentas se registran con su desglose"""
+    app.config['SLOW_REQUEST_THRESHOLD_MS'] = 0.001
+    with caplog.at_level('WARNING', logger='app.slow_requests'):
+        response = client.get(f'/api/players/team/{seeded_players}')
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert 'model;dur=' in timing
+    assert 'total;dur=' in timing
+    
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry['route'] == '/api/players/team/<int:team_id>'
+    assert entry['documents'] == 5
+    assert set(entry['phasesMs']) == {'validate', 'db', 'model', 'serialize'}
+    
+    shape = command_shape('find', 'players', {'find': 'players', 'filter': {'equipoId': 7, '_id': {'$gt': 'x'}}})
+    assert shape['filter'] == {'equipoId': '?', '_id': {'$gt': '?'}}
+
+def test_streamed_request_timed_until_close(app, client, seeded_players, caplog):
+    """Las respuestas NDJSON se miden hasta cerrar el stream, no hasta crear la respuesta"""
+    app.config['SLOW_REQUEST_THRESHOLD_MS'] = 0.001
+    with caplog.at_level('WARNING', logger='app.slow_requests'):
+        response = client.get(
+            f'/api/players/team/{seeded_players}',
+            headers={'Accept': 'application/x-ndjson'}
+        )
+        assert 'headers;dur=' in response.headers['Server-Timing']
+        assert not caplog.records
+        response.get_data()
+        response.close()
+    
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry['streamed'] is True
+    assert entry['documents'] == 5
+
+def test_async_app_matches_sync(client, seeded_players):
+    """El modo ASGI (Quart + motor) responde lo mismo que la app Flask"""
+    path = f'/api/players/team/{seeded_players}?fields=nombre,numeroCamiseta'
+    expected = client.get(path)
+    missing = client.get(f'/api/players/{ObjectId()}')
+    invalid = client.post('/api/players', json={'nombre': 'Sin datos'})
+    
+    async def fetch():
+        async_app = create_async_app('testing')
+        async with async_app.test_app() as test_app:
+            test_client = test_app.test_client()
+            response = await test_client.get(path)
+            cached = await test_client.get(path, headers={'If-None-Match': expected.headers['ETag']})
+            not_found = await test_client.get(missing.request.path)
+            rejected = await test_client.post('/api/players', json={'nombre': 'Sin datos'})
+            return (
+                (response.status_code, response.headers.get('ETag'), await response.get_json()),
+                cached.status_code,
+                (not_found.status_code, await not_found.get_json()),
+                (rejected.status_code, await rejected.get_json())
+            )
+    
+    (status, etag, body), cached, not_found, rejected = asyncio.run(fetch())
+    assert status == 200
+    assert etag == expected.headers['ETag']
+    assert body == expected.get_json()
+    assert cached == 304
+    assert not_found == (404, missing.get_json())
+    assert rejected == (400, invalid.get_json())
+
+def test_async_app_instrumentation(seeded_players):
+    """El modo ASGI expone /metrics, Server-Timing y compresión; al parar cierra el cliente actual"""
+    from app.asgi import teams_client as async_teams
+    path = f'/api/players/team/{seeded_players}'
+    
+    async def fetch():
+        async_app = create_async_app('testing')
+        async_app.config['COMPRESSION_MIN_SIZE'] = 1
+        async with async_app.test_app() as test_app:
+            test_client = test_app.test_client()
+            compressed = await test_client.get(path, headers={'Accept-Encoding': 'gzip'})
+            streamed = await test_client.get(path, headers={'Accept': 'application/x-ndjson'})
+            lines = (await streamed.get_data(as_text=True)).splitlines()
+            metrics = await test_client.get('/metrics')
+            async with async_app.app_context():
+                replaced = async_teams.get_teams_client('http://otro-teams:5001/api/teams')
+                assert replaced.session is not None
+        return compressed, streamed, lines, await metrics.get_data(as_text=True), replaced
+    
+    compressed, streamed, lines, metrics, replaced = asyncio.run(fetch())
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'].startswith('W/')
+    assert 'total;dur=' in compressed.headers['Server-Timing']
+    assert 'headers;dur=' in streamed.headers['Server-Timing']
+    assert len(lines) == 5
+    assert 'route="/api/players/team/<int:team_id>"' in metrics
+    assert async_teams.teams_client is None
+    assert replaced._session is None
+
+def test_read_preference_and_roster_fallback(app, seeded_players):
+    """Lecturas al primario por defecto; con secundarios la plantilla se relee del primario si no cuadra con el ETag"""
+    assert app.config['MONGO_READ_PREFERENCE'] == 'primary'
+    assert not reads_from_secondaries()
+    assert mongo_client_options(app.config)['maxPoolSize'] == app.config['MONGO_MAX_POOL_SIZE']
+    
+    try:
+        init_read_preference({**app.config, 'MONGO_READ_PREFERENCE': 'secondaryPreferred'})
+        assert get_read_preference().mongos_mode == 'secondaryPreferred'
+        assert get_read_preference().max_staleness == app.config['MONGO_MAX_STALENESS_SECONDS']
+        assert reads_from_secondaries()
+        
+        service = PlayerService()
+        version = service.get_roster_version(seeded_players)
+        assert version == (5, None)
+        
+        players = service.get_players_by_team(seeded_players, ('numeroCamiseta',), version)
+        assert sorted(player['numeroCamiseta'] for player in players) == [1, 2, 3, 4, 5]
+        assert not PlayerService._matches_version(players, (6, None))
+        
+        # Versión más nueva que la del secundario: se lee del primario sin romper fields
+        players = service.get_players_by_team(seeded_players, ('numeroCamiseta',), (6, datetime.utcnow()))
+        assert len(players) == 5
+        assert set(players[0]) == {'numeroCamiseta'}
+    finally:
+        init_read_preference(app.config)
+
+def test_json_provider_native_types(app):
+    """El proveedor orjson serializa ObjectId, datetime y date en el formato configurado"""
+    obj_id = ObjectId()
+    payload = {'_id': obj_id, 'updatedAt': datetime(2024, 3, 1, 18, 30), 'fechaNacimiento': date(1998, 4, 12)}
+    
+    assert json.loads(app.json.dumps(payload)) == {
+        '_id': str(obj_id), 'updatedAt': '2024-03-01T18:30:00', 'fechaNacimiento': '1998-04-12'
+    }
+    
+    app.config['JSON_DATETIME_FORMAT'] = 'epoch-ms'
+    assert json.loads(OrjsonJSONProvider(app).dumps(payload))['updatedAt'] == 1709317800000
+    app.config['JSON_DATETIME_FORMAT'] = 'iso-utc'
+    assert json.loads(OrjsonJSONProvider(app).dumps(payload))['updatedAt'] == '2024-03-01T18:30:00Z'
+
+def test_response_compression(client, seeded_players):
+    """Las respuestas grandes se comprimen con gzip y se reutilizan por ETag"""
+    url = f'/api/players/team/{seeded_players}'
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    
+    hits = compression.compressed_cache.hits
+    again = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert again.data == response.data
+    assert compression.compressed_cache.hits == hits + 1
+    
+    response = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+    
+    # Por debajo del umbral no se comprime
+    assert 'Content-Encoding' not in client.get('/health', headers={'Accept-Encoding': 'gzip'}).headers
+
+def test_gunicorn_config(monkeypatch):
+    """gunicorn precarga la app y toma clase de worker, hilos y jitter del entorno"""
+    monkeypatch.setenv('MONGO_CONNECT_ON_STARTUP', 'True')
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gthread')
+    monkeypatch.setenv('GUNICORN_THREADS', '4')
+    monkeypatch.setenv('GUNICORN_MAX_REQUESTS', '1000')
+    monkeypatch.setenv('GUNICORN_MAX_REQUESTS_JITTER', '100')
+    
+    conf = runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py'))
+    assert conf['preload_app'] is True
+    assert (conf['worker_class'], conf['threads']) == ('gthread', 4)
+    assert (conf['max_requests'], conf['max_requests_jitter']) == (1000, 100)
+    assert callable(conf['post_fork']) and callable(conf['child_exit'])
+
+def test_players_indexes_cli(app):
+    """players-indexes sync crea, recrea y elimina índices según PLAYER_INDEXES"""
+    collection = get_db().players
+    collection.create_index('peso', name='idx_obsoleto')
+    collection.drop_index('idx_activo')
+    collection.create_index('edad', name='idx_activo')
+    runner = app.test_cli_runner()
+    
+    result = runner.invoke(args=['players-indexes', 'sync', '--dry-run'])
+    assert '- idx_obsoleto' in result.output
+    assert '~ idx_activo' in result.output
+    assert 'idx_obsoleto' in collection.index_information()
+    assert runner.invoke(args=['players-indexes', 'check']).exit_code == 1
+    
+    result = runner.invoke(args=['players-indexes', 'sync'])
+    assert result.exit_code == 0
+    indexes = collection.index_information()
+    assert 'idx_obsoleto' not in indexes
+    assert indexes['idx_activo']['key'] == [('activo', 1)]
+    assert runner.invoke(args=['players-indexes', 'check']).exit_code == 0
+
+def test_cold_start_imports():
+    """Arrancar la app no importa requests ni lee .env en producción"""
+    code = "import sys, run; print(sorted({'requests', 'dotenv'} & set(sys.modules)))"
+    env = dict(os.environ, FLASK_ENV='production', MONGO_CONNECT_ON_STARTUP='False')
+    result = subprocess.run(
+        [sys.executable, '-c', code], env=env, capture_output=True, text=True,
+        cwd=os.path.join(os.path.dirname(__file__), '..')
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
+
+def test_env_file_loaded_by_config():
+    """app.config carga .env.development desde cualquier directorio (CLI, benchmarks)"""
+    code = "import os, app.config; print(os.getenv('SERVICE_NAME'))"
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    env = {key: value for key, value in os.environ.items() if key not in ('FLASK_ENV', 'SERVICE_NAME')}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    result = subprocess.run(
+        [sys.executable, '-c', code], env=env, capture_output=True, text=True, cwd='/'
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'players-service'